@@ -2,6 +2,8 @@
 ORION - Sistema de Gestión de Proyectos
 Versión 3.0 - Modular & Minimalista
 """
+import asyncio
+
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -9,12 +11,26 @@ from fastapi.responses import HTMLResponse
 import uvicorn
 
 # Configuración
-from config import APP_HOST, APP_PORT, APP_TITLE, APP_VERSION, APP_DESCRIPTION
+from config import APP_HOST, APP_PORT, APP_TITLE, APP_VERSION, APP_DESCRIPTION, WATCHER_ENABLED
 
 # Core
 from core.database import db
 from core.logger import logger, get_logs_summary
 from core.project_manager import project_manager
+from core.sampler import process_sampler
+from core.metrics import metrics_store
+from core.executor import executor, run_blocking
+from core.dependencies import dependency_index
+from core.maintenance import maintenance_job
+from core.write_queue import write_queue
+from core.log_queue import log_pipeline
+from core.log_search import log_search
+from core.log_index import log_index
+from core.output_pump import output_pump
+from core.portfolio_watcher import portfolio_watcher
+
+# Services
+from services.status_registry import status_registry
 
 # Routers
 from routers import projects, api, services
@@ -42,38 +58,80 @@ app.include_router(services.router)
 @app.on_event("startup")
 async def startup_event():
     """Inicialización del sistema"""
+    # Escritura de logs en segundo plano
+    log_pipeline.start()
+
     logger.info(f"Iniciando {APP_TITLE} v{APP_VERSION}")
 
+    # Muestreo de CPU/memoria en segundo plano, con historial en orion.db
+    process_sampler.add_listener(metrics_store.record_samples)
+    process_sampler.start()
+    metrics_store.start()
+
+    # Escritura por lotes del estado y la actividad de las acciones
+    write_queue.start()
+
+    # Retención de actividad y vacuum incremental de orion.db
+    maintenance_job.start()
+
+    # Índice de búsqueda de los logs (FTS5)
+    log_search.start()
+
     try:
         # Descubrir y sincronizar proyectos
-        discovered = project_manager.discover_projects()
-        db.sync_projects(discovered)
+        discovered = await run_blocking(project_manager.discover_projects)
+        counts = await run_blocking(db.sync_projects, discovered, True)
+        await run_blocking(dependency_index.sync, discovered, True)
 
-        logger.info(f"Sincronizados {len(discovered)} proyectos del portfolio")
+        logger.info(f"Sincronizados {len(discovered)} proyectos del portfolio", extra=counts)
     except Exception as e:
         logger.error(f"Error en startup: {str(e)}")
 
+    # Sincronización incremental de cambios en el portfolio
+    if WATCHER_ENABLED:
+        portfolio_watcher.start()
+
+    # Colector del registro de estado
+    status_registry.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Detener tareas en segundo plano"""
+    await status_registry.stop()
+    portfolio_watcher.stop()
+    process_sampler.stop()
+    output_pump.stop()
+    metrics_store.stop()
+    maintenance_job.stop()
+    log_search.stop()
+    # El pool espera a sus tareas en curso: fuera del event loop
+    await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+    write_queue.stop()
+    log_index.save_all()
+    db.close()
+    logger.info(f"{APP_TITLE} detenido")
+    log_pipeline.stop()
+
 
 # ==================== DASHBOARD ====================
 
 @app.get("/", response_class=HTMLResponse)
-async def dashboard(request: Request):
+async def dashboard(request: Request, fresh: bool = False):
     """Dashboard principal de ORION - Lista de proyectos"""
     try:
-        # Obtener todos los proyectos
-        proyectos = db.list_projects()
+        # Estado publicado por el colector (?fresh=1 fuerza un refresco)
+        state = await status_registry.get_state(fresh)
+        proyectos = state['proyectos']
 
         # Enriquecer con estado real
         for proyecto in proyectos:
-            status = project_manager.get_project_status(
-                proyecto['nombre'],
-                proyecto.get('puerto')
-            )
-            proyecto.update(status)
+            proyecto.update(state['status'].get(proyecto['nombre'], {}))
 
         return templates.TemplateResponse("index.html", {
             "request": request,
-            "proyectos": proyectos
+            "proyectos": proyectos,
+            "freshness": state['freshness']
         })
     except Exception as e:
         logger.error(f"Error en dashboard: {str(e)}")
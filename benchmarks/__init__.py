@@ -0,0 +1,4 @@
+"""
+ORION Benchmarks
+Scripts de medición de rendimiento (no forman parte de la aplicación)
+"""
@@ -0,0 +1,132 @@
+"""
+ORION Benchmark - Análisis de código
+Compara el análisis por regex (un archivo) con el analizador ast (sigue routers)
+
+Uso:
+    python -m benchmarks.analyzer
+    python -m benchmarks.analyzer --routes 50 --routers 8 --iterations 200
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from core.analyzer import SourceAnalyzer
+from core.database import Database
+from core.project_manager import ProjectManager
+
+MAIN_TEMPLATE = '''"""
+Proyecto de prueba con routers separados
+"""
+from fastapi import FastAPI
+import uvicorn
+
+from config import PORT
+{imports}
+
+app = FastAPI()
+{includes}
+
+{routes}
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=PORT)
+'''
+
+ROUTER_TEMPLATE = '''"""
+Router {index}
+"""
+from fastapi import APIRouter
+from sqlalchemy.orm import Session
+
+router = APIRouter(prefix="/r{index}")
+
+{routes}
+'''
+
+ROUTE_TEMPLATE = '''
+@{owner}.{method}("/item{index}/{{item_id}}")
+async def handler_{index}(item_id: int):
+    """Endpoint {index}"""
+    return {{"id": item_id, "token": None}}
+'''
+
+
+def build_project(root: Path, routes: int, routers: int) -> Path:
+    """Crear un proyecto FastAPI con rutas en el archivo principal y en routers/"""
+    project = root / "bench_project"
+    (project / 'routers').mkdir(parents=True)
+    (project / 'routers' / '__init__.py').write_text('')
+    (project / 'config.py').write_text('PORT = 4321\n')
+    (project / 'requirements.txt').write_text('fastapi\nuvicorn\nsqlalchemy\n')
+
+    methods = ['get', 'post', 'put', 'delete']
+
+    def render(owner: str, offset: int) -> str:
+        return ''.join(
+            ROUTE_TEMPLATE.format(owner=owner, method=methods[i % 4], index=offset + i)
+            for i in range(routes)
+        )
+
+    for index in range(routers):
+        (project / 'routers' / f'r{index}.py').write_text(
+            ROUTER_TEMPLATE.format(index=index, routes=render('router', index * routes))
+        )
+
+    (project / 'app.py').write_text(MAIN_TEMPLATE.format(
+        imports='\n'.join(f'from routers import r{i}' for i in range(routers)),
+        includes='\n'.join(f'app.include_router(r{i}.router)' for i in range(routers)),
+        routes=render('app', routers * routes)
+    ))
+    return project
+
+
+def run(routes: int, routers: int, iterations: int):
+    """Medir ambos caminos sobre el mismo proyecto (archivos ya en memoria)"""
+    tmp = Path(tempfile.mkdtemp(prefix="orion-bench-"))
+    try:
+        project = build_project(tmp, routes, routers)
+        manager = ProjectManager(Database(tmp / "bench.db"))
+        manager.portfolio_dir = tmp
+        analyzer = SourceAnalyzer(manager._read_file)
+        main = project / 'app.py'
+        source_bytes = sum(path.stat().st_size for path in project.rglob('*.py'))
+
+        # Calentar la cache de archivos para medir solo el análisis
+        regex_result = manager._analyze_app_file(main, 'FastAPI')
+        regex_port = manager._detect_port(main)
+        ast_result = analyzer.analyze(project, 'app.py', 'FastAPI')
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            manager._detect_port(main)
+            manager._analyze_app_file(main, 'FastAPI')
+        regex_time = (time.perf_counter() - start) / iterations
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            analyzer.analyze(project, 'app.py', 'FastAPI')
+        ast_time = (time.perf_counter() - start) / iterations
+
+        main_bytes = main.stat().st_size
+        print(f"Proyecto: {routers} routers x {routes} rutas + {routes} rutas en app.py "
+              f"({source_bytes / 1024:.1f} KB de código)")
+        print(f"{'camino':>8} {'ms/proyecto':>12} {'MB/s':>8} {'endpoints':>10} {'puerto':>7}")
+        print(f"{'regex':>8} {regex_time * 1000:>12.2f} {main_bytes / regex_time / 1e6:>8.1f} "
+              f"{len(regex_result['endpoints']):>10} {str(regex_port):>7}")
+        print(f"{'ast':>8} {ast_time * 1000:>12.2f} {source_bytes / ast_time / 1e6:>8.1f} "
+              f"{len(ast_result['endpoints']):>10} {str(ast_result['port']):>7}")
+        print(f"Endpoints esperados: {routes * (routers + 1)}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark del analizador de código")
+    parser.add_argument('--routes', type=int, default=20, help="Rutas por archivo")
+    parser.add_argument('--routers', type=int, default=4, help="Módulos en routers/")
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    run(args.routes, args.routers, args.iterations)
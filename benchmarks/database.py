@@ -0,0 +1,108 @@
+"""
+ORION Benchmark - Base de datos
+Consultas por segundo con una conexión por llamada frente al pool WAL
+
+Uso:
+    python -m benchmarks.database
+    python -m benchmarks.database --projects 2000 --threads 1 8 16 --seconds 3
+"""
+import argparse
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+from core.database import Database
+
+
+def populate(database: Database, projects: int):
+    """Crear proyectos y algo de actividad"""
+    for index in range(projects):
+        database.add_project(
+            f"proyecto_{index:05d}", f"/tmp/proyecto_{index:05d}",
+            puerto=4000 + index, tipo='FastAPI', tecnologias='fastapi, uvicorn'
+        )
+    for index in range(0, projects, 10):
+        database.log_activity(f"proyecto_{index:05d}", 'inicio', 'Proyecto iniciado')
+
+
+def workload(database: Database, projects: int, write_ratio: float, deadline: float, results: Dict):
+    """Mezcla de lecturas del dashboard/API y escrituras de estado"""
+    done = errors = 0
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        nombre = f"proyecto_{rng.randrange(projects):05d}"
+        try:
+            roll = rng.random()
+            if roll < write_ratio:
+                database.update_project(nombre, estado=rng.choice(['activo', 'detenido']))
+            elif roll < 0.5:
+                database.get_project(nombre)
+            elif roll < 0.8:
+                database.get_stats()
+            elif roll < 0.95:
+                database.get_activity(nombre)
+            else:
+                database.list_projects()
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+
+    with results['lock']:
+        results['queries'] += done
+        results['errors'] += errors
+
+
+def measure(database: Database, projects: int, threads: int, seconds: float, write_ratio: float) -> Dict:
+    """Ejecutar la carga en varios hilos durante `seconds` segundos"""
+    results = {'queries': 0, 'errors': 0, 'lock': threading.Lock()}
+    deadline = time.perf_counter() + seconds
+    workers = [
+        threading.Thread(target=workload, args=(database, projects, write_ratio, deadline, results))
+        for _ in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    return {'qps': results['queries'] / seconds, 'errors': results['errors']}
+
+
+def run(projects: int, threads_list, seconds: float, write_ratio: float):
+    """Comparar ambos modos sobre bases idénticas"""
+    tmp = Path(tempfile.mkdtemp(prefix="orion-bench-"))
+    try:
+        modes = {
+            'por llamada': Database(tmp / "baseline.db", pooled=False),
+            'pool WAL': Database(tmp / "pooled.db", pooled=True)
+        }
+        for database in modes.values():
+            populate(database, projects)
+
+        print(f"{projects} proyectos, {write_ratio:.0%} escrituras, {seconds:.0f} s por medición")
+        print(f"{'modo':>12} {'hilos':>6} {'consultas/s':>12} {'bloqueos':>9}")
+        for threads in threads_list:
+            for name, database in modes.items():
+                result = measure(database, projects, threads, seconds, write_ratio)
+                print(f"{name:>12} {threads:>6} {result['qps']:>12.0f} {result['errors']:>9}")
+
+        for database in modes.values():
+            database.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de orion.db")
+    parser.add_argument('--projects', type=int, default=500)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--seconds', type=float, default=2.0)
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    args = parser.parse_args()
+
+    run(args.projects, args.threads, args.seconds, args.write_ratio)
@@ -0,0 +1,124 @@
+"""
+ORION Benchmark - Descubrimiento de proyectos
+Compara el descubrimiento en serie y en paralelo para varios tamaños de portfolio
+
+Uso:
+    python -m benchmarks.discovery
+    python -m benchmarks.discovery --sizes 50 500 --workers 4 8 16
+    python -m benchmarks.discovery --portfolio /mnt/nfs/portfolio/projects
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from core.database import Database
+from core.project_manager import ProjectManager
+
+APP_TEMPLATE = '''"""
+Proyecto de prueba {index}
+"""
+from fastapi import FastAPI
+import sqlite3
+
+app = FastAPI()
+
+
+@app.get("/")
+def index():
+    return {{"ok": True}}
+
+
+@app.post("/items")
+def create_item():
+    return {{"ok": True}}
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, port={port})
+'''
+
+REQUIREMENTS = "fastapi==0.104.1\nuvicorn[standard]>=0.24\njinja2\npsutil\n"
+
+
+def build_portfolio(root: Path, size: int) -> Path:
+    """Crear un portfolio sintético con `size` proyectos FastAPI"""
+    portfolio = root / f"portfolio_{size}"
+    for index in range(size):
+        project = portfolio / f"proyecto_{index:04d}"
+        project.mkdir(parents=True)
+        (project / 'app.py').write_text(APP_TEMPLATE.format(index=index, port=4000 + index % 2000))
+        (project / 'requirements.txt').write_text(REQUIREMENTS)
+    return portfolio
+
+
+def measure(portfolio: Path, workers: int, repeat: int) -> dict:
+    """
+    Mejor tiempo en frío (BD y caches vacías), tras un reinicio (solo la
+    tabla de análisis de orion.db) y en caliente (cache de huellas llena)
+    """
+    cold, restart, warm = [], [], []
+    result = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(prefix="orion-bench-db-") as db_dir:
+            database = Database(Path(db_dir) / "bench.db")
+            manager = ProjectManager(database)
+            manager.portfolio_dir = portfolio
+
+            start = time.perf_counter()
+            result = manager.discover_projects(workers=workers)
+            cold.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            manager.discover_projects(workers=workers)
+            warm.append(time.perf_counter() - start)
+
+            manager = ProjectManager(database)
+            manager.portfolio_dir = portfolio
+            start = time.perf_counter()
+            manager.discover_projects(workers=workers)
+            restart.append(time.perf_counter() - start)
+
+    return {'cold': min(cold), 'restart': min(restart), 'warm': min(warm), 'result': result}
+
+
+def run(sizes: List[int], workers: List[int], repeat: int, portfolio: Optional[Path] = None):
+    """Ejecutar el benchmark e imprimir una tabla de resultados"""
+    tmp = None
+    if portfolio:
+        targets = [(len([p for p in portfolio.iterdir() if p.is_dir()]), portfolio)]
+    else:
+        tmp = Path(tempfile.mkdtemp(prefix="orion-bench-"))
+        targets = [(size, build_portfolio(tmp, size)) for size in sizes]
+
+    try:
+        print(f"{'proyectos':>10} {'hilos':>6} {'frío (ms)':>11} {'reinicio (ms)':>14} "
+              f"{'caliente (ms)':>14} {'speedup':>8}")
+        for size, path in targets:
+            serial = measure(path, 1, repeat)
+            print(f"{size:>10} {1:>6} {serial['cold'] * 1000:>11.1f} {serial['restart'] * 1000:>14.1f} "
+                  f"{serial['warm'] * 1000:>14.1f} {'1.00x':>8}")
+
+            for count in workers:
+                parallel = measure(path, count, repeat)
+                assert parallel['result'] == serial['result'], "El modo paralelo cambió el resultado"
+                speedup = serial['cold'] / parallel['cold'] if parallel['cold'] else 0
+                print(f"{size:>10} {count:>6} {parallel['cold'] * 1000:>11.1f} "
+                      f"{parallel['restart'] * 1000:>14.1f} {parallel['warm'] * 1000:>14.1f} {speedup:>7.2f}x")
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de descubrimiento de proyectos")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--workers', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--portfolio', type=Path, help="Medir un portfolio existente en lugar de uno sintético")
+    args = parser.parse_args()
+
+    run(args.sizes, args.workers, args.repeat, args.portfolio)
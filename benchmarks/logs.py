@@ -0,0 +1,127 @@
+"""
+ORION Benchmark - Lectura de logs
+Últimas N líneas con readlines() completo frente a la lectura desde el final,
+y resumen de logs leyendo todo frente al índice lateral incremental
+
+Uso:
+    python -m benchmarks.logs
+    python -m benchmarks.logs --sizes 10 100 500 --limits 20 200
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List
+
+from core.log_index import LogIndex
+from core.log_reader import tail_lines
+
+
+def generate(path: Path, megabytes: int):
+    """Escribir un log JSON de aproximadamente `megabytes` MB"""
+    target = megabytes * 1024 * 1024
+    with open(path, 'w', encoding='utf-8') as f:
+        index = 0
+        while f.tell() < target:
+            lines = [
+                json.dumps({
+                    "timestamp": f"2024-01-01T00:00:{i % 60:02d}.000000Z",
+                    "level": "INFO" if i % 7 else "ERROR",
+                    "project": "orion.bench",
+                    "message": f"Petición {i} atendida en {i % 97} ms"
+                }, ensure_ascii=False)
+                for i in range(index, index + 1000)
+            ]
+            f.write('\n'.join(lines) + '\n')
+            index += 1000
+
+
+def readlines_tail(path: Path, limit: int) -> List[str]:
+    """Método anterior: leer el archivo entero y quedarse con el final"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f.readlines()[-limit:]]
+
+
+def measure(reader: Callable, path: Path, limit: int, repeats: int):
+    """Mejor tiempo (ms) y pico de memoria (MB) de `repeats` lecturas"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        reader(path, limit)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    reader(path, limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best * 1000, peak / (1024 * 1024)
+
+
+def readlines_summary(path: Path) -> int:
+    """Resumen anterior: leer el archivo entero para contar líneas"""
+    with open(path, 'r') as f:
+        lines = f.readlines()
+        json.loads(lines[-1])
+        return len(lines)
+
+
+def timed(function: Callable, *args) -> float:
+    """Duración de una llamada en ms"""
+    start = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def run(sizes, limits, repeats: int):
+    """Comparar los lectores y el resumen para cada tamaño de archivo"""
+    tmp = Path(tempfile.mkdtemp(prefix="orion-bench-"))
+    try:
+        print(f"{'MB':>6} {'líneas':>7} {'readlines ms':>13} {'MB pico':>8} {'tail ms':>9} {'MB pico':>8}")
+        for size in sizes:
+            path = tmp / f"bench_{size}.log"
+            generate(path, size)
+            for limit in limits:
+                assert readlines_tail(path, limit) == tail_lines(path, limit)
+                old_ms, old_mb = measure(readlines_tail, path, limit, repeats)
+                new_ms, new_mb = measure(tail_lines, path, limit, repeats)
+                print(f"{size:>6} {limit:>7} {old_ms:>13.1f} {old_mb:>8.1f} {new_ms:>9.2f} {new_mb:>8.2f}")
+            path.unlink()
+
+        print()
+        print(f"{'MB':>6} {'readlines ms':>13} {'índice frío ms':>15} {'reinicio ms':>12} {'+1 línea ms':>12}")
+        for size in sizes:
+            logs_dir = tmp / f"logs_{size}"
+            logs_dir.mkdir()
+            path = logs_dir / "bench.log"
+            generate(path, size)
+
+            old_ms = timed(readlines_summary, path)
+            cold_ms = timed(LogIndex(logs_dir).summary)
+
+            # Proceso nuevo: parte del índice lateral guardado en disco
+            index = LogIndex(logs_dir)
+            restart_ms = timed(index.summary)
+
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"level": "INFO", "message": "nueva"}) + '\n')
+            append_ms = timed(index.summary)
+
+            assert index.summary()['bench']['total_entries'] == readlines_summary(path)
+            print(f"{size:>6} {old_ms:>13.1f} {cold_ms:>15.1f} {restart_ms:>12.2f} {append_ms:>12.2f}")
+            shutil.rmtree(logs_dir)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de lectura de logs")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--limits', type=int, nargs='+', default=[20, 200])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    run(args.sizes, args.limits, args.repeats)
@@ -29,9 +29,74 @@ PROJECT_STATES = {
 PORT_RANGE_START = 4000
 PORT_RANGE_END = 6000
 
+# Monitoreo de procesos
+PROCESS_SNAPSHOT_TTL = 2.0  # segundos que se reutiliza la instantánea de procesos
+PORT_SNAPSHOT_TTL = 2.0     # segundos que se reutiliza la tabla de puertos en escucha
+SAMPLER_INTERVAL = 1.0      # segundos entre muestras de CPU/memoria de proyectos
+SAMPLER_IDLE_TIMEOUT = 300  # segundos sin consultas antes de dejar de muestrear un proceso
+COLLECTOR_INTERVAL = 1.0    # segundos entre refrescos del registro de estado
+STREAM_QUEUE_SIZE = 32      # eventos pendientes por cliente SSE antes de reenviar snapshot
+STREAM_KEEPALIVE = 15.0     # segundos entre comentarios keep-alive del stream SSE
+
+# Historial de métricas por proyecto (orion.db, tabla metricas)
+METRICS_FLUSH_INTERVAL = 10.0             # segundos entre escrituras por lote
+METRICS_RAW_RETENTION = 3600              # muestras a 1 s: 1 hora
+METRICS_MINUTE_RETENTION = 7 * 24 * 3600  # rollups de 1 minuto: 7 días
+METRICS_HOUR_RETENTION = 90 * 24 * 3600   # rollups de 1 hora: 90 días
+
+# Base de datos (orion.db)
+DB_JOURNAL_MODE = "WAL"     # lectores concurrentes sin "database is locked"
+DB_SYNCHRONOUS = "NORMAL"   # seguro con WAL; solo se pierde la última transacción ante un corte de luz
+DB_CACHE_SIZE_KB = 8192     # cache de páginas por conexión
+DB_BUSY_TIMEOUT = 5.0       # segundos de espera ante un bloqueo de escritura
+DB_STATEMENT_CACHE = 256    # sentencias preparadas reutilizadas por conexión
+DB_READ_POOL = True         # conexiones de solo lectura para listados y estadísticas
+DB_VACUUM_PAGES = 1000      # páginas libres devueltas al sistema por mantenimiento (0 = todas)
+
+# Retención de la actividad (tabla actividad -> resúmenes diarios en actividad_diaria)
+ACTIVITY_RETENTION_DAYS = 30         # días de eventos individuales que se conservan
+ACTIVITY_COMPACT_INTERVAL = 6 * 3600  # segundos entre ejecuciones del mantenimiento
+ACTIVITY_PAGE_MAX = 500              # máximo de eventos por página en la API
+
+# Cola de escritura diferida (estado de proyectos y actividad de las acciones)
+WRITE_QUEUE_INTERVAL = 0.5        # segundos entre transacciones por lote
+WRITE_QUEUE_MAX_BATCH = 1000      # escrituras pendientes que adelantan el siguiente lote
+WRITE_QUEUE_MAX_RETRIES = 3       # reintentos de un lote fallido antes de descartarlo
+WRITE_QUEUE_DURABILITY = "async"  # "async": no espera; "batch": espera al commit del lote; "sync": escritura directa
+
+# Pool de hilos para llamadas bloqueantes (sqlite3, psutil, git)
+EXECUTOR_MAX_WORKERS = 16
+
+# Descubrimiento de proyectos
+DISCOVERY_WORKERS = 8  # hilos que analizan proyectos en paralelo (1 = serie)
+WATCHER_ENABLED = True       # vigilar PORTFOLIO_DIR y sincronizar cambios automáticamente
+WATCHER_DEBOUNCE = 1.0       # segundos sin eventos antes de sincronizar los proyectos afectados
+WATCHER_POLL_INTERVAL = 5.0  # segundos entre escaneos cuando inotify no está disponible
+
+# Salida de los proyectos (stdout/stderr -> LOGS_DIR/<proyecto>.log)
+OUTPUT_PUMP_QUEUE_SIZE = 10000  # líneas en espera antes de aplicar backpressure
+OUTPUT_PUMP_MAX_LINE = 64 * 1024  # bytes máximos por línea; el resto sigue en otra línea
+
 # Logging
 LOG_FORMAT = "json"
 LOG_LEVEL = "INFO"
+LOG_TAIL_BLOCK = 64 * 1024        # bytes por lectura al leer logs desde el final
+LOG_TAIL_MAX_LINE = 1024 * 1024   # bytes máximos por línea de log leída; el resto se descarta
+LOG_INDEX_STRIDE = 1000           # líneas entre offsets guardados en el índice lateral (<log>.idx)
+LOG_INDEX_SAVE_BYTES = 1024 * 1024  # bytes nuevos indexados antes de reescribir el índice lateral
+LOG_MERGE_MAX = 2000              # entradas máximas por página al mezclar todos los logs
+LOG_ROTATE_BYTES = 50 * 1024 * 1024  # bytes del log activo que provocan su rotación (0 = sin límite)
+LOG_ROTATE_INTERVAL = 24 * 3600   # segundos máximos de un log activo antes de rotarlo (0 = sin límite)
+LOG_RETENTION_SEGMENTS = 10       # segmentos rotados que se conservan por log (0 = sin límite)
+LOG_RETENTION_DAYS = 30           # días que se conserva un segmento rotado (0 = sin límite)
+LOG_COMPRESS = True               # comprimir los segmentos rotados con gzip
+LOG_SEGMENT_MEMBER = 1024 * 1024  # bytes de log por miembro gzip (unidad de lectura hacia atrás)
+LOG_QUEUE_SIZE = 10000            # registros de log en cola como máximo
+LOG_QUEUE_MODE = "drop"           # cola llena: drop (descartar y contar) | block (esperar sitio)
+LOG_QUEUE_BATCH = 500             # registros escritos por lote (un flush por handler y lote)
+LOG_SEARCH_INTERVAL = 5           # segundos entre pasadas del indexador de búsqueda de logs
+LOG_SEARCH_BATCH = 2000           # entradas de log indexadas por transacción
+LOG_SEARCH_MAX = 200              # resultados máximos por página de búsqueda
 
 # Crear directorios necesarios
 LOGS_DIR.mkdir(exist_ok=True)
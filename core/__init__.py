@@ -3,7 +3,21 @@ ORION Core Modules
 """
 from .database import db, Database
 from .logger import logger, get_logger, read_logs, get_logs_summary
+from .log_reader import iter_lines_reverse, tail_lines, tail_log
+from .log_rotation import RotatingLogHandler, compress_segment, apply_retention
+from .log_index import log_index, LogIndex
+from .log_queue import log_pipeline, LogPipeline
+from .log_search import log_search, LogSearch
 from .project_manager import project_manager, ProjectManager
+from .executor import executor, run_blocking, BlockingExecutor
+from .metrics import metrics_store, MetricsStore
+from .analyzer import SourceAnalyzer
+from .dependencies import dependency_index, DependencyIndex, parse_requirements
+from .maintenance import maintenance_job, MaintenanceJob
+from .write_queue import write_queue, WriteQueue
+from .portfolio_watcher import portfolio_watcher, PortfolioWatcher
+from .sampler import process_sampler, ProcessSampler
+from .snapshots import get_process_snapshot, get_port_snapshot, ProcessSnapshot, PortSnapshot
 
 __all__ = [
     'db',
@@ -12,6 +26,39 @@ __all__ = [
     'get_logger',
     'read_logs',
     'get_logs_summary',
+    'iter_lines_reverse',
+    'tail_lines',
+    'tail_log',
+    'RotatingLogHandler',
+    'compress_segment',
+    'apply_retention',
+    'log_index',
+    'LogIndex',
+    'log_pipeline',
+    'LogPipeline',
+    'log_search',
+    'LogSearch',
     'project_manager',
-    'ProjectManager'
+    'ProjectManager',
+    'get_process_snapshot',
+    'get_port_snapshot',
+    'ProcessSnapshot',
+    'PortSnapshot',
+    'process_sampler',
+    'ProcessSampler',
+    'executor',
+    'run_blocking',
+    'BlockingExecutor',
+    'metrics_store',
+    'MetricsStore',
+    'portfolio_watcher',
+    'PortfolioWatcher',
+    'SourceAnalyzer',
+    'dependency_index',
+    'DependencyIndex',
+    'parse_requirements',
+    'maintenance_job',
+    'MaintenanceJob',
+    'write_queue',
+    'WriteQueue'
 ]
@@ -0,0 +1,461 @@
+"""
+ORION Source Analyzer
+Análisis estático de proyectos con ast: endpoints, imports, puerto y descripción
+"""
+import ast
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# Métodos HTTP reconocidos como decoradores (@app.get, @router.post, ...)
+HTTP_METHODS = {'get', 'post', 'put', 'delete', 'patch', 'options', 'head', 'trace'}
+
+# Constructores de aplicaciones y routers: nombre -> (framework, tipo, argumento del prefijo)
+CONSTRUCTORS = {
+    'FastAPI': ('FastAPI', 'app', None),
+    'APIRouter': ('FastAPI', 'router', 'prefix'),
+    'Flask': ('Flask', 'app', None),
+    'Blueprint': ('Flask', 'router', 'url_prefix'),
+}
+
+# Palabras clave para detectar base de datos y autenticación
+DB_KEYWORDS = ['sqlalchemy', 'sqlite', 'mysql', 'postgres', 'mongodb', 'database', 'db.']
+AUTH_KEYWORDS = ['login', 'authentication', 'jwt', 'token', 'session', 'auth']
+
+# Límite de módulos seguidos por proyecto (evita recorrer árboles enormes)
+MAX_MODULES = 200
+
+
+class ModuleInfo:
+    """Resultado de recorrer una vez el AST de un módulo"""
+
+    def __init__(self, path: Path, source: str, tree: ast.Module):
+        self.path = path
+        self.source = source
+        self.docstring = ast.get_docstring(tree) or ''
+        self.imports: Set[str] = set()
+        self.aliases: Dict[str, Tuple[str, int, Optional[str]]] = {}  # nombre -> (módulo, nivel, atributo)
+        self.constants: Dict[str, object] = {}
+        self.objects: Dict[str, Dict] = {}       # nombre -> {framework, kind, prefix}
+        self.routes: List[Tuple[str, str, str, str]] = []   # (objeto, método, ruta, framework)
+        self.includes: List[Tuple[str, ast.expr, Optional[str]]] = []  # (padre, expresión del hijo, prefijo)
+        self.run_ports: List[ast.expr] = []
+
+
+class SourceAnalyzer:
+    """
+    Analizador de código de un proyecto basado en ast
+
+    Cada módulo se parsea una sola vez y en un único recorrido se extraen
+    imports, constantes, aplicaciones/routers, decoradores de rutas,
+    include_router/register_blueprint y llamadas a run(port=...). Los
+    routers incluidos desde otros módulos del proyecto se siguen para
+    componer las rutas completas con sus prefijos.
+    """
+
+    def __init__(self, read_file: Callable[[Path], Optional[str]]):
+        self.read_file = read_file
+
+    def analyze(self, project_path: Path, main_file: str, project_type: str) -> Dict:
+        """
+        Analizar un proyecto a partir de su archivo principal
+
+        Args:
+            project_path: Ruta al proyecto
+            main_file: Archivo principal (relativo al proyecto)
+            project_type: Tipo detectado por dependencias (FastAPI, Flask, ...)
+
+        Returns:
+            Endpoints, imports, descripción, puerto, flags, archivos leídos
+            (`sources`) y archivos que faltan o no parsean (`missing`)
+
+        Raises:
+            SyntaxError: Si el archivo principal no se puede parsear
+        """
+        run = _Run(self, project_path, project_type)
+        main = run.load(project_path / main_file, required=True)
+
+        endpoints: List[Dict] = []
+        roots = [name for name, obj in main.objects.items() if obj['kind'] == 'app']
+        # Rutas sobre objetos no declarados en el módulo (p. ej. app creada en otro archivo)
+        roots += sorted({route[0] for route in main.routes if route[0] not in main.objects})
+        for name in roots:
+            run.emit(main, name, '', None, endpoints, set())
+
+        modules = list(run.modules.values())
+        lowered = '\n'.join(module.source for module in modules).lower()
+
+        return {
+            'endpoints': endpoints,
+            'imports': sorted(set().union(*(module.imports for module in modules))),
+            'description': main.docstring.strip()[:200],
+            'port': run.detect_port(main),
+            'has_database': any(keyword in lowered for keyword in DB_KEYWORDS),
+            'has_auth': any(keyword in lowered for keyword in AUTH_KEYWORDS),
+            'sources': sorted(str(path) for path in run.modules),
+            'missing': sorted(str(path) for path in run.missing)
+        }
+
+
+class _Run:
+    """Estado de un análisis: módulos ya parseados del proyecto"""
+
+    def __init__(self, analyzer: SourceAnalyzer, root: Path, project_type: str):
+        self.analyzer = analyzer
+        self.root = root
+        self.project_type = project_type
+        self.modules: Dict[Path, ModuleInfo] = {}
+        self._failed: Set[Path] = set()
+        # Archivos del proyecto que el análisis buscó sin poder usarlos: si
+        # aparecen o se corrigen, el resultado cambia
+        self.missing: Set[Path] = set()
+
+    # ==================== CARGA DE MÓDULOS ====================
+
+    def load(self, path: Path, required: bool = False) -> Optional[ModuleInfo]:
+        """Parsear y recorrer un módulo (una sola vez por análisis)"""
+        if path in self.modules:
+            return self.modules[path]
+        if path in self._failed or len(self.modules) >= MAX_MODULES:
+            return None
+
+        try:
+            source = self.analyzer.read_file(path)
+            if source is None:
+                raise FileNotFoundError(str(path))
+            tree = ast.parse(source, filename=str(path))
+        except (OSError, SyntaxError, ValueError, UnicodeDecodeError):
+            if required:
+                raise
+            self._failed.add(path)
+            self.missing.add(path)
+            return None
+
+        module = ModuleInfo(path, source, tree)
+        self.modules[path] = module
+        self._visit(module, tree)
+        return module
+
+    def resolve_module(self, current: Path, module: str, level: int) -> Optional[Path]:
+        """Archivo de un módulo del proyecto (None si es externo)"""
+        if level:
+            base = current.parent
+            for _ in range(level - 1):
+                base = base.parent
+        else:
+            base = self.root
+
+        parts = module.split('.') if module else []
+        target = base.joinpath(*parts)
+        candidates = [target / '__init__.py']
+        if parts:
+            candidates.insert(0, target.with_name(target.name + '.py'))
+
+        candidates = [candidate for candidate in candidates if self.root in candidate.parents]
+        for candidate in candidates:
+            if candidate.is_file():
+                return candidate
+        self.missing.update(candidates)
+        return None
+
+    # ==================== RECORRIDO ====================
+
+    def _visit(self, module: ModuleInfo, tree: ast.Module):
+        """
+        Único recorrido de las sentencias de un módulo
+
+        Solo se desciende por cuerpos de sentencias (if, with, try, def,
+        class...), no por expresiones: todo lo que interesa aparece como
+        sentencia, y así se evita visitar cada nodo del árbol.
+        """
+        for node in _iter_statements(tree.body):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    module.imports.add(alias.name)
+                    if alias.asname:
+                        module.aliases[alias.asname] = (alias.name, 0, None)
+                    else:
+                        head = alias.name.split('.')[0]
+                        module.aliases[head] = (head, 0, None)
+
+            elif isinstance(node, ast.ImportFrom):
+                if node.module and not node.level:
+                    module.imports.add(node.module)
+                for alias in node.names:
+                    module.aliases[alias.asname or alias.name] = (node.module or '', node.level, alias.name)
+
+            elif isinstance(node, ast.Assign):
+                self._visit_assign(module, node)
+
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                for decorator in node.decorator_list:
+                    self._visit_decorator(module, decorator)
+
+            elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+                if isinstance(node.value.func, ast.Attribute):
+                    self._visit_call(module, node.value)
+
+    def _visit_assign(self, module: ModuleInfo, node: ast.Assign):
+        """Constantes y creación de aplicaciones/routers"""
+        names = [target.id for target in node.targets if isinstance(target, ast.Name)]
+        if not names:
+            return
+
+        value = node.value
+        if isinstance(value, ast.Constant) and isinstance(value.value, (int, str)):
+            for name in names:
+                module.constants[name] = value.value
+            return
+
+        if isinstance(value, ast.Call):
+            constructor = _call_name(value.func)
+            if constructor in CONSTRUCTORS:
+                framework, kind, prefix_arg = CONSTRUCTORS[constructor]
+                prefix = _keyword_str(value, prefix_arg) if prefix_arg else ''
+                for name in names:
+                    module.objects[name] = {'framework': framework, 'kind': kind, 'prefix': prefix or ''}
+            elif _is_getenv(value) or (constructor == 'int' and value.args):
+                # PORT = os.getenv('PORT', 8000) / PORT = int(os.getenv('PORT', '8000'))
+                for name in names:
+                    module.constants[name] = value
+
+    def _visit_decorator(self, module: ModuleInfo, decorator: ast.expr):
+        """Decoradores @obj.get('/ruta'), @obj.route('/ruta', methods=[...]), ..."""
+        if not isinstance(decorator, ast.Call) or not isinstance(decorator.func, ast.Attribute):
+            return
+        if not isinstance(decorator.func.value, ast.Name) or not decorator.args:
+            return
+
+        path = decorator.args[0]
+        if not isinstance(path, ast.Constant) or not isinstance(path.value, str):
+            return
+
+        owner = decorator.func.value.id
+        attr = decorator.func.attr
+        framework = module.objects.get(owner, {}).get('framework') or self.project_type
+
+        if attr in HTTP_METHODS:
+            methods = [attr.upper()]
+        elif attr in ('route', 'api_route'):
+            methods = _keyword_list(decorator, 'methods') or ['GET']
+        elif attr == 'websocket':
+            methods = ['WEBSOCKET']
+        else:
+            return
+
+        for method in methods:
+            module.routes.append((owner, method.upper(), path.value, framework))
+
+    def _visit_call(self, module: ModuleInfo, node: ast.Call):
+        """include_router, register_blueprint y run(port=...)"""
+        attr = node.func.attr
+        if attr in ('include_router', 'register_blueprint') and node.args:
+            if isinstance(node.func.value, ast.Name):
+                prefix_arg = 'prefix' if attr == 'include_router' else 'url_prefix'
+                module.includes.append((node.func.value.id, node.args[0], _keyword_str(node, prefix_arg)))
+        elif attr == 'run':
+            for keyword in node.keywords:
+                if keyword.arg == 'port':
+                    module.run_ports.append(keyword.value)
+
+    # ==================== ENDPOINTS ====================
+
+    def emit(self, module: ModuleInfo, name: str, prefix: str, include_prefix: Optional[str],
+             endpoints: List[Dict], visited: Set):
+        """
+        Añadir las rutas de un objeto y de los routers que incluye
+
+        En FastAPI el prefijo de include_router se antepone al del router;
+        en Flask el url_prefix de register_blueprint reemplaza al del blueprint.
+        """
+        key = (module.path, name)
+        if key in visited:
+            return
+        visited.add(key)
+
+        obj = module.objects.get(name, {})
+        own_prefix = obj.get('prefix', '')
+        if include_prefix is None:
+            base = _join(prefix, own_prefix)
+        elif obj.get('framework') == 'Flask':
+            base = _join(prefix, include_prefix)
+        else:
+            base = _join(_join(prefix, include_prefix), own_prefix)
+
+        for owner, method, path, framework in module.routes:
+            if owner == name:
+                endpoints.append({
+                    'path': _join(base, path) or '/',
+                    'method': method,
+                    'type': f"{framework} Route"
+                })
+
+        for parent, child, include_prefix in module.includes:
+            if parent != name:
+                continue
+            target = self.resolve_object(module, child)
+            if target:
+                self.emit(target[0], target[1], base, include_prefix, endpoints, visited)
+
+    def resolve_object(self, module: ModuleInfo, expr: ast.expr, depth: int = 0) -> Optional[Tuple[ModuleInfo, str]]:
+        """Módulo y nombre donde se define un router referenciado en `expr`"""
+        if depth > 5:
+            return None
+
+        if isinstance(expr, ast.Name):
+            if expr.id in module.objects:
+                return module, expr.id
+            alias = module.aliases.get(expr.id)
+            if not alias or alias[2] is None:
+                return None
+            return self._resolve_from(module, alias, depth)
+
+        if isinstance(expr, ast.Attribute) and isinstance(expr.value, ast.Name):
+            target_module = self._module_for_name(module, expr.value.id)
+            if target_module:
+                return self.resolve_object(target_module, ast.Name(id=expr.attr), depth + 1)
+
+        return None
+
+    def _resolve_from(self, module: ModuleInfo, alias: Tuple[str, int, Optional[str]], depth: int):
+        """Seguir `from x import nombre` hasta la definición del objeto"""
+        source, level, attr = alias
+        path = self.resolve_module(module.path, source, level)
+        if not path:
+            return None
+        target = self.load(path)
+        if not target:
+            return None
+        return self.resolve_object(target, ast.Name(id=attr), depth + 1)
+
+    def _module_for_name(self, module: ModuleInfo, name: str) -> Optional[ModuleInfo]:
+        """Módulo del proyecto al que apunta un nombre importado"""
+        alias = module.aliases.get(name)
+        if not alias:
+            return None
+
+        source, level, attr = alias
+        if attr is not None:
+            # from paquete import submodulo
+            dotted = f"{source}.{attr}" if source else attr
+            path = self.resolve_module(module.path, dotted, level)
+        else:
+            path = self.resolve_module(module.path, source, level)
+        return self.load(path) if path else None
+
+    # ==================== PUERTO ====================
+
+    def detect_port(self, main: ModuleInfo) -> Optional[int]:
+        """Puerto de run(port=...) o, si no hay, de una constante *PORT*"""
+        for expr in main.run_ports:
+            port = self.evaluate_int(main, expr)
+            if port:
+                return port
+
+        for name, value in main.constants.items():
+            if 'PORT' in name.upper():
+                port = self.evaluate_int(main, value)
+                if port:
+                    return port
+
+        return None
+
+    def evaluate_int(self, module: ModuleInfo, value, depth: int = 0) -> Optional[int]:
+        """Valor entero de una expresión estática sencilla"""
+        if depth > 5:
+            return None
+
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, int):
+            return value
+        if isinstance(value, str):
+            return int(value) if value.isdigit() else None
+        if isinstance(value, ast.Constant):
+            return self.evaluate_int(module, value.value, depth + 1)
+
+        if isinstance(value, ast.Name):
+            if value.id in module.constants:
+                return self.evaluate_int(module, module.constants[value.id], depth + 1)
+            alias = module.aliases.get(value.id)
+            if alias and alias[2] is not None:
+                path = self.resolve_module(module.path, alias[0], alias[1])
+                target = self.load(path) if path else None
+                if target:
+                    return self.evaluate_int(target, ast.Name(id=alias[2]), depth + 1)
+            return None
+
+        if isinstance(value, ast.Attribute) and isinstance(value.value, ast.Name):
+            target = self._module_for_name(module, value.value.id)
+            if target:
+                return self.evaluate_int(target, ast.Name(id=value.attr), depth + 1)
+            return None
+
+        if isinstance(value, ast.Call):
+            # int(x), os.getenv('PORT', 8000), os.environ.get('PORT', '8000')
+            if _call_name(value.func) == 'int' and value.args:
+                return self.evaluate_int(module, value.args[0], depth + 1)
+            if _is_getenv(value) and len(value.args) > 1:
+                return self.evaluate_int(module, value.args[1], depth + 1)
+
+        return None
+
+
+# ==================== UTILIDADES ====================
+
+def _iter_statements(body: List[ast.stmt]):
+    """Sentencias de un bloque y de todos sus bloques anidados"""
+    stack = list(reversed(body))
+    while stack:
+        node = stack.pop()
+        yield node
+        for field in ('body', 'orelse', 'finalbody', 'handlers', 'cases'):
+            children = getattr(node, field, None)
+            if children:
+                stack.extend(reversed(children))
+
+
+def _call_name(func: ast.expr) -> Optional[str]:
+    """Nombre simple de la función llamada (FastAPI, fastapi.FastAPI -> FastAPI)"""
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _is_getenv(node: ast.Call) -> bool:
+    """os.getenv(...) u os.environ.get(...)"""
+    func = node.func
+    if not isinstance(func, ast.Attribute):
+        return False
+    if func.attr == 'getenv':
+        return True
+    return func.attr == 'get' and isinstance(func.value, ast.Attribute) and func.value.attr == 'environ'
+
+
+def _keyword_str(node: ast.Call, name: str) -> Optional[str]:
+    """Valor de un argumento con nombre si es un string literal"""
+    for keyword in node.keywords:
+        if keyword.arg == name and isinstance(keyword.value, ast.Constant) and isinstance(keyword.value.value, str):
+            return keyword.value.value
+    return None
+
+
+def _keyword_list(node: ast.Call, name: str) -> List[str]:
+    """Valor de un argumento con nombre si es una lista/tupla de strings literales"""
+    for keyword in node.keywords:
+        if keyword.arg == name and isinstance(keyword.value, (ast.List, ast.Tuple, ast.Set)):
+            return [
+                element.value for element in keyword.value.elts
+                if isinstance(element, ast.Constant) and isinstance(element.value, str)
+            ]
+    return []
+
+
+def _join(prefix: str, path: str) -> str:
+    """Unir prefijo y ruta sin barras duplicadas"""
+    if not prefix:
+        return path
+    if not path:
+        return prefix
+    return prefix.rstrip('/') + '/' + path.lstrip('/')
@@ -2,35 +2,184 @@
 ORION Database Manager
 Gestión simplificada de base de datos SQLite
 """
+import json
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from contextlib import contextmanager
 
-from config import DB_PATH
+from config import (
+    DB_PATH,
+    DB_JOURNAL_MODE,
+    DB_SYNCHRONOUS,
+    DB_CACHE_SIZE_KB,
+    DB_BUSY_TIMEOUT,
+    DB_STATEMENT_CACHE,
+    DB_READ_POOL,
+    DB_VACUUM_PAGES
+)
+
+# Campos de proyectos modificables con update_project
+UPDATABLE_FIELDS = ('estado', 'puerto', 'pid', 'descripcion', 'tipo', 'tecnologias', 'dependencies')
 
 
 class Database:
-    """Gestor de base de datos ORION"""
+    """
+    Gestor de base de datos ORION
+
+    Cada hilo reutiliza su propia conexión (una de escritura y, si
+    DB_READ_POOL, otra de solo lectura) en lugar de abrir y cerrar una por
+    llamada; así también se reutiliza la cache de sentencias preparadas de
+    sqlite3. La base trabaja en modo WAL: las lecturas no bloquean a las
+    escrituras ni al revés.
+    """
 
-    def __init__(self, db_path: Path = DB_PATH):
+    def __init__(self, db_path: Path = DB_PATH, pooled: bool = True):
+        """
+        Args:
+            db_path: Ruta del archivo SQLite
+            pooled: False abre y cierra una conexión por llamada, sin pragmas
+                (el comportamiento anterior; útil para comparar en benchmarks)
+        """
         self.db_path = db_path
+        self.pooled = pooled
+        self._local = threading.local()
+        self._connections: Dict[Tuple[int, bool], sqlite3.Connection] = {}
+        self._pool_lock = threading.Lock()
+        self._stats = {'opened': 0, 'reused': 0, 'readonly_fallbacks': 0}
         self._init_database()
 
+    # ==================== CONEXIONES ====================
+
     @contextmanager
-    def get_connection(self):
-        """Context manager para conexiones"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+    def get_connection(self, readonly: bool = False):
+        """
+        Context manager para conexiones
+
+        Confirma al salir del bloque más externo (o deshace si hubo una
+        excepción); los bloques anidados en el mismo hilo comparten la
+        transacción.
+
+        Args:
+            readonly: Usar la conexión de solo lectura del hilo (consultas)
+        """
+        if not self.pooled:
+            conn = self._connect(readonly=False)
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+            return
+
+        conn = self._thread_connection(readonly and DB_READ_POOL)
+        depths = self._local.__dict__.setdefault('depths', {})
+        depth = depths.get(id(conn), 0)
+        depths[id(conn)] = depth + 1
         try:
             yield conn
-            conn.commit()
+            if depth == 0:
+                conn.commit()
         except Exception:
-            conn.rollback()
+            if depth == 0:
+                conn.rollback()
             raise
         finally:
-            conn.close()
+            depths[id(conn)] = depth
+
+    def _thread_connection(self, readonly: bool) -> sqlite3.Connection:
+        """Conexión del hilo actual (se crea la primera vez)"""
+        attr = 'read_conn' if readonly else 'write_conn'
+        conn = getattr(self._local, attr, None)
+        if conn is not None:
+            with self._pool_lock:
+                self._stats['reused'] += 1
+            return conn
+
+        try:
+            conn = self._connect(readonly)
+        except sqlite3.OperationalError:
+            if not readonly:
+                raise
+            # Sin archivo -shm todavía (nadie ha escrito): usar la de escritura
+            with self._pool_lock:
+                self._stats['readonly_fallbacks'] += 1
+            return self._thread_connection(readonly=False)
+
+        setattr(self._local, attr, conn)
+        with self._pool_lock:
+            self._stats['opened'] += 1
+            self._prune_dead_threads()
+            self._connections[(threading.get_ident(), readonly)] = conn
+        return conn
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        """Abrir una conexión configurada"""
+        if not self.pooled:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            return conn
+
+        if readonly:
+            conn = sqlite3.connect(
+                f"file:{self.db_path}?mode=ro", uri=True,
+                timeout=DB_BUSY_TIMEOUT,
+                cached_statements=DB_STATEMENT_CACHE,
+                check_same_thread=False
+            )
+            conn.execute("PRAGMA query_only = ON")
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=DB_BUSY_TIMEOUT,
+                cached_statements=DB_STATEMENT_CACHE,
+                check_same_thread=False
+            )
+            # auto_vacuum solo tiene efecto en bases nuevas (antes de activar
+            # WAL); las existentes las convierte enable_incremental_vacuum
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute(f"PRAGMA journal_mode = {DB_JOURNAL_MODE}")
+
+        conn.execute(f"PRAGMA synchronous = {DB_SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size = -{DB_CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _prune_dead_threads(self):
+        """Cerrar conexiones de hilos que ya terminaron (requiere el lock)"""
+        alive = {thread.ident for thread in threading.enumerate()}
+        for key in [key for key in self._connections if key[0] not in alive]:
+            try:
+                self._connections.pop(key).close()
+            except sqlite3.Error:
+                pass
+
+    def close(self):
+        """Cerrar todas las conexiones del pool"""
+        with self._pool_lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+    def get_pool_stats(self) -> Dict:
+        """Estado del pool de conexiones"""
+        with self._pool_lock:
+            return {
+                'pooled': self.pooled,
+                'connections': len(self._connections),
+                'readonly_connections': sum(1 for _, readonly in self._connections if readonly),
+                **self._stats
+            }
 
     def _init_database(self):
         """Inicializar tablas"""
@@ -53,6 +202,48 @@ class Database:
                 )
             """)
 
+            # Contadores por estado mantenidos por triggers (get_stats en O(1))
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS proyectos_contadores (
+                    estado TEXT PRIMARY KEY,
+                    total INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_proyectos_contador_insert
+                AFTER INSERT ON proyectos
+                BEGIN
+                    INSERT INTO proyectos_contadores (estado, total) VALUES (COALESCE(NEW.estado, ''), 1)
+                    ON CONFLICT(estado) DO UPDATE SET total = total + 1;
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_proyectos_contador_delete
+                AFTER DELETE ON proyectos
+                BEGIN
+                    UPDATE proyectos_contadores SET total = total - 1
+                    WHERE estado = COALESCE(OLD.estado, '');
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_proyectos_contador_update
+                AFTER UPDATE OF estado ON proyectos
+                WHEN OLD.estado IS NOT NEW.estado
+                BEGIN
+                    UPDATE proyectos_contadores SET total = total - 1
+                    WHERE estado = COALESCE(OLD.estado, '');
+                    INSERT INTO proyectos_contadores (estado, total) VALUES (COALESCE(NEW.estado, ''), 1)
+                    ON CONFLICT(estado) DO UPDATE SET total = total + 1;
+                END
+            """)
+
+            # Recalcular al arrancar: cubre bases anteriores a los triggers
+            conn.execute("DELETE FROM proyectos_contadores")
+            conn.execute("""
+                INSERT INTO proyectos_contadores (estado, total)
+                SELECT COALESCE(estado, ''), COUNT(*) FROM proyectos GROUP BY COALESCE(estado, '')
+            """)
+
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS actividad (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -63,6 +254,36 @@ class Database:
                     FOREIGN KEY (proyecto_id) REFERENCES proyectos(id) ON DELETE CASCADE
                 )
             """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_actividad_proyecto_ts
+                ON actividad(proyecto_id, timestamp, id)
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_actividad_ts ON actividad(timestamp)")
+
+            # Eventos compactados por la retención: un registro por proyecto, día y tipo
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS actividad_diaria (
+                    proyecto_id INTEGER NOT NULL,
+                    dia TEXT NOT NULL,
+                    tipo_evento TEXT NOT NULL,
+                    eventos INTEGER NOT NULL,
+                    primero TIMESTAMP,
+                    ultimo TIMESTAMP,
+                    PRIMARY KEY (proyecto_id, dia, tipo_evento)
+                ) WITHOUT ROWID
+            """)
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analisis (
+                    proyecto TEXT PRIMARY KEY,
+                    ruta TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    main_file TEXT,
+                    fuentes TEXT,
+                    resultado TEXT NOT NULL,
+                    actualizado_en TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
 
     # ==================== PROYECTOS ====================
 
@@ -105,7 +326,7 @@ class Database:
         Returns:
             Dict con información del proyecto o None si no existe
         """
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.execute("SELECT * FROM proyectos WHERE nombre = ?", (nombre,))
             row = cursor.fetchone()
             return dict(row) if row else None
@@ -120,7 +341,7 @@ class Database:
         Returns:
             Lista de diccionarios con información de proyectos
         """
-        with self.get_connection() as conn:
+        with self.get_connection(readonly=True) as conn:
             if estado:
                 cursor = conn.execute(
                     "SELECT * FROM proyectos WHERE estado = ? ORDER BY nombre",
@@ -142,7 +363,7 @@ class Database:
         values = []
 
         for key, value in kwargs.items():
-            if key in ['estado', 'puerto', 'pid', 'descripcion', 'tipo', 'tecnologias', 'dependencies']:
+            if key in UPDATABLE_FIELDS:
                 fields.append(f"{key} = ?")
                 values.append(value)
 
@@ -160,7 +381,29 @@ class Database:
     def delete_project(self, nombre: str):
         """Eliminar proyecto"""
         with self.get_connection() as conn:
+            self._delete_projects(conn, [nombre])
+
+    @staticmethod
+    def _delete_projects(conn, names: List[str]) -> int:
+        """
+        Borrar proyectos con su análisis y su actividad en la transacción de `conn`
+
+        La actividad cuelga de proyectos.id, así que se borra antes que el
+        proyecto; los contadores por estado los ajustan los triggers.
+
+        Returns:
+            Número de eventos de actividad borrados
+        """
+        removed_activity = 0
+        for nombre in names:
+            project_id = "(SELECT id FROM proyectos WHERE nombre = ?)"
+            removed_activity += conn.execute(
+                f"DELETE FROM actividad WHERE proyecto_id = {project_id}", (nombre,)
+            ).rowcount
+            conn.execute(f"DELETE FROM actividad_diaria WHERE proyecto_id = {project_id}", (nombre,))
             conn.execute("DELETE FROM proyectos WHERE nombre = ?", (nombre,))
+            conn.execute("DELETE FROM analisis WHERE proyecto = ?", (nombre,))
+        return removed_activity
 
     # ==================== ACTIVIDAD ====================
 
@@ -172,69 +415,330 @@ class Database:
                 SELECT id, ?, ? FROM proyectos WHERE nombre = ?
             """, (tipo_evento, descripcion, nombre_proyecto))
 
+    def apply_writes(self, updates: Dict[str, Tuple[Dict, str]],
+                     events: List[Tuple[str, str, str, str]]):
+        """
+        Aplicar un lote de la cola de escritura en una sola transacción
+
+        Args:
+            updates: nombre -> (campos a actualizar, timestamp del último cambio)
+            events: Lista de (proyecto, tipo_evento, descripcion, timestamp)
+        """
+        # Un executemany por combinación de campos
+        groups: Dict[Tuple[str, ...], List[Tuple]] = {}
+        for nombre, (fields, timestamp) in updates.items():
+            keys = tuple(key for key in sorted(fields) if key in UPDATABLE_FIELDS)
+            if keys:
+                groups.setdefault(keys, []).append(
+                    tuple(fields[key] for key in keys) + (timestamp, nombre)
+                )
+
+        with self.get_connection() as conn:
+            for keys, rows in groups.items():
+                assignments = ', '.join(f"{key} = ?" for key in keys)
+                conn.executemany(
+                    f"UPDATE proyectos SET {assignments}, actualizado_en = ? WHERE nombre = ?",
+                    rows
+                )
+
+            conn.executemany("""
+                INSERT INTO actividad (proyecto_id, tipo_evento, descripcion, timestamp)
+                SELECT id, ?, ?, ? FROM proyectos WHERE nombre = ?
+            """, [(tipo, descripcion, timestamp, nombre) for nombre, tipo, descripcion, timestamp in events])
+
     def get_activity(self, nombre_proyecto: str, limit: int = 50) -> List[Dict]:
         """Obtener actividad de un proyecto"""
-        with self.get_connection() as conn:
+        return self.get_activity_page(nombre_proyecto, limit)['items']
+
+    def get_activity_page(self, nombre_proyecto: str, limit: int = 50,
+                          cursor: Optional[str] = None) -> Dict:
+        """
+        Página de actividad de un proyecto, de la más reciente a la más antigua
+
+        Paginación por clave (timestamp, id) sobre idx_actividad_proyecto_ts:
+        cada página cuesta lo mismo sin importar lo profunda que sea.
+
+        Args:
+            nombre_proyecto: Nombre del proyecto
+            limit: Eventos por página
+            cursor: Valor next_cursor de la página anterior
+
+        Returns:
+            Dict con items y next_cursor (None en la última página)
+
+        Raises:
+            ValueError: Si el cursor no tiene el formato 'timestamp|id'
+        """
+        query = """
+            SELECT a.* FROM actividad a
+            WHERE a.proyecto_id = (SELECT id FROM proyectos WHERE nombre = ?)
+        """
+        params: list = [nombre_proyecto]
+
+        if cursor:
+            timestamp, _, last_id = cursor.rpartition('|')
+            if not timestamp or not last_id.isdigit():
+                raise ValueError(f"Cursor no válido: {cursor}")
+            query += " AND (a.timestamp, a.id) < (?, ?)"
+            params += [timestamp, int(last_id)]
+
+        query += " ORDER BY a.timestamp DESC, a.id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self.get_connection(readonly=True) as conn:
+            rows = [dict(row) for row in conn.execute(query, params).fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = f"{rows[-1]['timestamp']}|{rows[-1]['id']}"
+
+        return {'items': rows, 'next_cursor': next_cursor}
+
+    def get_activity_daily(self, nombre_proyecto: str, limit: int = 90) -> List[Dict]:
+        """Resúmenes diarios de la actividad compactada de un proyecto"""
+        with self.get_connection(readonly=True) as conn:
             cursor = conn.execute("""
-                SELECT a.* FROM actividad a
-                JOIN proyectos p ON a.proyecto_id = p.id
-                WHERE p.nombre = ?
-                ORDER BY a.timestamp DESC
+                SELECT d.dia, d.tipo_evento, d.eventos, d.primero, d.ultimo
+                FROM actividad_diaria d
+                WHERE d.proyecto_id = (SELECT id FROM proyectos WHERE nombre = ?)
+                ORDER BY d.dia DESC, d.tipo_evento
                 LIMIT ?
             """, (nombre_proyecto, limit))
             return [dict(row) for row in cursor.fetchall()]
 
+    def compact_activity(self, retention_days: int) -> Dict:
+        """
+        Compactar la actividad antigua en resúmenes diarios
+
+        Los eventos con más de `retention_days` días se suman en
+        actividad_diaria y se borran; también se borran los eventos de
+        proyectos que ya no existen. Después se devuelve al sistema el
+        espacio libre con incremental_vacuum.
+
+        Returns:
+            Eventos compactados, huérfanos borrados y páginas liberadas
+        """
+        cutoff = f"-{int(retention_days)} days"
+
+        with self.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO actividad_diaria (proyecto_id, dia, tipo_evento, eventos, primero, ultimo)
+                SELECT proyecto_id, date(timestamp), tipo_evento, COUNT(*), MIN(timestamp), MAX(timestamp)
+                FROM actividad
+                WHERE timestamp < datetime('now', ?)
+                  AND proyecto_id IN (SELECT id FROM proyectos)
+                GROUP BY proyecto_id, date(timestamp), tipo_evento
+                ON CONFLICT(proyecto_id, dia, tipo_evento) DO UPDATE SET
+                    eventos = eventos + excluded.eventos,
+                    primero = MIN(primero, excluded.primero),
+                    ultimo = MAX(ultimo, excluded.ultimo)
+            """, (cutoff,))
+            compacted = conn.execute(
+                "DELETE FROM actividad WHERE timestamp < datetime('now', ?)", (cutoff,)
+            ).rowcount
+            orphans = conn.execute(
+                "DELETE FROM actividad WHERE proyecto_id NOT IN (SELECT id FROM proyectos)"
+            ).rowcount
+            conn.execute("DELETE FROM actividad_diaria WHERE proyecto_id NOT IN (SELECT id FROM proyectos)")
+
+        return {
+            'compacted': compacted,
+            'orphans': orphans,
+            'freed_pages': self.incremental_vacuum()
+        }
+
+    @contextmanager
+    def _autocommit_connection(self):
+        """Conexión aparte en modo autocommit, para pragmas que no admiten transacción"""
+        conn = sqlite3.connect(self.db_path, timeout=DB_BUSY_TIMEOUT, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enable_incremental_vacuum(self) -> bool:
+        """
+        Convertir una base existente a auto_vacuum=INCREMENTAL
+
+        La conversión necesita un VACUUM completo que reescribe el archivo:
+        la hace una sola vez el mantenimiento en segundo plano, nunca una
+        petición.
+
+        Returns:
+            True si la base se ha convertido ahora
+        """
+        with self._autocommit_connection() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return False
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        return True
+
+    def incremental_vacuum(self, pages: int = DB_VACUUM_PAGES) -> int:
+        """
+        Devolver páginas libres al sistema de archivos
+
+        No hace nada hasta que enable_incremental_vacuum haya convertido la base.
+
+        Returns:
+            Páginas liberadas
+        """
+        with self._autocommit_connection() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                return 0
+
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # executescript recorre la pragma hasta el final (execute libera una sola página)
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+            # Llevar el truncado al archivo principal y vaciar el WAL
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+
+        return before - after
+
+    # ==================== ANÁLISIS ====================
+
+    def get_analysis(self, nombre: str) -> Optional[Dict]:
+        """
+        Obtener el último análisis guardado de un proyecto
+
+        Args:
+            nombre: Nombre del proyecto
+
+        Returns:
+            Dict con ruta, hash, main_file, fuentes (lista) y resultado (dict),
+            o None si el proyecto no se ha analizado
+        """
+        with self.get_connection(readonly=True) as conn:
+            cursor = conn.execute("SELECT * FROM analisis WHERE proyecto = ?", (nombre,))
+            row = cursor.fetchone()
+
+        if not row:
+            return None
+
+        analysis = dict(row)
+        analysis['fuentes'] = json.loads(analysis['fuentes'] or '[]')
+        analysis['resultado'] = json.loads(analysis['resultado'])
+        return analysis
+
+    def save_analyses(self, analyses: List[Dict]):
+        """
+        Guardar (o reemplazar) análisis de proyectos en una sola transacción
+
+        Args:
+            analyses: Lista de dicts con nombre, ruta, hash (del contenido de
+                los archivos analizados), main_file, fuentes (archivos leídos)
+                y resultado (análisis completo)
+        """
+        if not analyses:
+            return
+
+        with self.get_connection() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO analisis
+                (proyecto, ruta, hash, main_file, fuentes, resultado, actualizado_en)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, [
+                (
+                    a['nombre'], a['ruta'], a['hash'], a['main_file'],
+                    json.dumps(a['fuentes']), json.dumps(a['resultado'], ensure_ascii=False)
+                )
+                for a in analyses
+            ])
+
     # ==================== UTILIDADES ====================
 
-    def sync_projects(self, projects_info: List[Dict]):
+    def sync_projects(self, projects_info: List[Dict], prune: bool = False) -> Dict:
         """
         Sincronizar proyectos descubiertos del sistema de archivos con la base de datos
 
+        Todo el lote se escribe en una sola transacción:
+
         - Agrega nuevos proyectos que no existen en BD
-        - Actualiza información de proyectos existentes
+        - Actualiza información de proyectos existentes (solo si cambió)
+        - Con prune, elimina los proyectos que ya no están en disco junto con
+          su análisis y su actividad
 
         Args:
             projects_info: Lista de diccionarios con información de proyectos descubiertos
+            prune: Eliminar proyectos ausentes de la lista (solo para el
+                descubrimiento completo; se ignora si la lista viene vacía,
+                p. ej. con el portfolio desmontado)
+
+        Returns:
+            Dict con el número de proyectos insertados, actualizados, sin cambios
+            y eliminados, y de eventos de actividad eliminados
         """
-        for project in projects_info:
-            existing = self.get_project(project['nombre'])
+        rows = {
+            project['nombre']: (
+                project['ruta'],
+                project.get('puerto'),
+                project.get('tipo', ''),
+                project.get('tecnologias', ''),
+                ','.join(project.get('dependencies', []))
+            )
+            for project in projects_info
+        }
 
-            if not existing:
-                # Agregar nuevo proyecto
-                try:
-                    self.add_project(
-                        nombre=project['nombre'],
-                        ruta=project['ruta'],
-                        puerto=project.get('puerto'),
-                        tipo=project.get('tipo', ''),
-                        tecnologias=project.get('tecnologias', ''),
-                        dependencies=','.join(project.get('dependencies', []))
-                    )
-                except sqlite3.IntegrityError:
-                    pass
-            else:
-                # Actualizar info
-                self.update_project(
-                    nombre=project['nombre'],
-                    puerto=project.get('puerto'),
-                    tipo=project.get('tipo', ''),
-                    tecnologias=project.get('tecnologias', ''),
-                    dependencies=','.join(project.get('dependencies', []))
+        with self.get_connection() as conn:
+            existing = {
+                row['nombre']: (row['ruta'], row['puerto'], row['tipo'], row['tecnologias'], row['dependencies'])
+                for row in conn.execute(
+                    "SELECT nombre, ruta, puerto, tipo, tecnologias, dependencies FROM proyectos"
                 )
+            }
+
+            inserted = [nombre for nombre in rows if nombre not in existing]
+            updated = [nombre for nombre in rows if nombre in existing and existing[nombre] != rows[nombre]]
+            changed = inserted + updated
+
+            conn.executemany("""
+                INSERT INTO proyectos (nombre, ruta, puerto, tipo, tecnologias, dependencies, descripcion, estado)
+                VALUES (?, ?, ?, ?, ?, ?, '', 'detenido')
+                ON CONFLICT(nombre) DO UPDATE SET
+                    ruta = excluded.ruta,
+                    puerto = excluded.puerto,
+                    tipo = excluded.tipo,
+                    tecnologias = excluded.tecnologias,
+                    dependencies = excluded.dependencies,
+                    actualizado_en = CURRENT_TIMESTAMP
+            """, [(nombre,) + rows[nombre] for nombre in changed])
+
+            removed = []
+            removed_activity = 0
+            if prune and rows:
+                removed = [nombre for nombre in existing if nombre not in rows]
+                removed_activity = self._delete_projects(conn, removed)
+
+        return {
+            'inserted': len(inserted),
+            'updated': len(updated),
+            'unchanged': len(rows) - len(changed),
+            'removed': len(removed),
+            'removed_activity': removed_activity
+        }
 
     def get_stats(self) -> Dict:
-        """Obtener estadísticas"""
-        with self.get_connection() as conn:
-            cursor = conn.execute("""
-                SELECT
-                    COUNT(*) as total,
-                    SUM(CASE WHEN estado = 'activo' THEN 1 ELSE 0 END) as activos,
-                    SUM(CASE WHEN estado = 'detenido' THEN 1 ELSE 0 END) as detenidos,
-                    SUM(CASE WHEN estado = 'error' THEN 1 ELSE 0 END) as errores
-                FROM proyectos
-            """)
-            row = cursor.fetchone()
-            return dict(row) if row else {}
+        """
+        Obtener estadísticas
+
+        Lee los contadores por estado que mantienen los triggers de
+        proyectos: el coste no depende del número de proyectos.
+        """
+        with self.get_connection(readonly=True) as conn:
+            counts = {
+                row['estado']: row['total']
+                for row in conn.execute("SELECT estado, total FROM proyectos_contadores")
+            }
+
+        return {
+            'total': sum(counts.values()),
+            'activos': counts.get('activo', 0),
+            'detenidos': counts.get('detenido', 0),
+            'errores': counts.get('error', 0)
+        }
 
 
 # Instancia global
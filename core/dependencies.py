@@ -0,0 +1,346 @@
+"""
+ORION Dependency Index
+Índice de dependencias del portfolio (PEP 508) con búsquedas inversas
+"""
+import hashlib
+import json
+import re
+from typing import Dict, Iterable, List, Optional
+
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
+from packaging.utils import canonicalize_name
+from packaging.version import InvalidVersion, Version
+
+from core.database import db, Database
+
+# Nombre de paquete al inicio de una línea que packaging no sabe parsear
+NAME_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*')
+
+
+# ==================== PARSEO ====================
+
+def parse_requirements(content: str) -> List[Dict]:
+    """
+    Parsear un requirements.txt siguiendo PEP 508
+
+    Se ignoran comentarios, líneas vacías y opciones de pip (-r, -e,
+    --index-url...); las líneas partidas con '\\' se unen antes de parsear.
+
+    Args:
+        content: Contenido del archivo
+
+    Returns:
+        Lista de dicts con paquete (nombre normalizado), nombre, especificador,
+        extras, marcador y linea (texto original); un paquete aparece una vez
+        por marcador (p. ej. una versión por python_version)
+    """
+    entries: List[Dict] = []
+    seen = set()
+
+    for line in content.replace('\\\n', ' ').splitlines():
+        line = line.split(' #', 1)[0].strip()
+        if not line or line.startswith(('#', '-')):
+            continue
+
+        # Opciones por requisito (--hash=...) al final de la línea
+        line = line.split(' --', 1)[0].strip()
+
+        try:
+            requirement = Requirement(line)
+            entry = {
+                'paquete': canonicalize_name(requirement.name),
+                'nombre': requirement.name,
+                'especificador': str(requirement.specifier),
+                'extras': ','.join(sorted(requirement.extras)),
+                'marcador': str(requirement.marker) if requirement.marker else '',
+                'linea': line
+            }
+        except InvalidRequirement:
+            match = NAME_PATTERN.match(line)
+            if not match:
+                continue
+            entry = {
+                'paquete': canonicalize_name(match.group(0)),
+                'nombre': match.group(0),
+                'especificador': '',
+                'extras': '',
+                'marcador': '',
+                'linea': line
+            }
+
+        # Las variantes por marcador se conservan; una línea repetida se indexa una vez
+        key = (entry['paquete'], entry['marcador'])
+        if key in seen:
+            continue
+        seen.add(key)
+        entries.append(entry)
+
+    return entries
+
+
+def specifiers_overlap(left: str, right: str) -> bool:
+    """
+    ¿Existe alguna versión que cumpla ambos especificadores?
+
+    Aproximación: se prueban las versiones que aparecen en los dos
+    especificadores, una versión inmediatamente superior a cada una y la
+    versión 0. Suficiente para preguntas como "¿quién usa psutil<6?".
+    """
+    try:
+        left_set, right_set = SpecifierSet(left or ''), SpecifierSet(right or '')
+    except InvalidSpecifier:
+        return False
+
+    if not left_set or not right_set:
+        return True
+
+    candidates = {Version('0')}
+    for spec in list(left_set) + list(right_set):
+        try:
+            version = Version(spec.version.rstrip('.*'))
+        except InvalidVersion:
+            continue
+        candidates.add(version)
+        candidates.add(Version('.'.join(str(part) for part in version.release) + '.0.0.0.1'))
+
+    return any(
+        left_set.contains(version, prereleases=True) and right_set.contains(version, prereleases=True)
+        for version in candidates
+    )
+
+
+# ==================== ÍNDICE ====================
+
+class DependencyIndex:
+    """
+    Tablas normalizadas de dependencias por proyecto
+
+    `dependencias` tiene como clave (paquete, proyecto), de modo que las
+    búsquedas inversas por paquete recorren solo sus filas. Cada proyecto
+    guarda un hash de sus requisitos y solo se reescriben los proyectos
+    cuyo requirements.txt cambió.
+    """
+
+    def __init__(self, database: Database = db):
+        self.db = database
+        self._init_tables()
+
+    def _init_tables(self):
+        """Crear tablas del índice"""
+        with self.db.get_connection() as conn:
+            # El índice se deriva de los requirements: una tabla con la clave
+            # antigua (sin marcador) se descarta y la próxima sync la rehace
+            primary_key = [row['name'] for row in conn.execute("PRAGMA table_info(dependencias)") if row['pk']]
+            if primary_key and 'marcador' not in primary_key:
+                conn.execute("DROP TABLE dependencias")
+                conn.execute("DROP TABLE IF EXISTS dependencias_fuente")
+
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS dependencias (
+                    paquete TEXT NOT NULL,
+                    proyecto TEXT NOT NULL,
+                    nombre TEXT NOT NULL,
+                    especificador TEXT NOT NULL DEFAULT '',
+                    extras TEXT NOT NULL DEFAULT '',
+                    marcador TEXT NOT NULL DEFAULT '',
+                    linea TEXT,
+                    PRIMARY KEY (paquete, proyecto, marcador)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_dependencias_proyecto ON dependencias(proyecto)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS dependencias_fuente (
+                    proyecto TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL
+                )
+            """)
+
+    # ==================== ESCRITURA ====================
+
+    def sync(self, projects_info: List[Dict], prune: bool = False) -> Dict:
+        """
+        Actualizar el índice con proyectos descubiertos
+
+        Args:
+            projects_info: Proyectos analizados (con la clave 'requirements')
+            prune: Eliminar proyectos indexados que no estén en la lista
+                (solo para sincronizaciones completas del portfolio)
+
+        Returns:
+            Número de proyectos reindexados y eliminados
+        """
+        hashes = {
+            project['nombre']: self._hash(project.get('requirements', []))
+            for project in projects_info
+        }
+
+        with self.db.get_connection() as conn:
+            stored = {
+                row['proyecto']: row['hash']
+                for row in conn.execute("SELECT proyecto, hash FROM dependencias_fuente")
+            }
+
+            changed = [
+                project for project in projects_info
+                if stored.get(project['nombre']) != hashes[project['nombre']]
+            ]
+
+            for project in changed:
+                nombre = project['nombre']
+                conn.execute("DELETE FROM dependencias WHERE proyecto = ?", (nombre,))
+                conn.executemany("""
+                    INSERT OR REPLACE INTO dependencias
+                    (paquete, proyecto, nombre, especificador, extras, marcador, linea)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (e['paquete'], nombre, e['nombre'], e['especificador'], e['extras'], e['marcador'], e['linea'])
+                    for e in project.get('requirements', [])
+                ])
+                conn.execute(
+                    "INSERT OR REPLACE INTO dependencias_fuente (proyecto, hash) VALUES (?, ?)",
+                    (nombre, hashes[nombre])
+                )
+
+            removed = []
+            if prune:
+                removed = [nombre for nombre in stored if nombre not in hashes]
+                self._remove(conn, removed)
+
+        return {'reindexed': len(changed), 'removed': len(removed)}
+
+    def remove(self, project_names: Iterable[str]):
+        """Quitar proyectos del índice"""
+        with self.db.get_connection() as conn:
+            self._remove(conn, list(project_names))
+
+    def _remove(self, conn, project_names: List[str]):
+        """Quitar proyectos del índice dentro de una transacción abierta"""
+        rows = [(nombre,) for nombre in project_names]
+        conn.executemany("DELETE FROM dependencias WHERE proyecto = ?", rows)
+        conn.executemany("DELETE FROM dependencias_fuente WHERE proyecto = ?", rows)
+
+    def _hash(self, requirements: List[Dict]) -> str:
+        """Hash estable de la lista de requisitos de un proyecto"""
+        payload = json.dumps(requirements, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    # ==================== CONSULTAS ====================
+
+    def find(self, package: str, specifier: Optional[str] = None,
+             version: Optional[str] = None) -> List[Dict]:
+        """
+        Proyectos que dependen de un paquete
+
+        Args:
+            package: Nombre del paquete (cualquier grafía: PyYAML, pyyaml; zope.interface, Zope_Interface)
+            specifier: Solo proyectos cuyo rango admite alguna versión de este
+                especificador (p. ej. '<6')
+            version: Solo proyectos cuyo rango admite esta versión exacta
+
+        Returns:
+            Filas del índice ordenadas por proyecto
+        """
+        with self.db.get_connection(readonly=True) as conn:
+            cursor = conn.execute("""
+                SELECT proyecto, nombre, especificador, extras, marcador, linea
+                FROM dependencias
+                WHERE paquete = ?
+                ORDER BY proyecto
+            """, (canonicalize_name(package),))
+            rows = [dict(row) for row in cursor.fetchall()]
+
+        # Los filtros se evalúan una vez por especificador distinto, no por fila
+        if specifier:
+            SpecifierSet(specifier)  # Valida el especificador (InvalidSpecifier)
+            matches = {
+                spec: specifiers_overlap(spec, specifier)
+                for spec in {row['especificador'] for row in rows}
+            }
+            rows = [row for row in rows if matches[row['especificador']]]
+
+        if version:
+            candidate = Version(version)
+            matches = {
+                spec: SpecifierSet(spec).contains(candidate, prereleases=True)
+                for spec in {row['especificador'] for row in rows}
+            }
+            rows = [row for row in rows if matches[row['especificador']]]
+
+        return rows
+
+    def skew(self, min_projects: int = 2) -> List[Dict]:
+        """
+        Paquetes usados con especificadores distintos en varios proyectos
+
+        Args:
+            min_projects: Mínimo de proyectos que usan el paquete
+
+        Returns:
+            Por paquete: número de proyectos, proyectos por especificador y
+            versiones fijadas con '=='
+        """
+        with self.db.get_connection(readonly=True) as conn:
+            cursor = conn.execute("""
+                SELECT paquete, especificador, proyecto
+                FROM dependencias
+                WHERE paquete IN (
+                    SELECT paquete FROM dependencias
+                    GROUP BY paquete
+                    HAVING COUNT(DISTINCT proyecto) >= ? AND COUNT(DISTINCT especificador) > 1
+                )
+                ORDER BY paquete, especificador, proyecto
+            """, (min_projects,))
+            rows = cursor.fetchall()
+
+        report: Dict[str, Dict] = {}
+        for row in rows:
+            entry = report.setdefault(row['paquete'], {
+                'paquete': row['paquete'],
+                'proyectos': set(),
+                'especificadores': {},
+                'versiones_fijadas': set()
+            })
+            # Un proyecto puede tener varias filas del paquete (una por marcador)
+            entry['proyectos'].add(row['proyecto'])
+            projects = entry['especificadores'].setdefault(row['especificador'] or '*', [])
+            if row['proyecto'] not in projects:
+                projects.append(row['proyecto'])
+            for spec in row['especificador'].split(','):
+                if spec.startswith('==') and '*' not in spec:
+                    entry['versiones_fijadas'].add(spec[2:])
+
+        for entry in report.values():
+            entry['proyectos'] = len(entry['proyectos'])
+            entry['variantes'] = len(entry['especificadores'])
+            entry['versiones_fijadas'] = sorted(entry['versiones_fijadas'])
+
+        return sorted(report.values(), key=lambda e: (-e['variantes'], -e['proyectos'], e['paquete']))
+
+    def summary(self, limit: int = 50) -> Dict:
+        """Paquetes más usados del portfolio"""
+        with self.db.get_connection(readonly=True) as conn:
+            totals = conn.execute("""
+                SELECT COUNT(DISTINCT paquete) AS paquetes, COUNT(*) AS dependencias
+                FROM dependencias
+            """).fetchone()
+            projects = conn.execute("SELECT COUNT(*) FROM dependencias_fuente").fetchone()[0]
+            cursor = conn.execute("""
+                SELECT paquete, COUNT(DISTINCT proyecto) AS proyectos, COUNT(DISTINCT especificador) AS variantes
+                FROM dependencias
+                GROUP BY paquete
+                ORDER BY proyectos DESC, paquete
+                LIMIT ?
+            """, (limit,))
+            top = [dict(row) for row in cursor.fetchall()]
+
+        return {
+            'proyectos_indexados': projects,
+            'paquetes': totals['paquetes'],
+            'dependencias': totals['dependencias'],
+            'top': top
+        }
+
+
+# Instancia global
+dependency_index = DependencyIndex()
@@ -0,0 +1,92 @@
+"""
+ORION Executor
+Pool acotado de hilos para ejecutar código bloqueante fuera del event loop
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from config import EXECUTOR_MAX_WORKERS
+
+
+class BlockingExecutor:
+    """
+    Ejecutor de llamadas bloqueantes (sqlite3, psutil, git, sleeps)
+
+    Los handlers async hacen `await executor.run(func, ...)` y el event
+    loop sigue atendiendo otras peticiones. Lleva contadores para observar
+    la saturación del pool.
+    """
+
+    def __init__(self, max_workers: int = EXECUTOR_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="orion-worker")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._saturated = 0
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecutar una función bloqueante en el pool
+
+        Args:
+            func: Función síncrona
+            *args, **kwargs: Argumentos de la función
+
+        Returns:
+            El valor retornado por la función
+        """
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            self._submitted += 1
+            if self._in_flight >= self.max_workers:
+                self._saturated += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+        failed = False
+        try:
+            return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+        except Exception:
+            failed = True
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._completed += 1
+                if failed:
+                    self._failed += 1
+
+    def get_stats(self) -> Dict:
+        """Métricas del pool: tareas en curso, en cola y saturación"""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'in_flight': self._in_flight,
+                'queued': max(0, self._in_flight - self.max_workers),
+                'peak_in_flight': self._peak_in_flight,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'failed': self._failed,
+                'saturated_submissions': self._saturated
+            }
+
+    def shutdown(self):
+        """Esperar tareas pendientes y cerrar el pool"""
+        self._pool.shutdown(wait=True)
+
+
+# Instancia global
+executor = BlockingExecutor()
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Atajo para ejecutar una llamada bloqueante en el pool global"""
+    return await executor.run(func, *args, **kwargs)
@@ -0,0 +1,294 @@
+"""
+ORION Log Index
+Índice lateral incremental de los archivos de log (líneas, niveles y offsets)
+"""
+import json
+import os
+import threading
+from collections import Counter
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from config import LOGS_DIR, LOG_INDEX_STRIDE, LOG_INDEX_SAVE_BYTES
+from core.log_reader import LEVEL_PATTERN, tail_log, parse_log_line, list_segments, segment_stats
+
+# Versión del formato del índice lateral (cambiarla lo reconstruye)
+INDEX_VERSION = 1
+INDEX_SUFFIX = '.idx'
+
+# Bytes iniciales que identifican un archivo (detecta rotaciones y truncados)
+HEAD_BYTES = 64
+
+# Bytes leídos por bloque al indexar
+READ_BLOCK = 1024 * 1024
+
+
+class LogIndex:
+    """
+    Índice lateral por archivo de log
+
+    Junto a cada LOGS_DIR/<nombre>.log se guarda <nombre>.log.idx con el
+    número de líneas, el offset hasta el que se ha indexado, el conteo por
+    nivel y el offset de cada LOG_INDEX_STRIDE líneas. En cada consulta solo
+    se leen los bytes escritos desde el último offset; si el archivo se
+    truncó o se reemplazó (otro inodo u otro comienzo) se reconstruye.
+
+    Los segmentos rotados (core.log_rotation) no cambian una vez escritos:
+    sus totales se leen una vez y se guardan por (ruta, mtime).
+    """
+
+    def __init__(self, logs_dir: Path = LOGS_DIR, stride: int = LOG_INDEX_STRIDE,
+                 save_bytes: int = LOG_INDEX_SAVE_BYTES):
+        self.logs_dir = Path(logs_dir)
+        self.stride = stride
+        self.save_bytes = save_bytes
+        self._states: Dict[str, Dict] = {}
+        self._segments: Dict[str, Tuple[float, Dict]] = {}
+        self._lock = threading.Lock()
+
+    # ==================== CONSULTAS ====================
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Resumen de todos los logs de LOGS_DIR
+
+        Returns:
+            Por proyecto: total_entries, last_entry, levels y size_bytes del
+            log activo más sus segmentos rotados (segments, archived_bytes)
+        """
+        summary = {}
+
+        with self._lock:
+            for log_file in self.logs_dir.glob("*.log"):
+                try:
+                    state = self._update(log_file)
+                except OSError:
+                    continue
+
+                archived = self._segment_totals(log_file)
+                levels = Counter(state['levels'])
+                levels.update(archived['levels'])
+
+                summary[log_file.stem] = {
+                    "total_entries": state['lines'] + (1 if state['partial'] else 0) + archived['lines'],
+                    "last_entry": state['last_entry'],
+                    "levels": dict(levels),
+                    "size_bytes": state['size'],
+                    "segments": archived['segments'],
+                    "archived_bytes": archived['bytes']
+                }
+
+            self._prune()
+
+        return summary
+
+    def get(self, log_file: Path) -> Optional[Dict]:
+        """Estado actualizado del índice de un archivo (None si no existe)"""
+        with self._lock:
+            try:
+                state = self._update(Path(log_file))
+            except OSError:
+                return None
+            return {
+                'lines': state['lines'],
+                'offset': state['offset'],
+                'levels': dict(state['levels']),
+                'stride': self.stride,
+                'offsets': list(state['offsets'])
+            }
+
+    def line_offset(self, log_file: Path, line: int) -> int:
+        """
+        Offset desde el que leer para llegar a la línea `line` (0 = primera)
+
+        Devuelve el offset guardado más cercano por debajo; desde ahí quedan
+        como mucho LOG_INDEX_STRIDE - 1 líneas por saltar.
+        """
+        state = self.get(log_file)
+        if not state or not state['offsets'] or line <= 0:
+            return 0
+        return state['offsets'][min(line // self.stride, len(state['offsets']) - 1)]
+
+    def save_all(self):
+        """Guardar en disco los índices con cambios pendientes"""
+        with self._lock:
+            for path, state in self._states.items():
+                if state['offset'] != state['saved_offset']:
+                    self._save(Path(path), state)
+
+    # ==================== INDEXACIÓN ====================
+
+    def _update(self, log_file: Path) -> Dict:
+        """Poner al día el índice de un archivo (requiere el lock)"""
+        key = str(log_file)
+        st = os.stat(log_file)
+        head = self._read_head(log_file)
+
+        state = self._states.get(key) or self._load(log_file)
+        if (state is None
+                or state['ino'] != st.st_ino
+                or st.st_size < state['offset']
+                or not head.startswith(state['head'])):
+            state = self._empty(st.st_ino, head)
+
+        if st.st_size > state['offset'] or state['last_entry'] is None:
+            self._index_from(log_file, state)
+            state['head'] = head
+            # Recién rotado, la última entrada está en el segmento anterior
+            lines = tail_log(log_file, 1)
+            state['last_entry'] = parse_log_line(lines[0]) if lines else None
+
+        state['size'] = st.st_size
+        state['partial'] = st.st_size > state['offset']
+        self._states[key] = state
+
+        if state['offset'] - state['saved_offset'] >= self.save_bytes or state['saved_offset'] < 0:
+            self._save(log_file, state)
+
+        return state
+
+    def _index_from(self, log_file: Path, state: Dict):
+        """Indexar las líneas completas escritas desde state['offset']"""
+        with open(log_file, 'rb') as f:
+            f.seek(state['offset'])
+            pending = b''
+
+            while True:
+                block = f.read(READ_BLOCK)
+                if not block:
+                    break
+
+                data = pending + block
+                cut = data.rfind(b'\n') + 1
+                if not cut:
+                    pending = data
+                    continue
+                complete, pending = data[:cut], data[cut:]
+
+                self._index_lines(complete, state)
+
+    def _index_lines(self, data: bytes, state: Dict):
+        """Contar líneas y niveles de un bloque de líneas completas"""
+        lines = data.split(b'\n')[:-1]
+        base = state['offset']
+
+        first = (-state['lines']) % self.stride
+        if first < len(lines):
+            starts = list(accumulate((len(line) + 1 for line in lines), initial=base))
+            state['offsets'].extend(starts[first:len(lines):self.stride])
+
+        state['levels'].update(level.decode('ascii') for level in LEVEL_PATTERN.findall(data))
+        state['lines'] += len(lines)
+        state['offset'] = base + len(data)
+
+    def _segment_totals(self, log_file: Path) -> Dict:
+        """Líneas, niveles y bytes de los segmentos rotados de un log (requiere el lock)"""
+        totals = {'lines': 0, 'levels': Counter(), 'bytes': 0, 'segments': 0}
+
+        for segment in list_segments(log_file):
+            key = str(segment)
+            try:
+                mtime = segment.stat().st_mtime
+                cached = self._segments.get(key)
+                if cached is None or cached[0] != mtime:
+                    cached = (mtime, segment_stats(segment))
+                    self._segments[key] = cached
+            except OSError:
+                # La retención lo borró mientras se leía
+                continue
+
+            stats = cached[1]
+            totals['lines'] += stats['lines']
+            totals['levels'].update(stats['levels'])
+            totals['bytes'] += stats['bytes']
+            totals['segments'] += 1
+
+        return totals
+
+    def _read_head(self, log_file: Path) -> str:
+        """Primeros HEAD_BYTES bytes del archivo, en hexadecimal"""
+        with open(log_file, 'rb') as f:
+            return f.read(HEAD_BYTES).hex()
+
+    def _empty(self, ino: int, head: str) -> Dict:
+        """Índice vacío de un archivo"""
+        return {
+            'ino': ino,
+            'head': head,
+            'offset': 0,
+            'lines': 0,
+            'levels': Counter(),
+            'offsets': [],
+            'last_entry': None,
+            'size': 0,
+            'partial': False,
+            'saved_offset': -1
+        }
+
+    # ==================== PERSISTENCIA ====================
+
+    def _sidecar(self, log_file: Path) -> Path:
+        """Ruta del índice lateral de un log"""
+        return log_file.with_name(log_file.name + INDEX_SUFFIX)
+
+    def _load(self, log_file: Path) -> Optional[Dict]:
+        """Leer el índice lateral (None si no existe, es de otra versión o está corrupto)"""
+        try:
+            with open(self._sidecar(log_file), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('version') != INDEX_VERSION or data.get('stride') != self.stride:
+            return None
+
+        state = self._empty(data['ino'], data['head'])
+        state.update({
+            'offset': data['offset'],
+            'lines': data['lines'],
+            'levels': Counter(data['levels']),
+            'offsets': data['offsets'],
+            'saved_offset': data['offset']
+        })
+        return state
+
+    def _save(self, log_file: Path, state: Dict):
+        """Escribir el índice lateral de forma atómica"""
+        sidecar = self._sidecar(log_file)
+        tmp = sidecar.with_name(sidecar.name + '.tmp')
+        data = {
+            'version': INDEX_VERSION,
+            'stride': self.stride,
+            'ino': state['ino'],
+            'head': state['head'],
+            'offset': state['offset'],
+            'lines': state['lines'],
+            'levels': dict(state['levels']),
+            'offsets': state['offsets']
+        }
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp, sidecar)
+            state['saved_offset'] = state['offset']
+        except OSError:
+            pass
+
+    def _prune(self):
+        """Olvidar índices de logs que ya no existen (requiere el lock)"""
+        for key in [key for key in self._states if not os.path.exists(key)]:
+            del self._states[key]
+        for key in [key for key in self._segments if not os.path.exists(key)]:
+            del self._segments[key]
+
+        for sidecar in self.logs_dir.glob(f"*.log{INDEX_SUFFIX}"):
+            if not sidecar.with_name(sidecar.name[:-len(INDEX_SUFFIX)]).exists():
+                try:
+                    sidecar.unlink()
+                except OSError:
+                    pass
+
+
+# Instancia global
+log_index = LogIndex()
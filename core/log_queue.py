@@ -0,0 +1,239 @@
+"""
+ORION Log Queue
+Logging asíncrono: los handlers de archivo y consola escriben en un hilo aparte
+"""
+import atexit
+import copy
+import logging
+import logging.handlers
+import queue
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from config import LOG_QUEUE_SIZE, LOG_QUEUE_MODE, LOG_QUEUE_BATCH
+
+# Modos de la cola llena admitidos
+QUEUE_MODES = ('drop', 'block')
+
+# Atributo de los registros que nunca se descartan (ver Logger.output)
+BLOCKING_ATTR = 'orion_blocking'
+
+
+class _PipelineHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler de un logger: encola el registro junto a sus handlers reales
+
+    Solo se resuelve el mensaje (msg % args) y el traceback, para que el
+    registro no dependa de objetos que cambien después; el formateo JSON
+    y la escritura quedan para el hilo del pipeline.
+    """
+
+    def __init__(self, pipeline: 'LogPipeline', handlers: Tuple[logging.Handler, ...]):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+        self.handlers = handlers
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        self.pipeline.put(self.handlers, record, getattr(record, BLOCKING_ATTR, False))
+
+
+class LogPipeline:
+    """
+    Cola única de registros de log con un hilo escritor
+
+    Los loggers de ORION y de cada proyecto solo encolan; el hilo saca lo
+    acumulado (hasta LOG_QUEUE_BATCH registros) y lo escribe de una vez,
+    con un flush por handler y lote en lugar de uno por registro. Así una
+    petición nunca espera al disco ni a la consola.
+
+    Con la cola llena (LOG_QUEUE_SIZE):
+        drop:  el registro se descarta y se cuenta en 'dropped'
+        block: quien escribe el log espera a que haya sitio ('waits')
+    Los registros de Logger.output esperan siempre, en cualquier modo.
+    """
+
+    def __init__(self, maxsize: int = LOG_QUEUE_SIZE, mode: str = LOG_QUEUE_MODE,
+                 batch: int = LOG_QUEUE_BATCH):
+        if mode not in QUEUE_MODES:
+            raise ValueError(f"Modo de cola de logs no válido: {mode} (opciones: {', '.join(QUEUE_MODES)})")
+
+        self.mode = mode
+        self.batch = batch
+        self.queue: queue.Queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {'enqueued': 0, 'written': 0, 'dropped': 0, 'dropped_warnings': 0, 'waits': 0, 'batches': 0}
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self):
+        """Arrancar el hilo escritor (idempotente)"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="orion-log-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Detener el hilo tras escribir todo lo encolado"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopping = True
+
+        if thread and thread.is_alive():
+            self.queue.put(None)
+            thread.join(timeout=10)
+
+        # Lo que quede (hilo no arrancado o detenido por timeout) se escribe aquí
+        self._drain()
+
+    def _run(self):
+        """Bucle del hilo escritor"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+
+            items = [item]
+            while len(items) < self.batch:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._write(items)
+                    return
+                items.append(item)
+
+            self._write(items)
+
+    def _drain(self):
+        """Escribir en el hilo actual lo que haya en la cola"""
+        while True:
+            items = []
+            while len(items) < self.batch:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    items.append(item)
+            if not items:
+                return
+            self._write(items)
+
+    # ==================== ESCRITURA ====================
+
+    def handler_for(self, handlers: List[logging.Handler]) -> logging.Handler:
+        """QueueHandler que envía al pipeline los registros destinados a `handlers`"""
+        return _PipelineHandler(self, tuple(handlers))
+
+    def put(self, handlers: Tuple[logging.Handler, ...], record: logging.LogRecord, block: bool = False):
+        """
+        Encolar un registro según el modo (drop o block)
+
+        Con block=True se espera sitio aunque el modo sea drop: la salida
+        de los procesos (core.output_pump) no se pierde y la espera llega
+        hasta el proceso hijo como backpressure.
+        """
+        if self._thread is None and not self._stopping:
+            self.start()
+
+        if self._stopping:
+            # Tras stop() ya no hay hilo: se escribe directamente
+            self._write([(handlers, record)])
+            return
+
+        item = (handlers, record)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            if not (block or self.mode == 'block'):
+                with self._lock:
+                    self._stats['dropped'] += 1
+                    if record.levelno >= logging.WARNING:
+                        self._stats['dropped_warnings'] += 1
+                return
+            with self._lock:
+                self._stats['waits'] += 1
+            self.queue.put(item)
+
+        with self._lock:
+            self._stats['enqueued'] += 1
+
+    def _write(self, items: List[Tuple[Tuple[logging.Handler, ...], logging.LogRecord]]):
+        """Escribir un lote agrupando los registros por handler"""
+        by_handler: Dict[logging.Handler, List[logging.LogRecord]] = {}
+        for handlers, record in items:
+            for handler in handlers:
+                if record.levelno >= handler.level:
+                    by_handler.setdefault(handler, []).append(record)
+
+        for handler, records in by_handler.items():
+            emit_batch(handler, records)
+
+        with self._lock:
+            self._stats['written'] += len(items)
+            self._stats['batches'] += 1
+
+    # ==================== CONSULTAS ====================
+
+    def get_stats(self) -> Dict:
+        """Estado de la cola"""
+        with self._lock:
+            return {
+                'running': bool(self._thread and self._thread.is_alive()),
+                'mode': self.mode,
+                'capacity': self.queue.maxsize,
+                'depth': self.queue.qsize(),
+                **self._stats
+            }
+
+
+def emit_batch(handler: logging.Handler, records: List[logging.LogRecord]):
+    """
+    Escribir varios registros en un handler con un solo flush
+
+    Los handlers con su propio emit_batch (RotatingLogHandler) lo usan; los
+    StreamHandler escriben todas las líneas y vacían el stream al final; el
+    resto recibe los registros uno a uno.
+    """
+    if hasattr(handler, 'emit_batch'):
+        handler.emit_batch(records)
+        return
+
+    if not isinstance(handler, logging.StreamHandler):
+        for record in records:
+            handler.handle(record)
+        return
+
+    with handler.lock:
+        for record in records:
+            if not handler.filter(record):
+                continue
+            try:
+                handler.stream.write(handler.format(record) + handler.terminator)
+            except Exception:
+                handler.handleError(record)
+        try:
+            handler.flush()
+        except Exception:
+            pass
+
+
+# Instancia global
+log_pipeline = LogPipeline()
+
+# Antes del logging.shutdown de la salida: escribir lo que quede en la cola
+atexit.register(log_pipeline.stop)
@@ -0,0 +1,459 @@
+"""
+ORION Log Reader
+Lectura de archivos de log desde el final, por bloques, incluidos los segmentos rotados
+"""
+import base64
+import bisect
+import glob
+import gzip
+import heapq
+import json
+import os
+import re
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from config import LOGS_DIR, LOG_TAIL_BLOCK, LOG_TAIL_MAX_LINE
+
+# Nivel en las líneas del JsonFormatter
+LEVEL_PATTERN = re.compile(rb'"level": "([A-Z]+)"')
+
+# Segmentos rotados: <nombre>.log.<AAAAMMDDTHHMMSS>[-n][.gz]
+SEGMENT_PATTERN = re.compile(r'^(?P<base>.+\.log)\.(?P<stamp>\d{8}T\d{6}(?:-\d+)?)(?P<gz>\.gz)?$')
+
+# Índice de un segmento comprimido (<segmento>.gz.idx): miembros gzip, líneas y niveles
+SEGMENT_INDEX_SUFFIX = '.idx'
+
+
+# ==================== LECTURA INVERSA ====================
+
+def iter_lines_reverse(path: Union[str, Path], block_size: int = LOG_TAIL_BLOCK,
+                       max_line: int = LOG_TAIL_MAX_LINE) -> Iterator[str]:
+    """
+    Recorrer las líneas de un archivo de la última a la primera
+
+    Se lee hacia atrás en bloques de `block_size` bytes y solo se decodifican
+    las líneas que se entregan, así que leer las últimas N líneas cuesta lo
+    mismo con un archivo de 1 MB que con uno de 2 GB. Las líneas vacías se
+    omiten y las de más de `max_line` bytes se recortan a su comienzo, de
+    modo que la memoria queda acotada a un bloque más una línea.
+
+    Args:
+        path: Archivo a leer (un segmento .gz se lee miembro a miembro)
+        block_size: Bytes por lectura
+        max_line: Bytes máximos por línea
+
+    Yields:
+        Líneas decodificadas (UTF-8, bytes inválidos reemplazados), sin '\\n'
+    """
+    for _, line in iter_lines_reverse_at(path, None, block_size, max_line):
+        yield line
+
+
+def iter_lines_reverse_at(path: Union[str, Path], end: Optional[int] = None,
+                          block_size: int = LOG_TAIL_BLOCK,
+                          max_line: int = LOG_TAIL_MAX_LINE) -> Iterator[Tuple[int, str]]:
+    """
+    Como iter_lines_reverse, pero desde el offset `end` y con el offset de cada línea
+
+    Args:
+        path: Archivo a leer
+        end: Offset donde empezar a leer hacia atrás (None = final del archivo);
+            en los segmentos .gz los offsets son del contenido descomprimido
+
+    Yields:
+        (offset donde empieza la línea, línea); el offset sirve como `end`
+        para seguir leyendo más tarde justo antes de esa línea
+    """
+    if str(path).endswith('.gz'):
+        yield from _iter_gzip_reverse_at(Path(path), end, max_line)
+        return
+
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        if end is not None:
+            position = max(0, min(end, position))
+        pending = b''
+
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            data = f.read(size) + pending
+            parts = data.split(b'\n')
+
+            # parts[0] puede ser el final de una línea que empieza en un bloque anterior
+            pending = parts[0][:max_line]
+            yield from _reverse_parts(parts[1:], position + len(parts[0]) + 1, max_line)
+
+        if pending.strip():
+            yield 0, pending.decode('utf-8', errors='replace').rstrip('\r')
+
+
+def _reverse_parts(parts: List[bytes], start: int, max_line: int) -> Iterator[Tuple[int, str]]:
+    """
+    Entregar de la última a la primera las líneas de `parts`, la primera en el offset `start`
+
+    Los offsets se cuentan desde el comienzo: la última parte puede llevar
+    pegado un trozo recortado a max_line de la línea que sigue, y contar
+    desde el final los desplazaría.
+    """
+    starts = []
+    for raw in parts:
+        starts.append(start)
+        start += len(raw) + 1
+
+    for offset, raw in zip(reversed(starts), reversed(parts)):
+        if raw.strip():
+            yield offset, raw[:max_line].decode('utf-8', errors='replace').rstrip('\r')
+
+
+def _iter_gzip_reverse_at(path: Path, end: Optional[int], max_line: int) -> Iterator[Tuple[int, str]]:
+    """
+    Lectura inversa de un segmento comprimido
+
+    Los segmentos que escribe la rotación son gzip de varios miembros, cada
+    uno con líneas completas; su índice guarda dónde empieza cada miembro,
+    así que basta descomprimir un miembro cada vez. Un .gz sin índice se
+    descomprime entero.
+    """
+    index = load_segment_index(path)
+
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        members = index['members'] if index else [(0, 0)]
+        ends = [member[0] for member in members[1:]] + [size]
+
+        for position in reversed(range(len(members))):
+            compressed_offset, raw_offset = members[position]
+            if end is not None and raw_offset >= end:
+                continue
+
+            f.seek(compressed_offset)
+            data = gzip.decompress(f.read(ends[position] - compressed_offset))
+            if end is not None:
+                data = data[:end - raw_offset]
+
+            parts = data.split(b'\n')
+            yield from _reverse_parts(parts[1:], raw_offset + len(parts[0]) + 1, max_line)
+            if parts[0].strip():
+                yield raw_offset, parts[0][:max_line].decode('utf-8', errors='replace').rstrip('\r')
+
+
+def tail_lines(path: Union[str, Path], limit: int) -> List[str]:
+    """
+    Últimas `limit` líneas no vacías de un archivo, en orden de escritura
+
+    Raises:
+        OSError: Si el archivo no se puede abrir
+    """
+    if limit <= 0:
+        return []
+    lines = list(islice(iter_lines_reverse(path), limit))
+    lines.reverse()
+    return lines
+
+
+def parse_log_line(line: str) -> Dict:
+    """Entrada JSON de una línea de log (las líneas de texto plano se envuelven)"""
+    try:
+        entry = json.loads(line)
+        if isinstance(entry, dict):
+            return entry
+    except json.JSONDecodeError:
+        pass
+
+    return {
+        "timestamp": datetime.utcnow().isoformat() + 'Z',
+        "level": "INFO",
+        "message": line.strip()
+    }
+
+
+# ==================== LECTURA HACIA DELANTE ====================
+
+def iter_lines_forward(path: Union[str, Path], start: int = 0,
+                       block_size: int = LOG_TAIL_BLOCK) -> Iterator[Tuple[int, str]]:
+    """
+    Líneas completas de un archivo desde el offset `start`
+
+    Una línea final sin '\\n' (a medio escribir) no se entrega. En los
+    segmentos .gz los offsets son del contenido descomprimido y se empieza
+    a descomprimir en el miembro que contiene `start`.
+
+    Yields:
+        (offset justo después de la línea, línea); el offset sirve como
+        `start` para seguir leyendo más tarde
+    """
+    with open(path, 'rb') as raw:
+        if str(path).endswith('.gz'):
+            index = load_segment_index(Path(path))
+            members = index['members'] if index else [[0, 0]]
+            compressed_offset, raw_offset = members[max(0, bisect.bisect_right([m[1] for m in members], start) - 1)]
+            raw.seek(compressed_offset)
+            f = gzip.GzipFile(fileobj=raw, mode='rb')
+            f.seek(start - raw_offset)
+        else:
+            f = raw
+            f.seek(start)
+
+        position = start
+        pending = b''
+        for block in iter(lambda: f.read(block_size), b''):
+            parts = (pending + block).split(b'\n')
+            pending = parts.pop()
+            for line in parts:
+                position += len(line) + 1
+                yield position, line.decode('utf-8', errors='replace').rstrip('\r')
+
+
+# ==================== SEGMENTOS ROTADOS ====================
+
+def list_segments(log_file: Union[str, Path]) -> List[Path]:
+    """
+    Segmentos rotados de un log, del más reciente al más antiguo
+
+    Mientras un segmento se comprime coexisten la versión plana y la .gz;
+    se usa la plana hasta que la compresión termina.
+    """
+    log_file = Path(log_file)
+    segments: Dict[str, Path] = {}
+
+    for path in log_file.parent.glob(f"{glob.escape(log_file.name)}.*"):
+        match = SEGMENT_PATTERN.match(path.name)
+        if not match or match['base'] != log_file.name:
+            continue
+        if match['stamp'] not in segments or not match['gz']:
+            segments[match['stamp']] = path
+
+    return [segments[stamp] for stamp in sorted(segments, key=segment_order, reverse=True)]
+
+
+def segment_order(stamp: str) -> Tuple[str, int]:
+    """Clave de orden de un segmento: marca de tiempo y sufijo numérico (-1, -2...)"""
+    stamp, _, suffix = stamp.partition('-')
+    return stamp, int(suffix or 0)
+
+
+def log_chain(log_file: Union[str, Path]) -> List[Path]:
+    """Log activo seguido de sus segmentos rotados (del más reciente al más antiguo)"""
+    return [Path(log_file)] + list_segments(log_file)
+
+
+def tail_log(log_file: Union[str, Path], limit: int) -> List[str]:
+    """
+    Últimas `limit` líneas de un log, continuando en sus segmentos rotados
+
+    Returns:
+        Líneas en orden de escritura ([] si no hay ninguna)
+    """
+    if limit <= 0:
+        return []
+
+    lines: List[str] = []
+    for path in log_chain(log_file):
+        try:
+            lines.extend(islice(iter_lines_reverse(path), limit - len(lines)))
+        except OSError:
+            # Aún no existe (log recién rotado) o la retención lo acaba de borrar
+            continue
+        if len(lines) >= limit:
+            break
+
+    lines.reverse()
+    return lines
+
+
+def segment_index_path(segment: Path) -> Path:
+    """Ruta del índice de un segmento comprimido"""
+    return segment.with_name(segment.name + SEGMENT_INDEX_SUFFIX)
+
+
+def load_segment_index(segment: Path) -> Optional[Dict]:
+    """Índice de un segmento .gz (None si no tiene o está corrupto)"""
+    try:
+        with open(segment_index_path(segment), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        return index if index.get('members') else None
+    except (OSError, ValueError):
+        return None
+
+
+def segment_stats(segment: Path) -> Dict:
+    """
+    Líneas, niveles y tamaño en disco de un segmento rotado
+
+    Los .gz lo traen en su índice; un segmento plano (a medio comprimir) o
+    un .gz sin índice se cuentan leyéndolos.
+    """
+    if segment.name.endswith('.gz'):
+        index = load_segment_index(segment)
+        if index is not None:
+            return {'lines': index['lines'], 'levels': index['levels'], 'bytes': segment.stat().st_size}
+
+    lines = 0
+    levels: Dict[str, int] = {}
+    opener = gzip.open if segment.name.endswith('.gz') else open
+    with opener(segment, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            lines += block.count(b'\n')
+            for level in LEVEL_PATTERN.findall(block):
+                name = level.decode('ascii')
+                levels[name] = levels.get(name, 0) + 1
+
+    return {'lines': lines, 'levels': levels, 'bytes': segment.stat().st_size}
+
+
+# ==================== MEZCLA ====================
+
+def list_log_files(logs_dir: Path = LOGS_DIR) -> List[Path]:
+    """Archivos de log de LOGS_DIR"""
+    logs_dir = Path(logs_dir)
+    return sorted(logs_dir.glob("*.log")) if logs_dir.exists() else []
+
+
+def timestamp_key(timestamp: str) -> str:
+    """Timestamp ISO comparable como texto ('...:05Z' -> '...:05.000000Z')"""
+    if timestamp.endswith('Z') and '.' not in timestamp[-8:]:
+        return timestamp[:-1] + '.000000Z'
+    return timestamp
+
+
+def stable_name(path: Path) -> str:
+    """Nombre de un archivo que no cambia al comprimirlo (cursores e índice de búsqueda)"""
+    return path.name[:-3] if path.name.endswith('.gz') else path.name
+
+
+def _iter_entries(log_file: Path, position: Dict[str, int], since: Optional[str],
+                  until: Optional[str], after: Optional[Tuple]) -> Iterator[Tuple]:
+    """
+    Entradas de un log y de sus segmentos, de la más reciente a la más antigua
+
+    Las líneas que no son JSON heredan el timestamp de la entrada siguiente
+    (la escrita justo después), de modo que el flujo sigue ordenado. Se
+    deja de leer al pasar de `since`.
+
+    Args:
+        after: Clave de orden de la última entrada ya entregada (cursor);
+            solo salen las estrictamente anteriores
+
+    Yields:
+        (clave de timestamp, log, posición en la cadena, offset, archivo, entrada);
+        los cuatro primeros campos son la clave de orden de la mezcla
+    """
+    inherited = None
+
+    for rank, path in enumerate(log_chain(log_file)):
+        name = stable_name(path)
+        try:
+            if inherited is None:
+                inherited = datetime.utcfromtimestamp(path.stat().st_mtime).isoformat() + 'Z'
+
+            for offset, line in iter_lines_reverse_at(path, position.get(name)):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    entry = None
+                if not isinstance(entry, dict):
+                    entry = {"timestamp": inherited, "level": "INFO", "message": line.strip()}
+
+                timestamp = str(entry.get('timestamp') or inherited)
+                inherited = timestamp
+                key = timestamp_key(timestamp)
+
+                if since and key < since:
+                    return
+                if until and key > until:
+                    continue
+                # El log activo va antes que sus segmentos: posición negativa
+                order = (key, log_file.name, -rank, offset)
+                if after and order >= after:
+                    continue
+                yield order + (name, entry)
+        except OSError:
+            # El archivo desapareció o no se puede leer (rotación, retención, permisos)
+            continue
+
+
+def _decode_cursor(cursor: str) -> Tuple[Dict[str, int], Tuple]:
+    """
+    Offsets por archivo y clave de orden de la última entrada de un cursor
+
+    Raises:
+        ValueError: Si el cursor no es uno emitido por merge_logs
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        offsets = {str(name): int(offset) for name, offset in state['offsets'].items()}
+        key, log_name, rank, offset = state['last']
+        return offsets, (str(key), str(log_name), int(rank), int(offset))
+    except (ValueError, KeyError, TypeError, AttributeError):
+        # binascii.Error, UnicodeError y JSONDecodeError son ValueError
+        raise ValueError("Cursor no válido") from None
+
+
+def merge_logs(paths: List[Path], limit: int = 500, since: Optional[str] = None,
+               until: Optional[str] = None, levels: Optional[Iterable[str]] = None,
+               cursor: Optional[str] = None) -> Dict:
+    """
+    Entradas más recientes de varios archivos de log, mezcladas por timestamp
+
+    Mezcla en k vías (heapq.merge) sobre un lector inverso por log: solo se
+    leen y parsean las líneas que llegan a salir (más una por log), y se
+    para en cuanto se tienen `limit` entradas. Cada log continúa en sus
+    segmentos rotados, que solo se abren al agotar los más recientes.
+
+    El cursor guarda la clave de orden de la última entrada entregada y la
+    página siguiente empieza estrictamente después: ninguna entrada sale en
+    dos páginas, tampoco las que comparten timestamp.
+
+    Args:
+        paths: Logs activos (LOGS_DIR/<nombre>.log)
+        limit: Entradas máximas
+        since: Solo entradas con timestamp >= since (ISO, p. ej. '2024-05-01T10:00')
+        until: Solo entradas con timestamp <= until (inclusivo)
+        levels: Solo estos niveles (INFO, WARNING, ERROR...)
+        cursor: next_cursor de la página anterior, para seguir hacia atrás
+
+    Returns:
+        Dict con items (de la más reciente a la más antigua) y next_cursor
+        (None si no quedan entradas)
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    since = timestamp_key(since) if since else None
+    until = timestamp_key(until) if until else None
+    wanted = {level.upper() for level in levels} if levels else None
+
+    position: Dict[str, int] = {}
+    after = None
+    if cursor:
+        position, after = _decode_cursor(cursor)
+
+    streams = [_iter_entries(path, position, since, until, after) for path in paths]
+
+    items: List[Dict] = []
+    consumed = dict(position)
+    last = None
+    exhausted = True
+
+    for *order, name, entry in heapq.merge(*streams, reverse=True):
+        if len(items) >= limit:
+            exhausted = False
+            break
+        consumed[name] = order[3]
+        last = order
+        if wanted is None or str(entry.get('level', 'INFO')).upper() in wanted:
+            items.append(entry)
+
+    next_cursor = None
+    if not exhausted:
+        state = {'offsets': consumed, 'last': last}
+        next_cursor = base64.urlsafe_b64encode(
+            json.dumps(state, separators=(',', ':')).encode('utf-8')
+        ).decode('ascii')
+
+    return {'items': items, 'next_cursor': next_cursor}
@@ -0,0 +1,235 @@
+"""
+ORION Log Rotation
+Rotación de los logs por tamaño y antigüedad, con segmentos gzip y retención
+"""
+import gzip
+import json
+import logging.handlers
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from config import (
+    LOG_ROTATE_BYTES,
+    LOG_ROTATE_INTERVAL,
+    LOG_RETENTION_SEGMENTS,
+    LOG_RETENTION_DAYS,
+    LOG_COMPRESS,
+    LOG_SEGMENT_MEMBER
+)
+from core.log_reader import LEVEL_PATTERN, SEGMENT_PATTERN, list_segments, segment_index_path, segment_order
+
+# Una compresión a la vez: la rotación de varios logs no compite por CPU
+_compress_lock = threading.Lock()
+
+
+# ==================== SEGMENTOS ====================
+
+def compress_segment(segment: Path, member_bytes: int = LOG_SEGMENT_MEMBER) -> Path:
+    """
+    Comprimir un segmento rotado a <segmento>.gz y borrar el original
+
+    El .gz tiene un miembro gzip por cada ~member_bytes de líneas completas
+    (sigue siendo un gzip válido para zcat/zgrep). El índice <segmento>.gz.idx
+    guarda dónde empieza cada miembro, para leer el segmento hacia atrás
+    sin descomprimirlo entero, y el número de líneas por nivel para el
+    resumen de logs.
+
+    Returns:
+        Ruta del segmento comprimido
+    """
+    target = segment.with_name(segment.name + '.gz')
+    tmp = target.with_name(target.name + '.tmp')
+    members: List[List[int]] = []
+    levels: Dict[str, int] = {}
+    lines = 0
+
+    with open(segment, 'rb') as source, open(tmp, 'wb') as output:
+        raw_offset = 0
+        pending = b''
+        while True:
+            block = source.read(member_bytes)
+            data = pending + block
+            if not data:
+                break
+
+            # Cada miembro termina en un salto de línea (salvo el final del archivo)
+            cut = data.rfind(b'\n') + 1 if block else len(data)
+            if not cut:
+                pending = data
+                continue
+            chunk, pending = data[:cut], data[cut:]
+
+            members.append([output.tell(), raw_offset])
+            output.write(gzip.compress(chunk, compresslevel=6, mtime=0))
+            raw_offset += len(chunk)
+            lines += chunk.count(b'\n')
+            for level in LEVEL_PATTERN.findall(chunk):
+                name = level.decode('ascii')
+                levels[name] = levels.get(name, 0) + 1
+
+            if not block:
+                break
+
+    index = {'members': members, 'lines': lines, 'levels': levels, 'size': raw_offset}
+    with open(segment_index_path(target), 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+
+    os.replace(tmp, target)
+    os.unlink(segment)
+    return target
+
+
+def apply_retention(log_file: Path, keep: int = LOG_RETENTION_SEGMENTS,
+                    max_age_days: float = LOG_RETENTION_DAYS) -> List[Path]:
+    """
+    Borrar los segmentos que exceden la retención
+
+    Args:
+        log_file: Log activo
+        keep: Segmentos que se conservan como máximo (los más recientes)
+        max_age_days: Antigüedad máxima de un segmento (0 = sin límite)
+
+    Returns:
+        Segmentos borrados
+    """
+    segments = list_segments(log_file)
+    expired = segments[keep:] if keep else []
+
+    if max_age_days:
+        cutoff = time.time() - max_age_days * 86400
+        for segment in segments[:keep] if keep else segments:
+            try:
+                if segment.stat().st_mtime < cutoff:
+                    expired.append(segment)
+            except OSError:
+                continue
+
+    for segment in expired:
+        for path in (segment, segment_index_path(segment)):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    return expired
+
+
+# ==================== HANDLER ====================
+
+class RotatingLogHandler(logging.handlers.BaseRotatingHandler):
+    """
+    FileHandler que rota el log por tamaño o por antigüedad
+
+    Al rotar, LOGS_DIR/<nombre>.log pasa a <nombre>.log.<AAAAMMDDTHHMMSS>
+    y se abre un archivo nuevo; un hilo aparte comprime el segmento a .gz
+    y aplica la retención, de modo que quien escribe el log no espera a la
+    compresión. Los lectores de core.log_reader recorren el log activo y
+    sus segmentos como si fueran un único archivo.
+    """
+
+    def __init__(self, filename, max_bytes: int = LOG_ROTATE_BYTES, interval: float = LOG_ROTATE_INTERVAL,
+                 keep: int = LOG_RETENTION_SEGMENTS, max_age_days: float = LOG_RETENTION_DAYS,
+                 compress: bool = LOG_COMPRESS):
+        super().__init__(filename, 'a', encoding='utf-8')
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.keep = keep
+        self.max_age_days = max_age_days
+        self.compress = compress
+
+        try:
+            started = os.stat(self.baseFilename).st_mtime
+        except OSError:
+            started = time.time()
+        self.rollover_at = started + interval if interval else None
+
+        # Segmentos planos que quedaron sin comprimir (p. ej. por un reinicio)
+        self._finish_segments()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """¿Hay que rotar antes de escribir este registro?"""
+        if self.stream is None:
+            self.stream = self._open()
+
+        size = self.stream.tell()
+        if not size:
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        return bool(self.rollover_at and time.time() >= self.rollover_at)
+
+    def emit_batch(self, records: List[logging.LogRecord]):
+        """Escribir varios registros con un solo flush (ver core.log_queue)"""
+        with self.lock:
+            for record in records:
+                if not self.filter(record):
+                    continue
+                try:
+                    if self.shouldRollover(record):
+                        self.doRollover()
+                    self.stream.write(self.format(record) + self.terminator)
+                except Exception:
+                    self.handleError(record)
+            try:
+                if self.stream:
+                    self.stream.flush()
+            except Exception:
+                pass
+
+    def doRollover(self):
+        """Renombrar el log activo a un segmento y abrir uno nuevo"""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        now = time.time()
+        segment = self._segment_name(now)
+        if os.path.exists(self.baseFilename):
+            os.rename(self.baseFilename, segment)
+
+        self.stream = self._open()
+        self.rollover_at = now + self.interval if self.interval else None
+        self._finish_segments()
+
+    def _segment_name(self, now: float) -> Path:
+        """
+        Nombre del próximo segmento
+
+        Si ya hay segmentos del mismo segundo se añade un sufijo mayor que
+        el de todos ellos, aunque la retención haya borrado los primeros:
+        reutilizar un sufijo libre haría pasar al segmento nuevo por antiguo.
+        """
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))
+        suffixes = [
+            segment_order(SEGMENT_PATTERN.match(segment.name)['stamp'])[1]
+            for segment in list_segments(self.baseFilename)
+            if SEGMENT_PATTERN.match(segment.name)['stamp'].startswith(stamp)
+        ]
+        if not suffixes:
+            return Path(f"{self.baseFilename}.{stamp}")
+        return Path(f"{self.baseFilename}.{stamp}-{max(suffixes) + 1}")
+
+    def _finish_segments(self):
+        """Comprimir segmentos planos y aplicar la retención en segundo plano"""
+        threading.Thread(
+            target=self._compress_and_prune,
+            name=f"orion-log-rotation-{Path(self.baseFilename).stem}",
+            daemon=True
+        ).start()
+
+    def _compress_and_prune(self):
+        """Trabajo del hilo de rotación"""
+        log_file = Path(self.baseFilename)
+        with _compress_lock:
+            if self.compress:
+                for segment in list_segments(log_file):
+                    match = SEGMENT_PATTERN.match(segment.name)
+                    if match and not match['gz']:
+                        try:
+                            compress_segment(segment)
+                        except OSError:
+                            continue
+            apply_retention(log_file, self.keep, self.max_age_days)
@@ -0,0 +1,467 @@
+"""
+ORION Log Search
+Búsqueda de texto completo en los logs con un índice FTS5 incremental en orion.db
+"""
+import gzip
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import LOGS_DIR, LOG_SEARCH_INTERVAL, LOG_SEARCH_BATCH
+from core.database import db, Database
+from core.log_reader import iter_lines_forward, list_log_files, log_chain, stable_name, timestamp_key
+
+# Bytes iniciales que identifican un archivo (detectan rotaciones y truncados)
+HEAD_BYTES = 64
+
+# Campos del JsonFormatter que no forman parte del texto buscable
+META_FIELDS = ('timestamp', 'level', 'project')
+
+
+class LogSearch:
+    """
+    Índice de búsqueda de los logs de LOGS_DIR
+
+    Cada entrada de log (del archivo activo y de sus segmentos rotados) se
+    guarda en logs_entradas con su proyecto, nivel y timestamp, y su texto
+    se indexa en la tabla FTS5 logs_fts. Un hilo de fondo lee cada
+    LOG_SEARCH_INTERVAL segundos solo lo escrito desde el offset guardado
+    en logs_archivos, en transacciones de LOG_SEARCH_BATCH entradas.
+
+    Al rotar un log, lo ya indexado del archivo activo pasa a pertenecer a
+    su segmento (se reconoce por los primeros bytes); cuando la retención
+    borra un segmento, sus entradas salen del índice.
+    """
+
+    def __init__(self, database: Database = db, logs_dir: Path = LOGS_DIR,
+                 interval: float = LOG_SEARCH_INTERVAL, batch: int = LOG_SEARCH_BATCH):
+        self.db = database
+        self.logs_dir = Path(logs_dir)
+        self.interval = interval
+        self.batch = batch
+        self._ingest_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'cycles': 0, 'indexed': 0, 'purged': 0, 'errors': 0, 'last_cycle_ms': 0.0}
+        self._init_tables()
+
+    def _init_tables(self):
+        """Crear tablas del índice"""
+        with self.db.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS logs_archivos (
+                    id INTEGER PRIMARY KEY,
+                    archivo TEXT NOT NULL UNIQUE,
+                    proyecto TEXT NOT NULL,
+                    ino INTEGER,
+                    cabecera TEXT NOT NULL DEFAULT '',
+                    offset INTEGER NOT NULL DEFAULT 0,
+                    entradas INTEGER NOT NULL DEFAULT 0,
+                    completo INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS logs_entradas (
+                    id INTEGER PRIMARY KEY,
+                    origen INTEGER NOT NULL,
+                    proyecto TEXT NOT NULL,
+                    nivel TEXT NOT NULL,
+                    ts TEXT NOT NULL,
+                    texto TEXT NOT NULL,
+                    entrada TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_entradas_proyecto_ts ON logs_entradas(proyecto, ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_entradas_ts ON logs_entradas(ts)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_logs_entradas_origen ON logs_entradas(origen)")
+
+            # FTS5 con contenido externo: el texto se guarda una sola vez
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
+                    texto,
+                    content='logs_entradas',
+                    content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_logs_entradas_insert
+                AFTER INSERT ON logs_entradas BEGIN
+                    INSERT INTO logs_fts(rowid, texto) VALUES (NEW.id, NEW.texto);
+                END
+            """)
+            conn.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_logs_entradas_delete
+                AFTER DELETE ON logs_entradas BEGIN
+                    INSERT INTO logs_fts(logs_fts, rowid, texto) VALUES ('delete', OLD.id, OLD.texto);
+                END
+            """)
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self):
+        """Arrancar el hilo de indexación (idempotente)"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="orion-log-search", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detener el hilo (la pasada en curso termina en el lote actual)"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2 + 5)
+            self._thread = None
+
+    def _run(self):
+        """Bucle de indexación"""
+        while not self._stop_event.is_set():
+            try:
+                self.ingest()
+            except Exception:
+                with self._stats_lock:
+                    self._stats['errors'] += 1
+            self._stop_event.wait(self.interval)
+
+    # ==================== INDEXACIÓN ====================
+
+    def ingest(self) -> int:
+        """
+        Indexar lo escrito en los logs desde la pasada anterior
+
+        Returns:
+            Entradas indexadas
+        """
+        with self._ingest_lock:
+            started = time.perf_counter()
+            with self.db.get_connection(readonly=True) as conn:
+                rows = {row['archivo']: dict(row) for row in conn.execute("SELECT * FROM logs_archivos")}
+
+            indexed = 0
+            present = set()
+            for log_file in list_log_files(self.logs_dir):
+                chain = log_chain(log_file)
+                present.update(stable_name(path) for path in chain)
+                self._follow_rotation(log_file, chain[1:], rows)
+
+                # Del segmento más antiguo al archivo activo
+                for path in reversed(chain):
+                    if self._stop_event.is_set():
+                        break
+                    try:
+                        indexed += self._ingest_file(path, log_file.stem, rows)
+                    except OSError:
+                        # Rotado, comprimido o borrado durante la lectura: se retoma en la siguiente pasada
+                        continue
+
+            self._purge([row for name, row in rows.items() if name not in present])
+
+            with self._stats_lock:
+                self._stats['cycles'] += 1
+                self._stats['indexed'] += indexed
+                self._stats['last_cycle_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            return indexed
+
+    def _follow_rotation(self, log_file: Path, segments: List[Path], rows: Dict[str, Dict]):
+        """
+        Si el archivo activo ya no es el que se indexó, reasignar lo indexado
+
+        Lo indexado pasa al segmento que empieza igual (la rotación lo
+        renombró) y la indexación sigue en él desde el mismo offset. Si
+        ningún segmento coincide, el archivo se truncó o se reemplazó y sus
+        entradas se descartan.
+        """
+        row = rows.get(log_file.name)
+        if row is None:
+            return
+
+        try:
+            st = os.stat(log_file)
+            head = self._read_head(log_file)
+        except OSError:
+            st, head = None, ''
+
+        if st and st.st_ino == row['ino'] and st.st_size >= row['offset'] and head.startswith(row['cabecera']):
+            return
+
+        for segment in segments:
+            name = stable_name(segment)
+            if name in rows:
+                continue
+            try:
+                if self._read_head(segment).startswith(row['cabecera']):
+                    with self.db.get_connection() as conn:
+                        conn.execute("UPDATE logs_archivos SET archivo = ? WHERE id = ?", (name, row['id']))
+                    rows[name] = {**row, 'archivo': name}
+                    del rows[log_file.name]
+                    return
+            except OSError:
+                continue
+
+        self._purge([row])
+        del rows[log_file.name]
+
+    def _ingest_file(self, path: Path, project: str, rows: Dict[str, Dict]) -> int:
+        """Indexar las entradas completas de un archivo desde su offset guardado"""
+        name = stable_name(path)
+        row = rows.get(name)
+        live = path.name.endswith('.log')
+
+        if row is not None and row['completo']:
+            return 0
+        st = os.stat(path)
+        if live and row is not None and st.st_size == row['offset']:
+            return 0
+
+        if row is None:
+            with self.db.get_connection() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO logs_archivos (archivo, proyecto, ino, cabecera) VALUES (?, ?, ?, ?)",
+                    (name, project, st.st_ino, self._read_head(path))
+                )
+                row = {'id': cursor.lastrowid, 'archivo': name, 'proyecto': project, 'ino': st.st_ino,
+                       'cabecera': '', 'offset': 0, 'entradas': 0, 'completo': 0}
+            rows[name] = row
+
+        # Las líneas que no son JSON heredan el timestamp de la anterior
+        inherited = datetime.utcfromtimestamp(st.st_mtime).isoformat() + 'Z'
+        entries = []
+        offset = row['offset']
+        total = 0
+
+        for end, line in iter_lines_forward(path, row['offset']):
+            offset = end
+            if not line.strip():
+                continue
+
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                entry = None
+            if not isinstance(entry, dict):
+                entry = {"timestamp": inherited, "level": "INFO", "message": line.strip()}
+                line = json.dumps(entry, ensure_ascii=False)
+
+            inherited = str(entry.get('timestamp') or inherited)
+            entries.append((
+                row['id'],
+                project,
+                str(entry.get('level', 'INFO')).upper(),
+                timestamp_key(inherited),
+                self._searchable_text(entry),
+                line
+            ))
+
+            if len(entries) >= self.batch:
+                total += self._commit(row, entries, offset, path, complete=False)
+                entries = []
+                if self._stop_event.is_set():
+                    return total
+
+        # Un segmento no vuelve a crecer: no hace falta volver a leerlo
+        total += self._commit(row, entries, offset, path, complete=not live)
+        return total
+
+    def _commit(self, row: Dict, entries: List[tuple], offset: int, path: Path, complete: bool) -> int:
+        """Guardar un lote de entradas y el offset alcanzado en una transacción"""
+        head = self._read_head(path) if row['offset'] < HEAD_BYTES else row['cabecera']
+
+        with self.db.get_connection() as conn:
+            conn.executemany("""
+                INSERT INTO logs_entradas (origen, proyecto, nivel, ts, texto, entrada)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, entries)
+            conn.execute("""
+                UPDATE logs_archivos
+                SET offset = ?, entradas = entradas + ?, cabecera = ?, completo = ?
+                WHERE id = ?
+            """, (offset, len(entries), head, int(complete), row['id']))
+
+        row.update(offset=offset, entradas=row['entradas'] + len(entries), cabecera=head, completo=int(complete))
+        return len(entries)
+
+    def _purge(self, rows: Iterable[Dict]):
+        """Sacar del índice las entradas de archivos que ya no existen"""
+        for row in rows:
+            while True:
+                with self.db.get_connection() as conn:
+                    deleted = conn.execute("""
+                        DELETE FROM logs_entradas WHERE id IN (
+                            SELECT id FROM logs_entradas WHERE origen = ? LIMIT ?
+                        )
+                    """, (row['id'], self.batch)).rowcount
+                    if not deleted:
+                        conn.execute("DELETE FROM logs_archivos WHERE id = ?", (row['id'],))
+                with self._stats_lock:
+                    self._stats['purged'] += deleted
+                if not deleted:
+                    break
+
+    def _read_head(self, path: Path) -> str:
+        """Primeros HEAD_BYTES bytes (descomprimidos) de un archivo, en hexadecimal"""
+        opener = gzip.open if path.name.endswith('.gz') else open
+        with opener(path, 'rb') as f:
+            return f.read(HEAD_BYTES).hex()
+
+    def _searchable_text(self, entry: Dict) -> str:
+        """Mensaje, excepción y campos extra de una entrada, como texto"""
+        parts = []
+        for key, value in entry.items():
+            if key in META_FIELDS or value is None:
+                continue
+            parts.append(value if isinstance(value, str) else json.dumps(value, ensure_ascii=False))
+        return ' '.join(parts)
+
+    # ==================== CONSULTAS ====================
+
+    def search(self, query: Optional[str] = None, project: Optional[str] = None,
+               levels: Optional[Iterable[str]] = None, since: Optional[str] = None,
+               until: Optional[str] = None, limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """
+        Buscar entradas de log
+
+        Con texto, los resultados van por relevancia (bm25); sin texto, del
+        más reciente al más antiguo. Paginación por clave, como la actividad.
+
+        Args:
+            query: Palabras a buscar (todas deben aparecer; 'palabra*' busca por prefijo)
+            project: Solo este proyecto (nombre del archivo de log)
+            levels: Solo estos niveles (INFO, WARNING, ERROR...)
+            since: Desde este timestamp ISO
+            until: Hasta este timestamp ISO
+            limit: Resultados por página
+            cursor: next_cursor de la página anterior
+
+        Returns:
+            Dict con items (proyecto, nivel, timestamp, entrada, rank y
+            fragmento) y next_cursor (None en la última página)
+        """
+        match = self._match_expression(query) if query else None
+        filters = []
+        params: list = []
+
+        if project:
+            filters.append("e.proyecto = ?")
+            params.append(project)
+        if levels:
+            levels = [level.upper() for level in levels]
+            filters.append(f"e.nivel IN ({', '.join('?' * len(levels))})")
+            params += levels
+        if since:
+            filters.append("e.ts >= ?")
+            params.append(timestamp_key(since))
+        if until:
+            filters.append("e.ts <= ?")
+            params.append(timestamp_key(until))
+
+        if match:
+            sql = """
+                SELECT e.id, e.proyecto, e.nivel, e.ts, e.entrada, logs_fts.rank AS rank
+                FROM logs_fts JOIN logs_entradas e ON e.id = logs_fts.rowid
+                WHERE logs_fts MATCH ?
+            """
+            params.insert(0, match)
+            if cursor:
+                rank, last_id = self._parse_cursor(cursor, float)
+                filters.append("(logs_fts.rank, e.id) > (?, ?)")
+                params += [rank, last_id]
+            order = "ORDER BY logs_fts.rank, e.id"
+        else:
+            sql = """
+                SELECT e.id, e.proyecto, e.nivel, e.ts, e.entrada, NULL AS rank
+                FROM logs_entradas e
+                WHERE 1
+            """
+            if cursor:
+                ts, last_id = self._parse_cursor(cursor, str)
+                filters.append("(e.ts, e.id) < (?, ?)")
+                params += [ts, last_id]
+            order = "ORDER BY e.ts DESC, e.id DESC"
+
+        sql += ''.join(f" AND {condition}" for condition in filters) + f" {order} LIMIT ?"
+        params.append(limit + 1)
+
+        with self.db.get_connection(readonly=True) as conn:
+            rows = [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = f"{last['rank']!r}|{last['id']}" if match else f"{last['ts']}|{last['id']}"
+
+            # Fragmentos solo de la página devuelta
+            fragments = {}
+            if match and rows:
+                fragments = dict(conn.execute(f"""
+                    SELECT rowid, snippet(logs_fts, 0, '[', ']', '…', 16) FROM logs_fts
+                    WHERE logs_fts MATCH ? AND rowid IN ({', '.join('?' * len(rows))})
+                """, [match] + [row['id'] for row in rows]).fetchall())
+
+        items = [
+            {
+                "proyecto": row['proyecto'],
+                "nivel": row['nivel'],
+                "timestamp": row['ts'],
+                "rank": row['rank'],
+                "fragmento": fragments.get(row['id']),
+                "entrada": json.loads(row['entrada'])
+            }
+            for row in rows
+        ]
+
+        return {'items': items, 'next_cursor': next_cursor}
+
+    @staticmethod
+    def _parse_cursor(cursor: str, key_type: type) -> Tuple:
+        """
+        Clave (rank o ts, convertida con key_type) e id de un cursor 'clave|id'
+
+        Raises:
+            ValueError: Si el cursor no es uno emitido por search
+        """
+        key, _, last_id = cursor.rpartition('|')
+        try:
+            if not key or not last_id.isdigit():
+                raise ValueError
+            return key_type(key), int(last_id)
+        except ValueError:
+            raise ValueError(f"Cursor no válido: {cursor}") from None
+
+    def _match_expression(self, query: str) -> Optional[str]:
+        """Consulta FTS5 segura: cada palabra entre comillas, '*' final como prefijo"""
+        terms = []
+        for word in query.split():
+            prefix = word.endswith('*') and len(word) > 1
+            word = word.rstrip('*')
+            if word:
+                terms.append('"' + word.replace('"', '""') + '"' + ('*' if prefix else ''))
+        return ' '.join(terms) or None
+
+    def get_stats(self) -> Dict:
+        """Estado del índice"""
+        with self.db.get_connection(readonly=True) as conn:
+            files, entries = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(entradas), 0) FROM logs_archivos"
+            ).fetchone()
+
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'archivos': files,
+            'entradas': entries,
+            **stats
+        }
+
+
+# Instancia global
+log_search = LogSearch()
@@ -9,6 +9,10 @@ from pathlib import Path
 from typing import Optional, List, Dict
 
 from config import LOGS_DIR
+from core.log_reader import tail_log, parse_log_line
+from core.log_rotation import RotatingLogHandler
+from core.log_queue import log_pipeline, BLOCKING_ATTR
+from core.log_index import log_index
 
 
 class Logger:
@@ -27,17 +31,18 @@ class Logger:
         if logger.handlers:
             return logger
 
-        # Handler archivo (JSON)
-        file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
+        # Handler archivo (JSON), rotado por tamaño y antigüedad
+        file_handler = RotatingLogHandler(self.log_file)
         file_handler.setFormatter(JsonFormatter())
-        logger.addHandler(file_handler)
 
         # Handler consola (simple)
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(
             logging.Formatter('%(levelname)s | %(name)s | %(message)s')
         )
-        logger.addHandler(console_handler)
+
+        # Ambos escriben desde el hilo de core.log_queue: quien loguea solo encola
+        logger.addHandler(log_pipeline.handler_for([file_handler, console_handler]))
 
         return logger
 
@@ -57,13 +62,23 @@ class Logger:
         """Log CRITICAL"""
         self.logger.critical(message, extra=extra)
 
+    def output(self, level: int, message: str, **extra):
+        """
+        Log de la salida de un proceso del proyecto
+
+        Nunca se descarta con la cola de logs llena: espera a que haya sitio
+        (ver core.log_queue).
+        """
+        self.logger.log(level, message, extra={**extra, BLOCKING_ATTR: True})
+
 
 class JsonFormatter(logging.Formatter):
     """Formatter JSON"""
 
     def format(self, record: logging.LogRecord) -> str:
         log_data = {
-            "timestamp": datetime.utcnow().isoformat() + 'Z',
+            # Momento del registro, no el de la escritura (que es diferida)
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat() + 'Z',
             "level": record.levelname,
             "project": record.name,
             "message": record.getMessage()
@@ -74,6 +89,9 @@ class JsonFormatter(logging.Formatter):
 
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Traceback ya resuelto al encolar (core.log_queue)
+            log_data["exception"] = record.exc_text
 
         return json.dumps(log_data, ensure_ascii=False)
 
@@ -86,57 +104,28 @@ def get_logger(project_name: str) -> Logger:
 
 
 def read_logs(project_name: str, limit: int = 100) -> List[Dict]:
-    """Leer logs de un proyecto"""
+    """Leer las últimas `limit` entradas de log de un proyecto (lectura desde el final)"""
     log_file = LOGS_DIR / f"{project_name}.log"
 
     if not log_file.exists():
         return []
 
-    logs = []
     try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            for line in lines[-limit:]:
-                try:
-                    logs.append(json.loads(line.strip()))
-                except json.JSONDecodeError:
-                    logs.append({
-                        "timestamp": datetime.utcnow().isoformat() + 'Z',
-                        "level": "INFO",
-                        "message": line.strip()
-                    })
+        lines = tail_log(log_file, limit)
     except Exception:
         return []
 
-    return logs
+    return [parse_log_line(line) for line in lines]
 
 
 def get_logs_summary() -> Dict[str, Dict]:
-    """Resumen de todos los logs"""
-    summary = {}
-
-    for log_file in LOGS_DIR.glob("*.log"):
-        project_name = log_file.stem
-
-        try:
-            with open(log_file, 'r') as f:
-                lines = f.readlines()
-                last_entry = None
-
-                if lines:
-                    try:
-                        last_entry = json.loads(lines[-1].strip())
-                    except json.JSONDecodeError:
-                        last_entry = {"message": lines[-1].strip()}
-
-                summary[project_name] = {
-                    "total_entries": len(lines),
-                    "last_entry": last_entry
-                }
-        except Exception:
-            continue
-
-    return summary
+    """
+    Resumen de todos los logs
+
+    Sale del índice lateral de cada archivo (core.log_index): solo se leen
+    los bytes escritos desde la consulta anterior.
+    """
+    return log_index.summary()
 
 
 # Logger global de ORION
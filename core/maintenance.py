@@ -0,0 +1,95 @@
+"""
+ORION Maintenance
+Mantenimiento periódico de orion.db: retención de actividad y vacuum incremental
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+from config import ACTIVITY_RETENTION_DAYS, ACTIVITY_COMPACT_INTERVAL
+from core.database import db, Database
+from core.logger import logger
+
+
+class MaintenanceJob:
+    """
+    Tarea de mantenimiento en un hilo de fondo
+
+    Cada ACTIVITY_COMPACT_INTERVAL segundos compacta en resúmenes diarios
+    la actividad con más de ACTIVITY_RETENTION_DAYS días y devuelve al
+    sistema las páginas libres de la base.
+    """
+
+    def __init__(self, database: Database = db, interval: float = ACTIVITY_COMPACT_INTERVAL,
+                 retention_days: int = ACTIVITY_RETENTION_DAYS):
+        self.db = database
+        self.interval = interval
+        self.retention_days = retention_days
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_run: Optional[float] = None
+        self._last_result: Optional[Dict] = None
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self):
+        """Arrancar el hilo de mantenimiento (idempotente)"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="orion-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detener el hilo de mantenimiento"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        """Bucle: una pasada al arrancar y luego cada `interval` segundos"""
+        try:
+            # Una sola vez: las bases antiguas se crearon sin vacuum incremental
+            if self.db.enable_incremental_vacuum():
+                logger.info("orion.db convertida a auto_vacuum=INCREMENTAL (VACUUM completo)")
+        except Exception as e:
+            logger.error(f"Error activando el vacuum incremental: {str(e)}")
+
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Error en mantenimiento de la base de datos: {str(e)}")
+            self._stop_event.wait(self.interval)
+
+    # ==================== TAREAS ====================
+
+    def run_once(self) -> Dict:
+        """Ejecutar el mantenimiento ahora"""
+        result = self.db.compact_activity(self.retention_days)
+        self._last_run = time.time()
+        self._last_result = result
+
+        if result['compacted'] or result['orphans']:
+            logger.info(
+                f"Actividad compactada: {result['compacted']} eventos, "
+                f"{result['orphans']} huérfanos, {result['freed_pages']} páginas liberadas",
+                extra=result
+            )
+        return result
+
+    def get_stats(self) -> Dict:
+        """Estado del mantenimiento"""
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'interval': self.interval,
+            'retention_days': self.retention_days,
+            'last_run': self._last_run,
+            'last_result': self._last_result
+        }
+
+
+# Instancia global
+maintenance_job = MaintenanceJob()
@@ -0,0 +1,277 @@
+"""
+ORION Metrics Store
+Historial de CPU y memoria por proyecto con rollups por minuto y por hora
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    METRICS_FLUSH_INTERVAL,
+    METRICS_RAW_RETENTION,
+    METRICS_MINUTE_RETENTION,
+    METRICS_HOUR_RETENTION
+)
+from core.database import db, Database
+from core.logger import logger
+
+# Resoluciones disponibles: nombre -> segundos por punto
+RESOLUTIONS = {'1s': 1, '1m': 60, '1h': 3600}
+
+
+class MetricsStore:
+    """
+    Serie temporal compacta en orion.db
+
+    Las muestras del ProcessSampler se acumulan en memoria y se escriben
+    por lotes en una sola transacción. En cada escritura se recalculan los
+    rollups de 1 minuto y 1 hora afectados y se purga lo que excede la
+    retención, de modo que el almacenamiento por proyecto está acotado:
+    1 h de puntos a 1 s, METRICS_MINUTE_RETENTION de puntos por minuto y
+    METRICS_HOUR_RETENTION de puntos por hora.
+    """
+
+    def __init__(self, database: Database = db, flush_interval: float = METRICS_FLUSH_INTERVAL):
+        self.db = database
+        self.flush_interval = flush_interval
+        self._buffer: List[Tuple] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._init_tables()
+
+    def _init_tables(self):
+        """Crear tabla de métricas"""
+        with self.db.get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS metricas (
+                    proyecto TEXT NOT NULL,
+                    resolucion INTEGER NOT NULL,
+                    ts INTEGER NOT NULL,
+                    cpu_avg REAL,
+                    cpu_max REAL,
+                    mem_avg REAL,
+                    mem_max REAL,
+                    threads INTEGER,
+                    muestras INTEGER NOT NULL DEFAULT 1,
+                    PRIMARY KEY (proyecto, resolucion, ts)
+                ) WITHOUT ROWID
+            """)
+            # Retención y rollups filtran por resolución y tiempo, sin proyecto
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_metricas_resolucion_ts
+                ON metricas (resolucion, ts)
+            """)
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self):
+        """Arrancar el hilo de escritura por lotes (idempotente)"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="orion-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detener el hilo y escribir lo pendiente"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval * 2)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        """Bucle de escritura"""
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                # flush() ya devolvió las muestras al buffer: se reintentan en el siguiente ciclo
+                logger.error(f"Error escribiendo métricas: {str(e)}")
+
+    # ==================== ESCRITURA ====================
+
+    def record_samples(self, samples: List[Tuple[str, Dict]]):
+        """
+        Acumular muestras en memoria (listener del ProcessSampler)
+
+        Args:
+            samples: Lista de (proyecto, muestra del sampler)
+        """
+        rows = [
+            (
+                project,
+                int(sample['sampled_at']),
+                sample['cpu_percent'],
+                sample['memory_mb'],
+                sample['num_threads']
+            )
+            for project, sample in samples
+        ]
+        if rows:
+            with self._lock:
+                self._buffer.extend(rows)
+
+    def flush(self) -> int:
+        """
+        Escribir el lote pendiente, recalcular rollups y aplicar retención
+
+        Si la escritura falla, las muestras vuelven al principio del buffer
+        (antes de las que llegaron mientras tanto) y se propaga el error.
+
+        Returns:
+            Número de muestras escritas
+        """
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+
+        if not rows:
+            return 0
+
+        try:
+            self._write(rows)
+        except Exception:
+            with self._lock:
+                self._buffer[:0] = rows
+            raise
+
+        return len(rows)
+
+    def _write(self, rows: List[Tuple]):
+        """Insertar las muestras, recalcular rollups y aplicar retención en una transacción"""
+        first_ts = min(row[1] for row in rows)
+        now = int(time.time())
+
+        with self.db.get_connection() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO metricas
+                (proyecto, resolucion, ts, cpu_avg, cpu_max, mem_avg, mem_max, threads, muestras)
+                VALUES (?, 1, ?, ?, ?, ?, ?, ?, 1)
+            """, [(p, ts, cpu, cpu, mem, mem, threads) for p, ts, cpu, mem, threads in rows])
+
+            # Rollups de los buckets afectados (incluido el que sigue abierto)
+            self._rollup(conn, source=1, target=60, since=first_ts - first_ts % 60)
+            self._rollup(conn, source=60, target=3600, since=first_ts - first_ts % 3600)
+
+            # Retención
+            for resolution, retention in ((1, METRICS_RAW_RETENTION),
+                                          (60, METRICS_MINUTE_RETENTION),
+                                          (3600, METRICS_HOUR_RETENTION)):
+                conn.execute(
+                    "DELETE FROM metricas WHERE resolucion = ? AND ts < ?",
+                    (resolution, now - retention)
+                )
+
+    def _rollup(self, conn, source: int, target: int, since: int):
+        """Agregar puntos de resolución `source` en buckets de `target` segundos"""
+        conn.execute("""
+            INSERT OR REPLACE INTO metricas
+            (proyecto, resolucion, ts, cpu_avg, cpu_max, mem_avg, mem_max, threads, muestras)
+            SELECT
+                proyecto,
+                ?,
+                (ts / ?) * ?,
+                SUM(cpu_avg * muestras) / SUM(muestras),
+                MAX(cpu_max),
+                SUM(mem_avg * muestras) / SUM(muestras),
+                MAX(mem_max),
+                MAX(threads),
+                SUM(muestras)
+            FROM metricas
+            WHERE resolucion = ? AND ts >= ?
+            GROUP BY proyecto, ts / ?
+        """, (target, target, target, source, since, target))
+
+    # ==================== CONSULTAS ====================
+
+    def query(self, project: str, resolution: Optional[str] = None,
+              since: Optional[int] = None, until: Optional[int] = None) -> Dict:
+        """
+        Serie temporal de un proyecto para gráficas
+
+        Args:
+            project: Nombre del proyecto
+            resolution: '1s', '1m' o '1h' (por defecto según el rango)
+            since: Inicio del rango (epoch en segundos, por defecto hace 1 h)
+            until: Fin del rango (epoch en segundos, por defecto ahora)
+
+        Returns:
+            Resolución usada y lista de puntos
+
+        Raises:
+            ValueError: Si la resolución no es una de RESOLUTIONS
+        """
+        if resolution is not None and resolution not in RESOLUTIONS:
+            raise ValueError(f"Resolución no válida: {resolution} (opciones: {', '.join(RESOLUTIONS)})")
+
+        now = int(time.time())
+        until = until or now
+        since = since if since is not None else until - METRICS_RAW_RETENTION
+
+        if resolution is None:
+            span = until - since
+            if span <= METRICS_RAW_RETENTION and since >= now - METRICS_RAW_RETENTION:
+                resolution = '1s'
+            elif span <= METRICS_MINUTE_RETENTION and since >= now - METRICS_MINUTE_RETENTION:
+                resolution = '1m'
+            else:
+                resolution = '1h'
+        step = RESOLUTIONS[resolution]
+
+        with self.db.get_connection(readonly=True) as conn:
+            cursor = conn.execute("""
+                SELECT ts, cpu_avg, cpu_max, mem_avg, mem_max, threads, muestras
+                FROM metricas
+                WHERE proyecto = ? AND resolucion = ? AND ts >= ? AND ts <= ?
+                ORDER BY ts
+            """, (project, step, since, until))
+            points = [dict(row) for row in cursor.fetchall()]
+
+        # Lo que aún no se ha escrito se suma desde el buffer, sin forzar un flush
+        with self._lock:
+            pending = [
+                row for row in self._buffer
+                if row[0] == project and since <= row[1] - row[1] % step <= until
+            ]
+        if pending:
+            points = self._merge_pending(points, pending, step)
+        return {
+            'project': project,
+            'resolution': resolution,
+            'since': since,
+            'until': until,
+            'count': len(points),
+            'points': points
+        }
+
+    @staticmethod
+    def _merge_pending(points: List[Dict], pending: List[Tuple], step: int) -> List[Dict]:
+        """Agregar muestras del buffer a los puntos leídos de la base de datos"""
+        by_ts = {point['ts']: point for point in points}
+
+        for _, ts, cpu, mem, threads in pending:
+            bucket = ts - ts % step
+            point = by_ts.get(bucket)
+            if point is None or step == 1:
+                # A 1 s la muestra nueva reemplaza a la escrita (como INSERT OR REPLACE)
+                by_ts[bucket] = {
+                    'ts': bucket, 'cpu_avg': cpu, 'cpu_max': cpu, 'mem_avg': mem,
+                    'mem_max': mem, 'threads': threads, 'muestras': 1
+                }
+                continue
+
+            total = point['muestras'] + 1
+            point['cpu_avg'] = (point['cpu_avg'] * point['muestras'] + cpu) / total
+            point['mem_avg'] = (point['mem_avg'] * point['muestras'] + mem) / total
+            point['cpu_max'] = max(point['cpu_max'], cpu)
+            point['mem_max'] = max(point['mem_max'], mem)
+            point['threads'] = max(point['threads'] or 0, threads or 0)
+            point['muestras'] = total
+
+        return [by_ts[ts] for ts in sorted(by_ts)]
+
+
+# Instancia global
+metrics_store = MetricsStore()
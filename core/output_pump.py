@@ -0,0 +1,164 @@
+"""
+ORION Output Pump
+Drenado de stdout/stderr de los proyectos hacia sus archivos de log
+"""
+import logging
+import queue
+import threading
+import time
+from typing import IO, Dict, List, Optional, Tuple
+
+from config import OUTPUT_PUMP_QUEUE_SIZE, OUTPUT_PUMP_MAX_LINE
+from core.logger import Logger, get_logger
+
+
+class OutputPump:
+    """
+    Bomba de salida de procesos hijos
+
+    Un hilo lector por pipe vacía stdout/stderr para que el hijo nunca se
+    bloquee con el buffer del pipe lleno. Las líneas pasan por una cola
+    acotada a un único hilo escritor que las registra en
+    LOGS_DIR/<proyecto>.log con el formato JSON de siempre. Si el escritor
+    no da abasto, los lectores esperan (backpressure) en lugar de acumular
+    memoria sin límite.
+    """
+
+    def __init__(self, queue_size: int = OUTPUT_PUMP_QUEUE_SIZE, max_line: int = OUTPUT_PUMP_MAX_LINE):
+        self.max_line = max_line
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._loggers: Dict[str, Logger] = {}
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._readers: List[Tuple[threading.Thread, object]] = []  # (lector, proceso)
+        self._lines = 0
+        self._truncated = 0
+        self._backpressure_waits = 0
+
+    def attach(self, project_name: str, process) -> None:
+        """
+        Empezar a drenar la salida de un proceso
+
+        Args:
+            project_name: Nombre del proyecto (define el archivo de log)
+            process: subprocess.Popen lanzado con stdout/stderr=PIPE
+        """
+        self._ensure_writer()
+
+        for stream, name in ((process.stdout, 'stdout'), (process.stderr, 'stderr')):
+            if stream is None:
+                continue
+            reader = threading.Thread(
+                target=self._read,
+                args=(project_name, process.pid, stream, name),
+                name=f"orion-pump-{project_name}-{name}",
+                daemon=True
+            )
+            with self._lock:
+                self._readers = [entry for entry in self._readers if entry[0].is_alive()]
+                self._readers.append((reader, process))
+            reader.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Esperar a los lectores y detener el escritor tras registrar lo encolado
+
+        Los lectores de procesos ya terminados llegan enseguida al EOF de su
+        pipe y se esperan (hasta `timeout`); los de procesos que siguen vivos
+        no terminarían, así que se abandonan (son daemon). El escritor recibe
+        un centinela al final de la cola, de modo que las líneas leídas antes
+        llegan a los logs.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            readers, self._readers = self._readers, []
+            writer, self._writer = self._writer, None
+
+        for reader, process in readers:
+            if process.poll() is None:
+                continue
+            reader.join(timeout=max(0.0, deadline - time.monotonic()))
+
+        if writer and writer.is_alive():
+            try:
+                self._queue.put(None, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                return
+            writer.join(timeout=max(0.0, deadline - time.monotonic()))
+
+    def _ensure_writer(self):
+        """Arrancar el hilo escritor si no existe"""
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write, name="orion-pump-writer", daemon=True)
+                self._writer.start()
+
+    def _read(self, project_name: str, pid: int, stream: IO[bytes], name: str):
+        """Leer un pipe línea a línea hasta EOF"""
+        try:
+            for raw in iter(lambda: stream.readline(self.max_line), b''):
+                # Sin '\n' al final: o se cortó en max_line o es la última línea antes de EOF
+                truncated = len(raw) >= self.max_line and not raw.endswith(b'\n')
+                line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+                item = (project_name, pid, name, line, truncated)
+
+                try:
+                    self._queue.put_nowait(item)
+                except queue.Full:
+                    with self._lock:
+                        self._backpressure_waits += 1
+                    self._queue.put(item)
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def _write(self):
+        """Registrar las líneas en el log JSON de cada proyecto"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            project_name, pid, name, line, truncated = item
+            try:
+                project_logger = self._loggers.get(project_name)
+                if project_logger is None:
+                    project_logger = self._loggers[project_name] = get_logger(project_name)
+
+                extra = {'stream': name, 'pid': pid}
+                if truncated:
+                    extra['truncated'] = True
+
+                # Sin descartes: si la cola de logs está llena se espera y la
+                # espera llega a los lectores (y al hijo) como backpressure
+                level = logging.WARNING if name == 'stderr' else logging.INFO
+                project_logger.output(level, line, extra=extra)
+
+                with self._lock:
+                    self._lines += 1
+                    if truncated:
+                        self._truncated += 1
+            except Exception:
+                pass
+            finally:
+                self._queue.task_done()
+
+    def get_stats(self) -> Dict:
+        """Métricas de la bomba de salida"""
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'queue_size': self._queue.maxsize,
+                'lines': self._lines,
+                'truncated_lines': self._truncated,
+                'backpressure_waits': self._backpressure_waits
+            }
+
+
+# Instancia global
+output_pump = OutputPump()
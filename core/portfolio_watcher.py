@@ -0,0 +1,383 @@
+"""
+ORION Portfolio Watcher
+Vigilancia de PORTFOLIO_DIR y sincronización incremental de los proyectos afectados
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from config import WATCHER_DEBOUNCE, WATCHER_POLL_INTERVAL
+from core.database import db, Database
+from core.dependencies import dependency_index
+from core.logger import logger
+from core.project_manager import project_manager, ProjectManager
+
+# Constantes de inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+ROOT_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+PROJECT_MASK = IN_CLOSE_WRITE | IN_MODIFY | IN_ATTRIB | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+
+EVENT_HEADER = struct.Struct('iIII')
+
+# Marca de "re-escanear todo" (cola de inotify desbordada, raíz recreada...)
+RESCAN = '*'
+
+
+class InotifyBackend:
+    """
+    Eventos de inotify vía ctypes (solo Linux)
+
+    Vigila la raíz del portfolio (altas/bajas de proyectos) y el árbol de
+    cada proyecto, porque el análisis sigue los módulos importados desde
+    subpaquetes. Los directorios de ProjectManager.skip_dir no se vigilan
+    y los que se crean después se añaden al recibir su IN_CREATE.
+    """
+
+    name = 'inotify'
+
+    def __init__(self, root: Path, input_files: List[str], skip_dir: Callable[[str], bool] = lambda name: False):
+        self.root = root
+        self.input_files = set(input_files)
+        self.skip_dir = skip_dir
+        self._wd_to_project: Dict[int, Optional[str]] = {}
+        self._wd_to_path: Dict[int, Path] = {}
+
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            raise OSError("libc no disponible")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError("inotify no disponible")
+
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+
+        self._watch_all()
+
+    def _add_watch(self, path: Path, mask: int, project: Optional[str]):
+        """Registrar un watch (los proyectos que desaparecen a mitad se ignoran)"""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(path)), mask)
+        if wd >= 0:
+            self._wd_to_project[wd] = project
+            self._wd_to_path[wd] = path
+        elif project is None:
+            raise OSError(ctypes.get_errno(), f"No se puede vigilar {path}")
+
+    def _watch_tree(self, path: Path, project: str):
+        """Vigilar un directorio de un proyecto y sus subdirectorios"""
+        for directory, subdirs, _ in os.walk(path):
+            subdirs[:] = [name for name in subdirs if not self.skip_dir(name)]
+            self._add_watch(Path(directory), PROJECT_MASK, project)
+
+    def _watch_all(self):
+        """(Re)registrar la raíz y todos los proyectos"""
+        for wd in list(self._wd_to_project):
+            self._libc.inotify_rm_watch(self.fd, wd)
+        self._wd_to_project.clear()
+        self._wd_to_path.clear()
+
+        self._add_watch(self.root, ROOT_MASK, None)
+        for path in self.root.iterdir():
+            if path.is_dir() and not path.name.startswith('.'):
+                self._watch_tree(path, path.name)
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Esperar eventos hasta `timeout` segundos; devuelve proyectos afectados"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: Set[str] = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            raw_name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length]
+            name = os.fsdecode(raw_name.rstrip(b'\0'))
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.add(RESCAN)
+                continue
+
+            if mask & IN_IGNORED:
+                self._wd_to_project.pop(wd, None)
+                self._wd_to_path.pop(wd, None)
+                continue
+
+            if wd not in self._wd_to_project:
+                continue
+
+            project = self._wd_to_project[wd]
+
+            if project is None:
+                # Evento en la raíz: alta, baja o renombrado de un proyecto
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    changed.add(RESCAN)
+                    continue
+                if not name or name.startswith('.'):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO) and mask & IN_ISDIR:
+                    self._watch_tree(self.root / name, name)
+                changed.add(name)
+            elif mask & IN_ISDIR:
+                # Subdirectorio creado, movido o borrado dentro del proyecto
+                if not name or self.skip_dir(name):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(self._wd_to_path[wd] / name, project)
+                changed.add(project)
+            elif name in self.input_files or name.endswith('.py'):
+                changed.add(project)
+
+        if RESCAN in changed and self.root.is_dir():
+            self._watch_all()
+
+        return changed
+
+    def close(self):
+        """Liberar el descriptor de inotify"""
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class PollingBackend:
+    """
+    Alternativa por escaneo periódico de huellas (mtime_ns, size)
+
+    Para sistemas sin inotify o sistemas de archivos que no emiten eventos
+    (p. ej. algunos montajes de red). Por proyecto se miran los archivos de
+    entrada y los módulos que leyó su último análisis (`sources`), incluidos
+    los de subpaquetes.
+    """
+
+    name = 'polling'
+
+    def __init__(self, root: Path, input_files: List[str], interval: float = WATCHER_POLL_INTERVAL,
+                 sources: Callable[[str], List[str]] = lambda name: []):
+        self.root = root
+        self.input_files = input_files
+        self.interval = interval
+        self.sources = sources
+        self._last_scan = time.monotonic()
+        self._state = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple]:
+        """Huella de los archivos de entrada y de los módulos analizados de cada proyecto"""
+        state: Dict[str, Tuple] = {}
+        if not self.root.is_dir():
+            return state
+
+        for path in self.root.iterdir():
+            if not path.is_dir() or path.name.startswith('.'):
+                continue
+
+            files = [path / file for file in self.input_files]
+            files += sorted({Path(source) for source in self.sources(path.name)} - set(files))
+
+            fingerprint = []
+            for file in files:
+                try:
+                    st = os.stat(file)
+                    fingerprint.append((str(file), st.st_mtime_ns, st.st_size))
+                except OSError:
+                    fingerprint.append((str(file), None))
+            state[path.name] = tuple(fingerprint)
+
+        return state
+
+    def poll(self, timeout: float) -> Set[str]:
+        """Escanear si toca; si no, esperar hasta `timeout` segundos"""
+        remaining = self.interval - (time.monotonic() - self._last_scan)
+        if remaining > 0:
+            time.sleep(min(timeout, remaining))
+            return set()
+
+        self._last_scan = time.monotonic()
+        previous, self._state = self._state, self._scan()
+
+        return {
+            name for name in previous.keys() | self._state.keys()
+            if previous.get(name) != self._state.get(name)
+        }
+
+    def close(self):
+        """Sin recursos que liberar"""
+
+
+class PortfolioWatcher:
+    """
+    Vigilante del portfolio en un hilo de fondo
+
+    Los eventos se acumulan hasta que pasan WATCHER_DEBOUNCE segundos sin
+    cambios; entonces solo los proyectos afectados se re-analizan y se
+    actualizan en la BD. Los proyectos que desaparecen (o dejan de tener
+    archivo principal) se eliminan de la BD.
+    """
+
+    def __init__(self, manager: ProjectManager = project_manager, database: Database = db,
+                 debounce: float = WATCHER_DEBOUNCE, poll_interval: float = WATCHER_POLL_INTERVAL):
+        self.manager = manager
+        self.db = database
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._backend = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._syncs = 0
+        self._updated = 0
+        self._removed = 0
+        self._last_sync: Optional[float] = None
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self):
+        """Arrancar la vigilancia (idempotente)"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        root = self.manager.portfolio_dir
+        try:
+            self._backend = InotifyBackend(root, self.manager.INPUT_FILES, self.manager.skip_dir)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify no disponible ({str(e)}), usando escaneo periódico")
+            self._backend = PollingBackend(
+                root, self.manager.INPUT_FILES, self.poll_interval, self.manager.analysis_sources
+            )
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="orion-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detener la vigilancia"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=max(self.debounce, 1.0) * 2)
+            self._thread = None
+        if self._backend:
+            self._backend.close()
+            self._backend = None
+
+    def _run(self):
+        """Bucle de eventos con debounce"""
+        pending: Set[str] = set()
+        last_event = 0.0
+
+        while not self._stop_event.is_set():
+            try:
+                changed = self._backend.poll(self.debounce if pending else 1.0)
+            except Exception as e:
+                logger.error(f"Error vigilando el portfolio: {str(e)}")
+                changed = set()
+                self._stop_event.wait(1.0)
+
+            if changed:
+                pending |= changed
+                last_event = time.monotonic()
+                continue
+
+            if pending and time.monotonic() - last_event >= self.debounce:
+                try:
+                    self.sync(pending)
+                except Exception as e:
+                    logger.error(f"Error sincronizando cambios del portfolio: {str(e)}")
+                pending = set()
+
+    # ==================== SINCRONIZACIÓN ====================
+
+    def sync(self, project_names: Set[str]) -> Dict:
+        """
+        Re-analizar y actualizar en la BD solo los proyectos indicados
+
+        Args:
+            project_names: Proyectos afectados (RESCAN para todo el portfolio)
+
+        Returns:
+            Proyectos actualizados y eliminados
+        """
+        names = set(project_names)
+        if RESCAN in names:
+            names.discard(RESCAN)
+            root = self.manager.portfolio_dir
+            if root.is_dir():
+                names |= {p.name for p in root.iterdir() if p.is_dir()}
+            names |= {p['nombre'] for p in self.db.list_projects()}
+
+        updated: List[str] = []
+        removed: List[str] = []
+
+        for name in sorted(names):
+            info = self.manager.analyze_project(name)
+            if info:
+                self.db.sync_projects([info])
+                dependency_index.sync([info])
+                updated.append(name)
+                continue
+
+            existing = self.db.get_project(name)
+            if existing and existing['ruta'] == str(self.manager.portfolio_dir / name):
+                self.db.delete_project(name)
+                dependency_index.remove([name])
+                removed.append(name)
+
+        with self._lock:
+            self._syncs += 1
+            self._updated += len(updated)
+            self._removed += len(removed)
+            self._last_sync = time.time()
+
+        if updated or removed:
+            logger.info(
+                f"Portfolio sincronizado: {len(updated)} actualizados, {len(removed)} eliminados",
+                extra={'updated': updated, 'removed': removed}
+            )
+
+        return {'updated': updated, 'removed': removed}
+
+    def get_stats(self) -> Dict:
+        """Estado del vigilante"""
+        with self._lock:
+            return {
+                'running': bool(self._thread and self._thread.is_alive()),
+                'backend': self._backend.name if self._backend else None,
+                'debounce': self.debounce,
+                'syncs': self._syncs,
+                'projects_updated': self._updated,
+                'projects_removed': self._removed,
+                'last_sync': self._last_sync
+            }
+
+
+# Instancia global
+portfolio_watcher = PortfolioWatcher()
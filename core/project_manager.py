@@ -2,29 +2,75 @@
 ORION Project Manager
 Gestión completa de proyectos: descubrimiento, control, dependencias
 """
+import copy
+import hashlib
+import os
 import subprocess
 import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import psutil
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import json
 
-from config import PORTFOLIO_DIR
+from config import PORTFOLIO_DIR, DISCOVERY_WORKERS
+from core.database import db, Database
+from core.snapshots import (
+    get_process_snapshot,
+    get_port_snapshot,
+    process_snapshots,
+    port_snapshots,
+    python_script
+)
+from core.sampler import process_sampler
+from core.output_pump import output_pump
+from core.analyzer import SourceAnalyzer
+from core.dependencies import parse_requirements
 
 
 class ProjectManager:
     """Gestor centralizado de proyectos del portfolio"""
 
-    def __init__(self):
+    # Archivos principales reconocidos, por orden de preferencia
+    MAIN_FILES = ['app.py', 'main.py', 'run.py', 'server.py']
+
+    # Archivos cuyo contenido determina el análisis de un proyecto
+    INPUT_FILES = MAIN_FILES + ['requirements.txt']
+
+    # Subdirectorios de un proyecto que no contienen su código (además de los ocultos)
+    SKIP_DIRS = {'__pycache__', 'node_modules', 'venv', 'env', 'site-packages', 'build', 'dist'}
+
+    # Versión del formato del análisis (invalida los análisis guardados al cambiar)
+    ANALYSIS_VERSION = 3
+
+    def __init__(self, database: Database = db):
         self.portfolio_dir = PORTFOLIO_DIR
-        self.running_processes: Dict[str, int] = {}  # {project_name: pid}
+        self.db = database
+        self.running_processes: Dict[str, Tuple[int, Optional[float]]] = {}  # {project_name: (pid, create_time)}
+
+        # Cache de descubrimiento: {ruta: ((mtime_ns, size), contenido)}
+        # y {ruta_proyecto: (huella_de_entradas, análisis)}
+        self._file_cache: Dict[str, Tuple[Tuple[int, int], Optional[str]]] = {}
+        self._analysis_cache: Dict[str, Tuple[Tuple, Dict]] = {}
+        self._cache_lock = threading.Lock()
+        self._pending_analyses: List[Dict] = []  # análisis por guardar en orion.db
+        self._analyzer = SourceAnalyzer(self._read_file)
 
     # ==================== DESCUBRIMIENTO ====================
 
-    def discover_projects(self) -> List[Dict]:
+    def discover_projects(self, workers: Optional[int] = None) -> List[Dict]:
         """
         Auto-descubrir proyectos en el directorio portfolio
 
+        El análisis de cada proyecto es casi todo E/S (stat y lectura de
+        archivos), así que con varios hilos se solapan las esperas en
+        portfolios grandes o montados por red. El resultado es idéntico
+        al del modo en serie.
+
+        Args:
+            workers: Hilos de análisis (por defecto DISCOVERY_WORKERS, 1 = serie)
+
         Returns:
             Lista de proyectos encontrados con metadata
         """
@@ -33,16 +79,47 @@ class ProjectManager:
         if not self.portfolio_dir.exists():
             return projects
 
-        for project_path in self.portfolio_dir.iterdir():
-            if not project_path.is_dir() or project_path.name.startswith('.'):
-                continue
+        project_paths = [
+            project_path for project_path in self.portfolio_dir.iterdir()
+            if project_path.is_dir() and not project_path.name.startswith('.')
+        ]
+
+        workers = DISCOVERY_WORKERS if workers is None else workers
+        workers = max(1, min(workers, len(project_paths)))
+
+        if workers == 1:
+            results = [self._analyze_project(path) for path in project_paths]
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="orion-discovery") as pool:
+                results = list(pool.map(self._analyze_project, project_paths))
 
-            project_info = self._analyze_project(project_path)
-            if project_info:
-                projects.append(project_info)
+        projects = [project_info for project_info in results if project_info]
+
+        self._prune_cache({str(path) for path in project_paths})
+        self._flush_analyses()
 
         return sorted(projects, key=lambda x: x['nombre'])
 
+    def analyze_project(self, project_name: str) -> Optional[Dict]:
+        """
+        Analizar un único proyecto del portfolio por nombre
+
+        Args:
+            project_name: Nombre del directorio del proyecto
+
+        Returns:
+            Información del proyecto o None si ya no existe o no es un proyecto
+        """
+        project_path = self.portfolio_dir / project_name
+        if project_name.startswith('.') or not project_path.is_dir():
+            with self._cache_lock:
+                self._analysis_cache.pop(str(project_path), None)
+            return None
+
+        analysis = self._analyze_project(project_path)
+        self._flush_analyses()
+        return analysis
+
     def _analyze_project(self, path: Path) -> Optional[Dict]:
         """
         Analizar un proyecto y extraer información detallada
@@ -54,9 +131,8 @@ class ProjectManager:
             Diccionario con información del proyecto
         """
         # Buscar archivo principal (app.py, main.py, etc.)
-        main_files = ['app.py', 'main.py', 'run.py', 'server.py']
         main_file = None
-        for file in main_files:
+        for file in self.MAIN_FILES:
             if (path / file).exists():
                 main_file = file
                 break
@@ -64,25 +140,57 @@ class ProjectManager:
         if not main_file:
             return None
 
-        # Detectar tipo de proyecto
-        project_type = self._detect_project_type(path)
-
-        # Leer dependencias
-        dependencies = self.read_requirements(path)
+        # Si ningún archivo de entrada cambió, reutilizar el análisis previo
+        cached = self._analysis_cache.get(str(path))
+        if cached:
+            sources = [source for source, _ in cached[0][2]]
+            if cached[0] == self._inputs_fingerprint(path, main_file, sources):
+                return copy.deepcopy(cached[1])
+
+        # Análisis persistido en orion.db: vale si el contenido no cambió
+        stored = self.db.get_analysis(path.name)
+        if stored and stored['ruta'] == str(path) and stored['main_file'] == main_file:
+            sources = stored['fuentes']
+            if stored['hash'] == self._content_hash(path, main_file, sources):
+                analysis = stored['resultado']
+                with self._cache_lock:
+                    self._analysis_cache[str(path)] = (
+                        self._inputs_fingerprint(path, main_file, sources),
+                        analysis
+                    )
+                return copy.deepcopy(analysis)
+
+        # Leer dependencias (PEP 508)
+        requirements = self.read_requirement_entries(path)
+        # Un paquete con varios marcadores aparece una vez
+        dependencies = list(dict.fromkeys(entry['nombre'] for entry in requirements))
 
-        # Detectar puerto (leer del código)
-        port = self._detect_port(path / main_file)
-
-        # Analizar app.py en profundidad
-        app_analysis = self._analyze_app_file(path / main_file, project_type)
+        # Detectar tipo de proyecto
+        project_type = self._project_type_from(dependencies)
 
-        return {
+        # Analizar el código con ast siguiendo los routers importados;
+        # si el archivo principal no parsea, usar el análisis por regex
+        try:
+            app_analysis = self._analyzer.analyze(path, main_file, project_type)
+            port = app_analysis['port'] or self._detect_port(path / main_file)
+            # Los imports sin resolver también determinan el resultado: si el
+            # archivo aparece más tarde, la huella y el vigilante lo notan
+            sources = app_analysis['sources'] + app_analysis['missing']
+        except (SyntaxError, ValueError, OSError):
+            port = self._detect_port(path / main_file)
+            app_analysis = self._analyze_app_file(path / main_file, project_type)
+            sources = [str(path / main_file)]
+
+        fingerprint = self._inputs_fingerprint(path, main_file, sources)
+
+        analysis = {
             'nombre': path.name,
             'ruta': str(path),
             'main_file': main_file,
             'tipo': project_type,
             'puerto': port,
             'dependencies': dependencies,
+            'requirements': requirements,
             'tecnologias': ', '.join(dependencies[:5]) if dependencies else '',
             'endpoints': app_analysis.get('endpoints', []),
             'imports': app_analysis.get('imports', []),
@@ -91,10 +199,145 @@ class ProjectManager:
             'has_auth': app_analysis.get('has_auth', False)
         }
 
+        with self._cache_lock:
+            self._analysis_cache[str(path)] = (fingerprint, analysis)
+
+        with self._cache_lock:
+            self._pending_analyses.append({
+                'nombre': path.name,
+                'ruta': str(path),
+                'hash': self._content_hash(path, main_file, sources),
+                'main_file': main_file,
+                'fuentes': sources,
+                'resultado': analysis
+            })
+
+        return copy.deepcopy(analysis)
+
+    def _flush_analyses(self):
+        """Guardar en una sola transacción los análisis recalculados"""
+        with self._cache_lock:
+            pending, self._pending_analyses = self._pending_analyses, []
+        self.db.save_analyses(pending)
+
+    def skip_dir(self, name: str) -> bool:
+        """Subdirectorio de un proyecto que el vigilante no recorre"""
+        return name.startswith('.') or name in self.SKIP_DIRS
+
+    def analysis_sources(self, project_name: str) -> List[str]:
+        """
+        Archivos .py que determinan el último análisis de un proyecto
+
+        Incluye los que leyó y los que buscó sin encontrar (imports sin resolver).
+        """
+        cached = self._analysis_cache.get(str(self.portfolio_dir / project_name))
+        if cached:
+            return [source for source, _ in cached[0][2]]
+
+        stored = self.db.get_analysis(project_name)
+        return list(stored['fuentes']) if stored else []
+
+    def get_analysis(self, project_name: str, fresh: bool = False) -> Optional[Dict]:
+        """
+        Análisis de un proyecto servido desde orion.db
+
+        No toca el sistema de archivos si el análisis ya está guardado: el
+        descubrimiento y el vigilante del portfolio lo mantienen al día
+        cuando cambia el código.
+
+        Args:
+            project_name: Nombre del proyecto
+            fresh: Revalidar contra los archivos (re-analiza solo si cambiaron)
+
+        Returns:
+            Análisis del proyecto o None si no existe o no es un proyecto
+        """
+        if not fresh:
+            stored = self.db.get_analysis(project_name)
+            if stored:
+                return stored['resultado']
+
+        return self.analyze_project(project_name)
+
+    # ==================== CACHE DE ARCHIVOS ====================
+
+    def _fingerprint(self, file_path: Path) -> Optional[Tuple[int, int]]:
+        """Huella (mtime_ns, size) de un archivo; None si no existe"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _inputs_fingerprint(self, path: Path, main_file: str, sources: List[str]) -> Tuple:
+        """Huella de todo lo que influye en el análisis de un proyecto"""
+        return (
+            main_file,
+            self._fingerprint(path / 'requirements.txt'),
+            tuple((source, self._fingerprint(Path(source))) for source in sources)
+        )
+
+    def _content_hash(self, path: Path, main_file: str, sources: List[str]) -> str:
+        """
+        Hash SHA-256 del contenido de requirements.txt y de los archivos analizados
+
+        Un archivo que falta o no se puede leer entra en el hash solo por su ruta.
+        """
+        digest = hashlib.sha256(f"{self.ANALYSIS_VERSION}:{main_file}".encode())
+        for file_path in [path / 'requirements.txt'] + [Path(source) for source in sources]:
+            content = self._read_file(file_path)
+            digest.update(b'\0' + str(file_path).encode() + b'\0')
+            if content is not None:
+                digest.update(content.encode('utf-8', errors='surrogatepass'))
+        return digest.hexdigest()
+
+    def _read_file(self, file_path: Path) -> Optional[str]:
+        """
+        Leer un archivo de texto pasando por la cache de huellas
+
+        Un archivo sin cambios (mismo mtime_ns y tamaño) se sirve desde
+        memoria: cada archivo se lee como máximo una vez por cambio.
+
+        Returns:
+            Contenido del archivo o None si no existe o no se puede leer como
+            texto (permisos, binario, borrado durante la lectura)
+        """
+        fingerprint = self._fingerprint(file_path)
+        if fingerprint is None:
+            return None
+
+        key = str(file_path)
+        cached = self._file_cache.get(key)
+        if cached and cached[0] == fingerprint:
+            return cached[1]
+
+        try:
+            content = file_path.read_text()
+        except (OSError, UnicodeDecodeError):
+            # Se cachea también: no se reintenta hasta que el archivo cambie
+            content = None
+        with self._cache_lock:
+            self._file_cache[key] = (fingerprint, content)
+        return content
+
+    def _prune_cache(self, project_paths: set):
+        """Olvidar entradas de proyectos que ya no están en el portfolio"""
+        with self._cache_lock:
+            for key in list(self._analysis_cache):
+                if key not in project_paths:
+                    del self._analysis_cache[key]
+            root = str(self.portfolio_dir) + os.sep
+            for key in list(self._file_cache):
+                project = root + key[len(root):].split(os.sep, 1)[0]
+                if not key.startswith(root) or project not in project_paths:
+                    del self._file_cache[key]
+
     def _detect_project_type(self, path: Path) -> str:
         """Detectar tipo de proyecto (Flask, FastAPI, etc.)"""
-        requirements = self.read_requirements(path)
+        return self._project_type_from(self.read_requirements(path))
 
+    def _project_type_from(self, requirements: List[str]) -> str:
+        """Tipo de proyecto según sus dependencias"""
         if any('fastapi' in dep.lower() for dep in requirements):
             return 'FastAPI'
         elif any('flask' in dep.lower() for dep in requirements):
@@ -105,9 +348,9 @@ class ProjectManager:
             return 'Python'
 
     def _detect_port(self, main_file: Path) -> Optional[int]:
-        """Detectar puerto leyendo el archivo principal"""
+        """Detectar puerto leyendo el archivo principal (regex)"""
         try:
-            content = main_file.read_text()
+            content = self._read_file(main_file)
 
             # Buscar patrones comunes
             import re
@@ -129,7 +372,9 @@ class ProjectManager:
 
     def _analyze_app_file(self, app_file: Path, project_type: str) -> Dict:
         """
-        Analizar archivo app.py en profundidad
+        Analizar archivo app.py en profundidad con regex
+
+        Se usa cuando el archivo no se puede parsear con ast.
 
         Args:
             app_file: Ruta al archivo app.py
@@ -139,7 +384,7 @@ class ProjectManager:
             Diccionario con análisis del código
         """
         try:
-            content = app_file.read_text()
+            content = self._read_file(app_file)
             import re
 
             analysis = {
@@ -243,37 +488,25 @@ class ProjectManager:
             path: Ruta al proyecto
 
         Returns:
-            Lista de dependencias
+            Lista de dependencias (nombres de paquete)
         """
-        req_file = path / 'requirements.txt'
+        return [entry['nombre'] for entry in self.read_requirement_entries(path)]
 
-        if not req_file.exists():
-            return []
-
-        try:
-            content = req_file.read_text()
-            dependencies = []
-
-            for line in content.split('\n'):
-                line = line.strip()
-
-                # Ignorar comentarios y líneas vacías
-                if not line or line.startswith('#'):
-                    continue
-
-                # Extraer nombre del paquete (sin versión)
-                if '==' in line:
-                    package = line.split('==')[0].strip()
-                elif '>=' in line:
-                    package = line.split('>=')[0].strip()
-                elif '<=' in line:
-                    package = line.split('<=')[0].strip()
-                else:
-                    package = line.strip()
+    def read_requirement_entries(self, path: Path) -> List[Dict]:
+        """
+        Leer y parsear (PEP 508) el requirements.txt de un proyecto
 
-                dependencies.append(package)
+        Args:
+            path: Ruta al proyecto
 
-            return dependencies
+        Returns:
+            Requisitos con nombre, especificador, extras y marcador
+        """
+        try:
+            content = self._read_file(path / 'requirements.txt')
+            if content is None:
+                return []
+            return parse_requirements(content)
         except Exception:
             return []
 
@@ -290,15 +523,15 @@ class ProjectManager:
         project_path = self.portfolio_dir / project_name
         req_file = project_path / 'requirements.txt'
 
-        if not req_file.exists():
-            return {
-                'exists': False,
-                'dependencies': [],
-                'count': 0
-            }
-
         try:
-            content = req_file.read_text()
+            content = self._read_file(req_file)
+            if content is None:
+                return {
+                    'exists': False,
+                    'dependencies': [],
+                    'count': 0
+                }
+
             lines = [l.strip() for l in content.split('\n') if l.strip() and not l.startswith('#')]
 
             return {
@@ -338,9 +571,8 @@ class ProjectManager:
             return {'success': False, 'error': 'Proyecto ya está en ejecución'}
 
         # Buscar archivo principal
-        main_files = ['app.py', 'main.py', 'run.py']
         main_file = None
-        for file in main_files:
+        for file in self.MAIN_FILES:
             if (project_path / file).exists():
                 main_file = file
                 break
@@ -358,7 +590,16 @@ class ProjectManager:
                 start_new_session=True
             )
 
-            self.running_processes[project_name] = process.pid
+            # Drenar stdout/stderr hacia el log del proyecto
+            output_pump.attach(project_name, process)
+
+            try:
+                create_time = psutil.Process(process.pid).create_time()
+            except psutil.Error:
+                create_time = None
+            self.running_processes[project_name] = (process.pid, create_time)
+            process_snapshots.invalidate()
+            port_snapshots.invalidate()
 
             return {
                 'success': True,
@@ -379,13 +620,20 @@ class ProjectManager:
         Returns:
             Resultado de la operación
         """
-        pid = self.running_processes.get(project_name)
+        pid = self._tracked_pid(project_name)
 
         if not pid:
-            # Intentar encontrar por puerto
+            # Proceso no lanzado por esta instancia de ORION: solo se señala si
+            # ejecuta el archivo principal con el cwd en el proyecto
             pid = self._find_pid_by_project(project_name)
+            if pid and not self._runs_project(pid, project_name):
+                return {
+                    'success': False,
+                    'error': f'El proceso {pid} usa el proyecto pero no lo lanzó ORION; deténgalo a mano'
+                }
 
         if not pid:
+            self.running_processes.pop(project_name, None)
             return {'success': False, 'error': 'Proyecto no está corriendo'}
 
         try:
@@ -395,8 +643,9 @@ class ProjectManager:
             process.wait(timeout=5)
 
             # Remover del tracking
-            if project_name in self.running_processes:
-                del self.running_processes[project_name]
+            self.running_processes.pop(project_name, None)
+            process_snapshots.invalidate()
+            port_snapshots.invalidate()
 
             return {
                 'success': True,
@@ -407,6 +656,9 @@ class ProjectManager:
             # Forzar cierre
             try:
                 process.kill()
+                self.running_processes.pop(project_name, None)
+                process_snapshots.invalidate()
+                port_snapshots.invalidate()
                 return {
                     'success': True,
                     'project': project_name,
@@ -430,14 +682,23 @@ class ProjectManager:
 
     def is_project_running(self, project_name: str) -> bool:
         """Verificar si un proyecto está corriendo"""
-        pid = self.running_processes.get(project_name)
+        return self._resolve_pid(project_name) is not None
+
+    def _resolve_pid(self, project_name: str) -> Optional[int]:
+        """
+        PID del proyecto
 
-        if pid and psutil.pid_exists(pid):
-            return True
+        Primero el proceso que lanzó ORION (vivo y con el mismo create_time,
+        para no confundirlo con un PID reutilizado); si no, el que la
+        instantánea asocia al proyecto por script, cmdline o cwd.
+        """
+        snapshot = get_process_snapshot()
+        tracked = self.running_processes.get(project_name)
+
+        if tracked and snapshot.has_pid(*tracked):
+            return tracked[0]
 
-        # Intentar por puerto
-        pid = self._find_pid_by_project(project_name)
-        return pid is not None
+        return snapshot.find_project(str(self.portfolio_dir / project_name), self.MAIN_FILES)
 
     def get_project_status(self, project_name: str, port: Optional[int] = None) -> Dict:
         """
@@ -450,12 +711,11 @@ class ProjectManager:
         Returns:
             Información de estado
         """
-        is_running = self.is_project_running(project_name)
-        pid = self.running_processes.get(project_name) or self._find_pid_by_project(project_name)
+        pid = self._resolve_pid(project_name)
 
         status = {
             'project': project_name,
-            'is_running': is_running,
+            'is_running': pid is not None,
             'pid': pid,
             'port': port,
             'port_active': False
@@ -465,37 +725,64 @@ class ProjectManager:
         if port:
             status['port_active'] = self._is_port_listening(port)
 
-        # Info del proceso si está corriendo
-        if pid and psutil.pid_exists(pid):
-            try:
-                process = psutil.Process(pid)
+        # Info del proceso si está corriendo (última muestra del sampler)
+        if pid:
+            process = get_process_snapshot().get_process(pid)
+            create_time = process['create_time'] if process else None
+            sample = process_sampler.get_sample(pid, create_time, project_name)
+
+            if sample:
                 status.update({
-                    'cpu_percent': process.cpu_percent(interval=0.1),
-                    'memory_mb': round(process.memory_info().rss / (1024 * 1024), 2),
-                    'uptime_seconds': int(process.create_time())
+                    'cpu_percent': sample['cpu_percent'],
+                    'memory_mb': sample['memory_mb'],
+                    'num_threads': sample['num_threads'],
+                    'uptime_seconds': int(create_time) if create_time else None
                 })
-            except Exception:
-                pass
 
         return status
 
     def _find_pid_by_project(self, project_name: str) -> Optional[int]:
-        """Encontrar PID de un proyecto buscando en procesos"""
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-            try:
-                cmdline = proc.info.get('cmdline', [])
-                if cmdline and project_name in ' '.join(cmdline):
-                    return proc.info['pid']
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        """Encontrar PID de un proyecto en la instantánea compartida de procesos"""
+        return get_process_snapshot().find_project(
+            str(self.portfolio_dir / project_name),
+            self.MAIN_FILES
+        )
+
+    def _tracked_pid(self, project_name: str) -> Optional[int]:
+        """PID lanzado por ORION si sigue siendo el mismo proceso (si no, se olvida)"""
+        tracked = self.running_processes.get(project_name)
+        if not tracked:
+            return None
+
+        pid, create_time = tracked
+        try:
+            if create_time is None or psutil.Process(pid).create_time() == create_time:
+                return pid
+        except psutil.Error:
+            pass
+
+        self.running_processes.pop(project_name, None)
         return None
 
+    def _runs_project(self, pid: int, project_name: str) -> bool:
+        """Comprobar en vivo, antes de señalarlo, que el proceso ejecuta el proyecto"""
+        project_path = os.path.normpath(str(self.portfolio_dir / project_name))
+        try:
+            process = psutil.Process(pid)
+            cwd = process.cwd()
+            script = python_script(process.cmdline(), cwd)
+        except psutil.Error:
+            return False
+
+        return (
+            script is not None
+            and os.path.normpath(cwd) == project_path
+            and script in {os.path.join(project_path, main_file) for main_file in self.MAIN_FILES}
+        )
+
     def _is_port_listening(self, port: int) -> bool:
         """Verificar si un puerto está en escucha"""
-        for conn in psutil.net_connections(kind='inet'):
-            if conn.status == 'LISTEN' and conn.laddr.port == port:
-                return True
-        return False
+        return get_port_snapshot().is_listening(port)
 
     # ==================== UTILIDADES ====================
 
@@ -0,0 +1,187 @@
+"""
+ORION Process Sampler
+Muestreo en segundo plano de CPU, memoria e hilos de los proyectos
+"""
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+from config import SAMPLER_INTERVAL, SAMPLER_IDLE_TIMEOUT
+
+
+class ProcessSampler:
+    """
+    Muestreador de procesos en un hilo de fondo
+
+    Mantiene objetos psutil.Process ya cebados, indexados por
+    (pid, create_time) para no confundir PIDs reutilizados. Las consultas
+    de estado leen la última muestra sin bloquear.
+    """
+
+    def __init__(self, interval: float = SAMPLER_INTERVAL, idle_timeout: float = SAMPLER_IDLE_TIMEOUT):
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self._processes: Dict[Tuple[int, float], psutil.Process] = {}
+        self._samples: Dict[Tuple[int, float], Dict] = {}
+        self._last_access: Dict[Tuple[int, float], float] = {}
+        self._labels: Dict[Tuple[int, float], str] = {}
+        self._listeners: List[Callable[[List[Tuple[str, Dict]]], None]] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self):
+        """Arrancar el hilo de muestreo (idempotente)"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="orion-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detener el hilo de muestreo"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+
+    def _run(self):
+        """Bucle principal del muestreador"""
+        while not self._stop_event.wait(self.interval):
+            self.sample_all()
+
+    # ==================== MUESTREO ====================
+
+    def add_listener(self, callback: Callable[[List[Tuple[str, Dict]]], None]):
+        """Recibir tras cada ciclo la lista [(proyecto, muestra)] de procesos etiquetados"""
+        self._listeners.append(callback)
+
+    def track(self, pid: int, create_time: Optional[float] = None,
+              label: Optional[str] = None) -> Optional[Tuple[int, float]]:
+        """
+        Registrar un proceso para muestreo
+
+        Args:
+            pid: PID del proceso
+            create_time: Momento de creación (si ya se conoce)
+            label: Proyecto al que pertenece el proceso
+
+        Returns:
+            Clave (pid, create_time) o None si el proceso no existe
+        """
+        if create_time is not None:
+            key = (pid, create_time)
+            with self._lock:
+                if key in self._processes:
+                    self._last_access[key] = time.monotonic()
+                    if label:
+                        self._labels[key] = label
+                    return key
+
+        try:
+            process = psutil.Process(pid)
+            key = (pid, process.create_time())
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+
+        with self._lock:
+            if key not in self._processes:
+                self._processes[key] = process
+                self._samples[key] = self._sample(process)
+            self._last_access[key] = time.monotonic()
+            if label:
+                self._labels[key] = label
+
+        return key
+
+    def sample_all(self):
+        """Refrescar la muestra de todos los procesos registrados"""
+        now = time.monotonic()
+
+        with self._lock:
+            tracked = list(self._processes.items())
+
+        labelled = []
+        for key, process in tracked:
+            sample = self._sample(process)
+
+            with self._lock:
+                idle = now - self._last_access.get(key, now) > self.idle_timeout
+                if sample is None or idle:
+                    self._forget(key)
+                elif key in self._processes:
+                    self._samples[key] = sample
+                    if key in self._labels:
+                        labelled.append((self._labels[key], sample))
+
+        for callback in self._listeners:
+            try:
+                callback(labelled)
+            except Exception:
+                pass
+
+    def _sample(self, process: psutil.Process) -> Optional[Dict]:
+        """Tomar una muestra de un proceso (None si ya terminó)"""
+        try:
+            with process.oneshot():
+                if not process.is_running():
+                    return None
+                return {
+                    'cpu_percent': process.cpu_percent(interval=None),
+                    'memory_mb': round(process.memory_info().rss / (1024 * 1024), 2),
+                    'num_threads': process.num_threads(),
+                    'sampled_at': time.time()
+                }
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return None
+        except psutil.AccessDenied:
+            return {
+                'cpu_percent': 0.0,
+                'memory_mb': 0.0,
+                'num_threads': 0,
+                'sampled_at': time.time()
+            }
+
+    def _forget(self, key: Tuple[int, float]):
+        """Eliminar un proceso del muestreo (requiere el lock)"""
+        self._processes.pop(key, None)
+        self._samples.pop(key, None)
+        self._last_access.pop(key, None)
+        self._labels.pop(key, None)
+
+    # ==================== CONSULTAS ====================
+
+    def get_sample(self, pid: int, create_time: Optional[float] = None,
+                   label: Optional[str] = None) -> Optional[Dict]:
+        """
+        Última muestra de un proceso sin bloquear
+
+        Si el proceso no estaba registrado se registra en este momento; la
+        primera lectura de CPU será 0.0 hasta el siguiente ciclo.
+        """
+        key = self.track(pid, create_time, label)
+        if key is None:
+            return None
+
+        with self._lock:
+            sample = self._samples.get(key)
+            return dict(sample) if sample else None
+
+    def get_stats(self) -> Dict:
+        """Estado del muestreador"""
+        with self._lock:
+            tracked = len(self._processes)
+        return {
+            'running': bool(self._thread and self._thread.is_alive()),
+            'interval': self.interval,
+            'tracked_processes': tracked
+        }
+
+
+# Instancia global
+process_sampler = ProcessSampler()
@@ -0,0 +1,255 @@
+"""
+ORION Snapshots
+Instantáneas compartidas del sistema construidas en una sola pasada
+"""
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import psutil
+
+from config import PROCESS_SNAPSHOT_TTL, PORT_SNAPSHOT_TTL
+
+# Intérpretes reconocidos: python, python3, python3.11...
+PYTHON_PATTERN = re.compile(r'^python(\d+(\.\d+)*)?$')
+
+
+class ProcessSnapshot:
+    """
+    Índice de la tabla de procesos construido con un único recorrido
+
+    Cada proceso queda indexado por el script que ejecuta (si es python),
+    por su cwd y por las rutas que aparecen en su cmdline junto con sus
+    directorios padre, así que la búsqueda de un proyecto es un acceso O(1)
+    a diccionario: `python3 /ruta/proyecto/app.py` desde cualquier
+    directorio, `uvicorn app:app` o `python -m uvicorn` con el cwd en el
+    proyecto y `gunicorn --chdir /ruta/proyecto ...` cuentan como el
+    proyecto. La comprobación estricta (script principal y cwd) la hace
+    ProjectManager antes de detener un proceso que no lanzó.
+    """
+
+    def __init__(self):
+        self.created_at = time.monotonic()
+        self.processes: Dict[int, Dict] = {}
+        self.by_script: Dict[str, int] = {}
+        self.by_cwd: Dict[str, int] = {}
+        self.by_path: Dict[str, int] = {}
+        self._build()
+
+    def _build(self):
+        """Recorrer psutil.process_iter una sola vez"""
+        for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'cwd', 'create_time']):
+            try:
+                info = proc.info
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+            pid = info['pid']
+            cmdline = info.get('cmdline') or []
+            cwd = info.get('cwd')
+
+            self.processes[pid] = {
+                'pid': pid,
+                'name': info.get('name') or 'unknown',
+                'cmdline': cmdline,
+                'cwd': cwd,
+                'create_time': info.get('create_time')
+            }
+
+            script = python_script(cmdline, cwd)
+            if script:
+                self.by_script.setdefault(script, pid)
+
+            if cwd:
+                self.by_cwd.setdefault(os.path.normpath(cwd), pid)
+
+            for path in path_tokens(cmdline, cwd):
+                # La ruta y cada directorio padre: el proyecto se busca por su directorio
+                while True:
+                    self.by_path.setdefault(path, pid)
+                    parent = os.path.dirname(path)
+                    if parent == path:
+                        break
+                    path = parent
+
+    def age(self) -> float:
+        """Segundos transcurridos desde que se construyó la instantánea"""
+        return time.monotonic() - self.created_at
+
+    def has_pid(self, pid: Optional[int], create_time: Optional[float] = None) -> bool:
+        """
+        Verificar si un PID existía al tomar la instantánea
+
+        Con create_time, además, que sea el mismo proceso (el PID no se reutilizó)
+        """
+        process = self.processes.get(pid) if pid is not None else None
+        if process is None:
+            return False
+        return create_time is None or process['create_time'] == create_time
+
+    def get_process(self, pid: Optional[int]) -> Optional[Dict]:
+        """Información básica de un proceso de la instantánea"""
+        return self.processes.get(pid) if pid is not None else None
+
+    def find_project(self, project_path: str, main_files: Iterable[str]) -> Optional[int]:
+        """
+        Encontrar el PID de un proyecto
+
+        Por orden de preferencia: un intérprete que ejecuta uno de sus
+        archivos principales, un proceso con una ruta del proyecto en el
+        cmdline y un proceso con el cwd en el proyecto.
+
+        Args:
+            project_path: Ruta absoluta del proyecto
+            main_files: Archivos principales posibles (app.py, main.py...)
+
+        Returns:
+            PID del proceso, o None si no está corriendo
+        """
+        project_path = os.path.normpath(str(project_path))
+
+        for main_file in main_files:
+            pid = self.by_script.get(os.path.join(project_path, main_file))
+            if pid is not None:
+                return pid
+
+        pid = self.by_path.get(project_path)
+        if pid is None:
+            pid = self.by_cwd.get(project_path)
+        return pid
+
+
+def python_script(cmdline: List[str], cwd: Optional[str]) -> Optional[str]:
+    """
+    Ruta absoluta del script que ejecuta un intérprete de Python
+
+    Returns:
+        None si el proceso no es python, ejecuta un módulo (-m) o código (-c)
+    """
+    if not cmdline or not PYTHON_PATTERN.match(os.path.basename(cmdline[0])):
+        return None
+
+    for arg in cmdline[1:]:
+        if arg in ('-m', '-c'):
+            return None
+        if arg.startswith('-'):
+            continue
+        if not os.path.isabs(arg):
+            if not cwd:
+                return None
+            arg = os.path.join(cwd, arg)
+        return os.path.normpath(arg)
+
+    return None
+
+
+def path_tokens(cmdline: List[str], cwd: Optional[str]) -> Iterator[str]:
+    """
+    Rutas absolutas que nombra un cmdline
+
+    Los argumentos absolutos y los valores de opciones '--opcion=/ruta'
+    cuentan tal cual; los relativos solo si parecen una ruta (llevan '/' o
+    terminan en .py) y se resuelven contra el cwd.
+    """
+    for arg in cmdline:
+        if arg.startswith('-'):
+            if '=' not in arg:
+                continue
+            arg = arg.split('=', 1)[1]
+        if not arg:
+            continue
+        if not os.path.isabs(arg):
+            if not cwd or ('/' not in arg and not arg.endswith('.py')):
+                continue
+            arg = os.path.join(cwd, arg)
+        yield os.path.normpath(arg)
+
+
+class PortSnapshot:
+    """
+    Tabla de sockets en escucha construida con un único escaneo
+
+    Mapea puerto -> (pid, dirección) a partir de una sola llamada a
+    psutil.net_connections.
+    """
+
+    def __init__(self):
+        self.created_at = time.monotonic()
+        self.listeners: List[Dict] = []
+        self.by_port: Dict[int, Dict] = {}
+        self._build()
+
+    def _build(self):
+        """Escanear los sockets inet una sola vez"""
+        try:
+            connections = psutil.net_connections(kind='inet')
+        except psutil.AccessDenied:
+            connections = []
+
+        for conn in connections:
+            if conn.status != psutil.CONN_LISTEN or not conn.laddr:
+                continue
+
+            entry = {
+                'port': conn.laddr.port,
+                'address': conn.laddr.ip,
+                'pid': conn.pid
+            }
+            self.listeners.append(entry)
+            self.by_port.setdefault(conn.laddr.port, entry)
+
+    def age(self) -> float:
+        """Segundos transcurridos desde que se construyó la instantánea"""
+        return time.monotonic() - self.created_at
+
+    def is_listening(self, port: int) -> bool:
+        """Verificar si un puerto está en escucha"""
+        return port in self.by_port
+
+    def get(self, port: int) -> Optional[Dict]:
+        """Entrada (pid, dirección) de un puerto en escucha"""
+        return self.by_port.get(port)
+
+
+class SnapshotCache:
+    """Cache con TTL de una instantánea; se reconstruye al expirar"""
+
+    def __init__(self, factory, ttl: float):
+        self.factory = factory
+        self.ttl = ttl
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self, max_age: Optional[float] = None):
+        """Obtener la instantánea vigente o construir una nueva"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            if self._snapshot is None or self._snapshot.age() > max_age:
+                self._snapshot = self.factory()
+            return self._snapshot
+
+    def peek(self):
+        """Instantánea actual sin reconstruirla (puede ser None)"""
+        return self._snapshot
+
+    def invalidate(self):
+        """Forzar la reconstrucción en la siguiente lectura"""
+        with self._lock:
+            self._snapshot = None
+
+
+# Instancias globales
+process_snapshots = SnapshotCache(ProcessSnapshot, PROCESS_SNAPSHOT_TTL)
+port_snapshots = SnapshotCache(PortSnapshot, PORT_SNAPSHOT_TTL)
+
+
+def get_process_snapshot(max_age: Optional[float] = None) -> ProcessSnapshot:
+    """Instantánea de procesos compartida (reutilizada dentro del TTL)"""
+    return process_snapshots.get(max_age)
+
+
+def get_port_snapshot(max_age: Optional[float] = None) -> PortSnapshot:
+    """Tabla de puertos en escucha compartida (reutilizada dentro del TTL)"""
+    return port_snapshots.get(max_age)
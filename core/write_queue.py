@@ -0,0 +1,244 @@
+"""
+ORION Write Queue
+Escritura diferida y por lotes del estado de proyectos y de su actividad
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    WRITE_QUEUE_INTERVAL,
+    WRITE_QUEUE_MAX_BATCH,
+    WRITE_QUEUE_MAX_RETRIES,
+    WRITE_QUEUE_DURABILITY
+)
+from core.database import db, Database
+from core.logger import logger
+
+# Modos de durabilidad admitidos
+DURABILITY_MODES = ('async', 'batch', 'sync')
+
+
+class _Batch:
+    """Escrituras pendientes que se confirman en una misma transacción"""
+
+    def __init__(self):
+        self.updates: Dict[str, Tuple[Dict, str]] = {}
+        self.events: List[Tuple[str, str, str, str]] = []
+        self.attempts = 0
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+        # Lote en el que se fusionó este (tras un fallo del anterior)
+        self.forward: Optional['_Batch'] = None
+
+    def __len__(self) -> int:
+        return len(self.updates) + len(self.events)
+
+    def absorb(self, newer: '_Batch'):
+        """Fusionar un lote posterior: sus campos pisan a los de este"""
+        for nombre, (fields, timestamp) in newer.updates.items():
+            previous = self.updates.get(nombre, ({}, timestamp))[0]
+            self.updates[nombre] = ({**previous, **fields}, timestamp)
+        self.events.extend(newer.events)
+        newer.forward = self
+        newer.done.set()
+
+
+class WriteQueue:
+    """
+    Cola de escritura diferida para las acciones sobre proyectos
+
+    Los cambios de estado (update_project) y los eventos de actividad
+    (log_activity) se acumulan en memoria y un hilo de fondo los escribe
+    cada WRITE_QUEUE_INTERVAL segundos en una sola transacción. Los cambios
+    de un mismo proyecto se fusionan (gana el último valor de cada campo);
+    los eventos conservan su orden y el timestamp del momento en que se
+    encolaron.
+
+    Durabilidad (WRITE_QUEUE_DURABILITY):
+        async: se vuelve sin esperar; un corte puede perder el último intervalo
+        batch: se espera al commit del lote, compartido con las demás peticiones
+        sync:  escritura directa en la BD, como antes de la cola
+    """
+
+    def __init__(self, database: Database = db, interval: float = WRITE_QUEUE_INTERVAL,
+                 max_batch: int = WRITE_QUEUE_MAX_BATCH, durability: str = WRITE_QUEUE_DURABILITY,
+                 max_retries: int = WRITE_QUEUE_MAX_RETRIES):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Durabilidad no válida: {durability} (opciones: {', '.join(DURABILITY_MODES)})")
+
+        self.db = database
+        self.interval = interval
+        self.max_batch = max_batch
+        self.durability = durability
+        self.max_retries = max_retries
+        self._batch = _Batch()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {'enqueued': 0, 'batches': 0, 'written': 0, 'failures': 0, 'dropped': 0}
+
+    # ==================== CICLO DE VIDA ====================
+
+    def start(self):
+        """Arrancar el hilo de escritura (idempotente)"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="orion-write-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detener el hilo y escribir lo pendiente"""
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2 + 5)
+            self._thread = None
+
+        # Último intento, con reintentos inmediatos si la BD está ocupada
+        for _ in range(self.max_retries + 1):
+            self.flush()
+            if not self.pending():
+                break
+
+    def _run(self):
+        """Bucle de escritura"""
+        while not self._stop_event.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    # ==================== ESCRITURA ====================
+
+    def update_project(self, nombre: str, **kwargs):
+        """Encolar la actualización de campos de un proyecto (ver Database.update_project)"""
+        self.record(nombre, **kwargs)
+
+    def log_activity(self, nombre_proyecto: str, tipo_evento: str, descripcion: str):
+        """Encolar un evento de actividad (ver Database.log_activity)"""
+        self.record(nombre_proyecto, event=(tipo_evento, descripcion))
+
+    def record(self, nombre: str, event: Optional[Tuple[str, str]] = None, **kwargs):
+        """
+        Encolar cambios de un proyecto y, opcionalmente, su evento de actividad
+
+        Ambos van al mismo lote, de modo que en modo batch se espera un
+        único commit.
+
+        Args:
+            nombre: Nombre del proyecto
+            event: (tipo_evento, descripcion) a registrar en la actividad
+            **kwargs: Campos a actualizar (estado, pid...)
+        """
+        if self.durability == 'sync':
+            with self.db.get_connection():
+                if kwargs:
+                    self.db.update_project(nombre, **kwargs)
+                if event:
+                    self.db.log_activity(nombre, *event)
+            return
+
+        timestamp = self._timestamp()
+        with self._lock:
+            batch = self._batch
+            if kwargs:
+                previous = batch.updates.get(nombre, ({}, timestamp))[0]
+                batch.updates[nombre] = ({**previous, **kwargs}, timestamp)
+            if event:
+                batch.events.append((nombre, event[0], event[1], timestamp))
+            self._stats['enqueued'] += 1
+            if len(batch) >= self.max_batch:
+                self._wake.set()
+
+        self._wait(batch)
+
+    def _timestamp(self) -> str:
+        """Mismo formato que CURRENT_TIMESTAMP de SQLite (UTC)"""
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+    def _wait(self, batch: _Batch):
+        """En modo batch, esperar al commit del lote que contiene la escritura"""
+        if self.durability != 'batch':
+            return
+
+        if not (self._thread and self._thread.is_alive()):
+            self.flush()
+
+        while True:
+            batch.done.wait()
+            if batch.forward is None:
+                break
+            batch = batch.forward
+
+        if batch.error:
+            raise batch.error
+
+    def flush(self) -> int:
+        """
+        Escribir el lote pendiente en una transacción
+
+        Si falla, el lote vuelve a la cola (fusionado con lo encolado
+        mientras tanto) hasta WRITE_QUEUE_MAX_RETRIES veces; después se
+        descarta y el error se propaga a quien espera en modo batch.
+
+        Returns:
+            Número de escrituras confirmadas
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._batch = self._batch, _Batch()
+
+            if not len(batch):
+                batch.done.set()
+                return 0
+
+            try:
+                self.db.apply_writes(batch.updates, batch.events)
+            except Exception as e:
+                batch.attempts += 1
+                with self._lock:
+                    self._stats['failures'] += 1
+                    if batch.attempts <= self.max_retries:
+                        batch.absorb(self._batch)
+                        self._batch = batch
+                        logger.warning(f"Error escribiendo lote de la cola (reintento {batch.attempts}): {str(e)}")
+                        return 0
+                    self._stats['dropped'] += len(batch)
+
+                logger.error(f"Lote de la cola de escritura descartado ({len(batch)} escrituras): {str(e)}")
+                batch.error = e
+                batch.done.set()
+                return 0
+
+            with self._lock:
+                self._stats['batches'] += 1
+                self._stats['written'] += len(batch)
+
+            batch.done.set()
+            return len(batch)
+
+    # ==================== CONSULTAS ====================
+
+    def pending(self) -> int:
+        """Escrituras aún no confirmadas"""
+        with self._lock:
+            return len(self._batch)
+
+    def get_stats(self) -> Dict:
+        """Estado de la cola"""
+        with self._lock:
+            return {
+                'running': bool(self._thread and self._thread.is_alive()),
+                'durability': self.durability,
+                'interval': self.interval,
+                'pending': len(self._batch),
+                **self._stats
+            }
+
+
+# Instancia global
+write_queue = WriteQueue()
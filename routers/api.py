@@ -2,12 +2,27 @@
 Router API
 Endpoints REST para acceso programático
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from typing import Optional
+from fastapi.responses import StreamingResponse, JSONResponse
 from datetime import datetime
+import asyncio
 
 from core.database import db
 from core.logger import read_logs, get_logs_summary, logger
 from core.project_manager import project_manager
+from config import STREAM_KEEPALIVE, ACTIVITY_PAGE_MAX, LOG_MERGE_MAX, LOG_SEARCH_MAX
+from core.log_reader import merge_logs, list_log_files
+from core.executor import executor, run_blocking
+from core.output_pump import output_pump
+from core.metrics import metrics_store
+from core.dependencies import dependency_index
+from core.maintenance import maintenance_job
+from core.write_queue import write_queue
+from core.log_queue import log_pipeline
+from core.log_search import log_search
+from core.portfolio_watcher import portfolio_watcher
+from services.status_registry import status_registry
 
 router = APIRouter(prefix="/api")
 
@@ -16,8 +31,8 @@ router = APIRouter(prefix="/api")
 async def get_status():
     """Estado general del sistema"""
     try:
-        stats = db.get_stats()
-        logs_summary = get_logs_summary()
+        stats = await run_blocking(db.get_stats)
+        logs_summary = await run_blocking(get_logs_summary)
 
         return {
             "status": "online",
@@ -27,7 +42,15 @@ async def get_status():
             "proyectos": stats,
             "logs": {
                 "proyectos_con_logs": len(logs_summary)
-            }
+            },
+            "executor": executor.get_stats(),
+            "database": db.get_pool_stats(),
+            "maintenance": maintenance_job.get_stats(),
+            "write_queue": write_queue.get_stats(),
+            "log_queue": log_pipeline.get_stats(),
+            "log_search": await run_blocking(log_search.get_stats),
+            "output_pump": output_pump.get_stats(),
+            "portfolio_watcher": portfolio_watcher.get_stats()
         }
     except Exception as e:
         logger.error(f"Error en API status: {str(e)}")
@@ -35,51 +58,76 @@ async def get_status():
 
 
 @router.get("/proyectos")
-async def list_projects():
-    """Listar todos los proyectos"""
+async def list_projects(fresh: bool = False):
+    """Listar todos los proyectos (?fresh=1 fuerza un refresco del registro)"""
     try:
-        proyectos = db.list_projects()
+        state = await status_registry.get_state(fresh)
+        proyectos = state['proyectos']
 
         # Enriquecer con estado real
         for proyecto in proyectos:
-            status = project_manager.get_project_status(
-                proyecto['nombre'],
-                proyecto.get('puerto')
-            )
-            proyecto['real_status'] = status
+            proyecto['real_status'] = state['status'].get(proyecto['nombre'], {})
 
         return {
             "success": True,
             "count": len(proyectos),
-            "proyectos": proyectos
+            "proyectos": proyectos,
+            "freshness": state['freshness']
         }
     except Exception as e:
         logger.error(f"Error listando proyectos: {str(e)}")
         return {"success": False, "error": str(e)}
 
 
+@router.get("/stream")
+async def stream_status(request: Request):
+    """
+    Stream SSE con los cambios de estado
+
+    Envía un evento `snapshot` al conectar y después solo eventos `delta`
+    con los cambios de proyectos, puertos y recursos publicados por el
+    colector.
+    """
+    async def event_stream():
+        queue = status_registry.subscribe()
+        try:
+            event, data = await status_registry.get_snapshot_event()
+            yield f"event: {event}\ndata: {data}\n\n"
+
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {data}\n\n"
+        finally:
+            status_registry.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/proyecto/{nombre}")
-async def get_project(nombre: str):
-    """Obtener información completa de un proyecto incluyendo análisis de app.py"""
+async def get_project(nombre: str, fresh: bool = False):
+    """Obtener información completa de un proyecto incluyendo análisis de app.py (?fresh=1 revalida)"""
     try:
-        proyecto = db.get_project(nombre)
+        proyecto = await run_blocking(db.get_project, nombre)
 
         if not proyecto:
             return {"success": False, "error": "Proyecto no encontrado"}
 
         # Estado real
-        status = project_manager.get_project_status(nombre, proyecto.get('puerto'))
+        status = await run_blocking(project_manager.get_project_status, nombre, proyecto.get('puerto'))
 
         # Requirements
-        req_info = project_manager.get_requirements_info(nombre)
+        req_info = await run_blocking(project_manager.get_requirements_info, nombre)
 
-        # Análisis completo del proyecto (re-analizar para obtener datos frescos)
-        from pathlib import Path
-        project_path = Path(proyecto['ruta'])
-        if project_path.exists():
-            analysis = project_manager._analyze_project(project_path)
-        else:
-            analysis = None
+        # Análisis guardado en orion.db (se recalcula solo si cambió el código)
+        analysis = await run_blocking(project_manager.get_analysis, nombre, fresh)
 
         return {
             "success": True,
@@ -105,7 +153,7 @@ async def get_project(nombre: str):
 async def get_project_logs(nombre: str, limit: int = 100):
     """Obtener logs de un proyecto"""
     try:
-        logs = read_logs(nombre, limit=limit)
+        logs = await run_blocking(read_logs, nombre, limit=limit)
 
         return {
             "success": True,
@@ -122,7 +170,7 @@ async def get_project_logs(nombre: str, limit: int = 100):
 async def get_project_requirements(nombre: str):
     """Obtener requirements.txt de un proyecto"""
     try:
-        req_info = project_manager.get_requirements_info(nombre)
+        req_info = await run_blocking(project_manager.get_requirements_info, nombre)
 
         return {
             "success": True,
@@ -138,12 +186,12 @@ async def get_project_requirements(nombre: str):
 async def get_project_status(nombre: str):
     """Obtener estado en tiempo real de un proyecto"""
     try:
-        proyecto = db.get_project(nombre)
+        proyecto = await run_blocking(db.get_project, nombre)
 
         if not proyecto:
             return {"success": False, "error": "Proyecto no encontrado"}
 
-        status = project_manager.get_project_status(nombre, proyecto.get('puerto'))
+        status = await run_blocking(project_manager.get_project_status, nombre, proyecto.get('puerto'))
 
         return {
             "success": True,
@@ -155,23 +203,85 @@ async def get_project_status(nombre: str):
         return {"success": False, "error": str(e)}
 
 
+@router.get("/proyecto/{nombre}/metricas")
+async def get_project_metrics(nombre: str, resolution: Optional[str] = None,
+                              since: Optional[int] = None, until: Optional[int] = None):
+    """
+    Historial de CPU y memoria de un proyecto
+
+    Args:
+        resolution: '1s', '1m' o '1h' (por defecto se elige según el rango)
+        since, until: Rango en epoch (segundos); por defecto la última hora
+    """
+    try:
+        series = await run_blocking(metrics_store.query, nombre, resolution, since, until)
+
+        return {
+            "success": True,
+            "proyecto": nombre,
+            "metricas": series
+        }
+    except ValueError as e:
+        return JSONResponse({"success": False, "error": str(e)}, status_code=400)
+    except Exception as e:
+        logger.error(f"Error obteniendo métricas de {nombre}: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/proyecto/{nombre}/actividad")
+async def get_project_activity(nombre: str, limit: int = 50, cursor: Optional[str] = None):
+    """
+    Actividad de un proyecto paginada por clave
+
+    Args:
+        limit: Eventos por página (máximo ACTIVITY_PAGE_MAX)
+        cursor: next_cursor de la respuesta anterior
+    """
+    try:
+        limit = max(1, min(limit, ACTIVITY_PAGE_MAX))
+
+        # La primera página incluye los eventos que aún están en la cola
+        if not cursor and write_queue.pending():
+            await run_blocking(write_queue.flush)
+
+        page = await run_blocking(db.get_activity_page, nombre, limit, cursor)
+
+        return {
+            "success": True,
+            "proyecto": nombre,
+            "count": len(page['items']),
+            "actividad": page['items'],
+            "next_cursor": page['next_cursor']
+        }
+    except ValueError as e:
+        return JSONResponse({"success": False, "error": str(e)}, status_code=400)
+    except Exception as e:
+        logger.error(f"Error obteniendo actividad de {nombre}: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/proyecto/{nombre}/actividad/diaria")
+async def get_project_activity_daily(nombre: str, limit: int = 90):
+    """Resúmenes diarios de la actividad ya compactada por la retención"""
+    try:
+        days = await run_blocking(db.get_activity_daily, nombre, limit)
+        return {"success": True, "proyecto": nombre, "count": len(days), "dias": days}
+    except Exception as e:
+        logger.error(f"Error obteniendo resumen de actividad de {nombre}: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
 @router.get("/proyecto/{nombre}/analysis")
-async def get_project_analysis(nombre: str):
-    """Obtener análisis detallado de app.py de un proyecto"""
+async def get_project_analysis(nombre: str, fresh: bool = False):
+    """Obtener análisis detallado de app.py de un proyecto (?fresh=1 revalida)"""
     try:
-        proyecto = db.get_project(nombre)
+        proyecto = await run_blocking(db.get_project, nombre)
 
         if not proyecto:
             return {"success": False, "error": "Proyecto no encontrado"}
 
-        # Analizar proyecto
-        from pathlib import Path
-        project_path = Path(proyecto['ruta'])
-
-        if not project_path.exists():
-            return {"success": False, "error": "Ruta del proyecto no existe"}
-
-        analysis = project_manager._analyze_project(project_path)
+        # Análisis guardado en orion.db (se recalcula solo si cambió el código)
+        analysis = await run_blocking(project_manager.get_analysis, nombre, fresh)
 
         if not analysis:
             return {"success": False, "error": "No se pudo analizar el proyecto"}
@@ -201,17 +311,156 @@ async def get_project_analysis(nombre: str):
         return {"success": False, "error": str(e)}
 
 
+# ==================== DEPENDENCIAS ====================
+
+@router.get("/dependencias")
+async def get_dependencies_summary(limit: int = 50):
+    """Paquetes más usados en el portfolio"""
+    try:
+        summary = await run_blocking(dependency_index.summary, limit)
+        return {"success": True, **summary}
+    except Exception as e:
+        logger.error(f"Error obteniendo resumen de dependencias: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/dependencias/skew")
+async def get_dependencies_skew(min_proyectos: int = 2):
+    """Paquetes usados con versiones/especificadores distintos entre proyectos"""
+    try:
+        report = await run_blocking(dependency_index.skew, min_proyectos)
+        return {"success": True, "count": len(report), "paquetes": report}
+    except Exception as e:
+        logger.error(f"Error calculando version skew: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/dependencias/{paquete}")
+async def get_dependency_users(paquete: str, specifier: Optional[str] = None, version: Optional[str] = None):
+    """
+    Proyectos que usan un paquete
+
+    ?specifier=<6 filtra los proyectos cuyo rango admite alguna versión <6;
+    ?version=5.9.6 los que admiten esa versión exacta.
+    """
+    try:
+        rows = await run_blocking(dependency_index.find, paquete, specifier, version)
+        return {
+            "success": True,
+            "paquete": paquete,
+            "count": len(rows),
+            "proyectos": rows
+        }
+    except ValueError as e:
+        # InvalidSpecifier / InvalidVersion de un ?specifier= o ?version= mal formado
+        return JSONResponse({"success": False, "error": str(e)}, status_code=400)
+    except Exception as e:
+        logger.error(f"Error buscando dependencia {paquete}: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/executor")
+async def get_executor_stats():
+    """Métricas del pool de hilos para llamadas bloqueantes"""
+    return {
+        "success": True,
+        "executor": executor.get_stats()
+    }
+
+
 @router.get("/logs/summary")
 async def get_all_logs_summary():
     """Resumen de todos los logs"""
     try:
-        summary = get_logs_summary()
+        summary = await run_blocking(get_logs_summary)
+        queue_stats = log_pipeline.get_stats()
 
         return {
             "success": True,
             "count": len(summary),
-            "summary": summary
+            "summary": summary,
+            # Registros descartados con la cola de logs llena (modo drop)
+            "dropped_records": queue_stats['dropped'],
+            "queue_depth": queue_stats['depth']
         }
     except Exception as e:
         logger.error(f"Error obteniendo summary de logs: {str(e)}")
         return {"success": False, "error": str(e)}
+
+
+@router.get("/logs/queue")
+async def get_log_queue_stats():
+    """Cola de escritura de logs: profundidad, registros descartados y esperas"""
+    return {
+        "success": True,
+        "log_queue": log_pipeline.get_stats()
+    }
+
+
+@router.get("/logs/search")
+async def search_logs(q: Optional[str] = None, project: Optional[str] = None, level: Optional[str] = None,
+                      since: Optional[str] = None, until: Optional[str] = None, limit: int = 50,
+                      cursor: Optional[str] = None):
+    """
+    Búsqueda de texto completo en los logs (índice FTS5 de core.log_search)
+
+    Args:
+        q: Palabras a buscar (todas deben aparecer; 'palabra*' por prefijo).
+            Sin q se listan las entradas filtradas, de la más reciente a la más antigua
+        project: Nombre del proyecto (archivo de log)
+        level: Niveles separados por comas (p. ej. 'ERROR,WARNING')
+        since: Desde este timestamp ISO
+        until: Hasta este timestamp ISO
+        limit: Resultados por página (máximo LOG_SEARCH_MAX)
+        cursor: next_cursor de la respuesta anterior
+    """
+    try:
+        levels = [item for item in level.split(',') if item] if level else None
+        page = await run_blocking(
+            log_search.search, q, project, levels, since, until, max(1, min(limit, LOG_SEARCH_MAX)), cursor
+        )
+
+        return {
+            "success": True,
+            "count": len(page['items']),
+            "resultados": page['items'],
+            "next_cursor": page['next_cursor']
+        }
+    except ValueError as e:
+        return JSONResponse({"success": False, "error": str(e)}, status_code=400)
+    except Exception as e:
+        logger.error(f"Error buscando en logs: {str(e)}")
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/logs")
+async def get_merged_logs(limit: int = 500, since: Optional[str] = None, until: Optional[str] = None,
+                          level: Optional[str] = None, cursor: Optional[str] = None):
+    """
+    Entradas de todos los logs mezcladas por timestamp, de la más reciente a la más antigua
+
+    Args:
+        limit: Entradas por página (máximo LOG_MERGE_MAX)
+        since: Desde este timestamp ISO
+        until: Hasta este timestamp ISO
+        level: Niveles separados por comas (p. ej. 'ERROR,WARNING')
+        cursor: next_cursor de la respuesta anterior
+    """
+    try:
+        levels = [item for item in level.split(',') if item] if level else None
+        files = await run_blocking(list_log_files)
+        page = await run_blocking(
+            merge_logs, files, max(1, min(limit, LOG_MERGE_MAX)), since, until, levels, cursor
+        )
+
+        return {
+            "success": True,
+            "count": len(page['items']),
+            "logs": page['items'],
+            "next_cursor": page['next_cursor']
+        }
+    except ValueError as e:
+        return JSONResponse({"success": False, "error": str(e)}, status_code=400)
+    except Exception as e:
+        logger.error(f"Error mezclando logs: {str(e)}")
+        return {"success": False, "error": str(e)}
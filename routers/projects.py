@@ -2,14 +2,22 @@
 Router de Proyectos
 Gestión de proyectos del portfolio
 """
+from typing import Optional
+
 from fastapi import APIRouter, Request, Form
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse, JSONResponse
 
 from core.database import db
+from config import LOG_MERGE_MAX
 from core.logger import read_logs, logger
+from core.log_reader import merge_logs, list_log_files
 from core.project_manager import project_manager
+from core.executor import run_blocking
+from core.dependencies import dependency_index
+from core.write_queue import write_queue
 from services.git_service import GitManager
+from services.status_registry import status_registry
 
 templates = Jinja2Templates(directory="templates")
 router = APIRouter()
@@ -22,22 +30,22 @@ router = APIRouter()
 async def project_detail(request: Request, nombre: str):
     """Vista detallada de un proyecto"""
     try:
-        proyecto = db.get_project(nombre)
+        proyecto = await run_blocking(db.get_project, nombre)
         if not proyecto:
             return HTMLResponse("Proyecto no encontrado", status_code=404)
 
         # Estado real
-        status = project_manager.get_project_status(nombre, proyecto.get('puerto'))
+        status = await run_blocking(project_manager.get_project_status, nombre, proyecto.get('puerto'))
         proyecto.update(status)
 
         # Logs recientes
-        logs = read_logs(nombre, limit=20)
+        logs = await run_blocking(read_logs, nombre, limit=20)
 
         # Git status
         git_manager = GitManager(proyecto['ruta'])
         git_status = None
-        if git_manager.is_git_repo():
-            git_status = git_manager.get_git_status()
+        if await run_blocking(git_manager.is_git_repo):
+            git_status = await run_blocking(git_manager.get_git_status)
 
         return templates.TemplateResponse("proyecto_detalle.html", {
             "request": request,
@@ -54,11 +62,11 @@ async def project_detail(request: Request, nombre: str):
 async def project_logs(request: Request, nombre: str):
     """Vista de logs de un proyecto"""
     try:
-        proyecto = db.get_project(nombre)
+        proyecto = await run_blocking(db.get_project, nombre)
         if not proyecto:
             return HTMLResponse("Proyecto no encontrado", status_code=404)
 
-        logs = read_logs(nombre, limit=200)
+        logs = await run_blocking(read_logs, nombre, limit=200)
 
         return templates.TemplateResponse("proyecto_logs.html", {
             "request": request,
@@ -71,40 +79,34 @@ async def project_logs(request: Request, nombre: str):
 
 
 @router.get("/logs/all", response_class=HTMLResponse)
-async def all_logs(request: Request):
-    """Vista de todos los logs del sistema"""
+async def all_logs(request: Request, limit: int = 500, since: Optional[str] = None,
+                   until: Optional[str] = None, level: Optional[str] = None,
+                   cursor: Optional[str] = None):
+    """
+    Vista de todos los logs del sistema
+
+    Args:
+        limit: Entradas por página
+        since: Desde este timestamp ISO
+        until: Hasta este timestamp ISO
+        level: Niveles separados por comas (p. ej. 'ERROR,WARNING')
+        cursor: next_cursor de la página anterior
+    """
     try:
-        from pathlib import Path
-        from config import LOGS_DIR
-        import json
-
-        all_logs = []
-
-        # Leer todos los archivos de log
-        logs_path = Path(LOGS_DIR)
-        if logs_path.exists():
-            for log_file in sorted(logs_path.glob("*.log"), reverse=True):
-                try:
-                    with open(log_file, 'r') as f:
-                        # Leer últimas 100 líneas de cada archivo
-                        lines = f.readlines()[-100:]
-                        for line in lines:
-                            try:
-                                log_entry = json.loads(line.strip())
-                                all_logs.append(log_entry)
-                            except:
-                                pass
-                except Exception as e:
-                    logger.error(f"Error leyendo {log_file}: {str(e)}")
-
-        # Ordenar por timestamp (más recientes primero)
-        all_logs.sort(key=lambda x: x.get('timestamp', ''), reverse=True)
-        all_logs = all_logs[:500]  # Limitar a 500 logs más recientes
+        levels = [item for item in level.split(',') if item] if level else None
+        files = await run_blocking(list_log_files)
+        page = await run_blocking(
+            merge_logs, files, max(1, min(limit, LOG_MERGE_MAX)), since, until, levels, cursor
+        )
 
         return templates.TemplateResponse("all_logs.html", {
             "request": request,
-            "logs": all_logs
+            "logs": page['items'],
+            "next_cursor": page['next_cursor'],
+            "filters": {"limit": limit, "since": since, "until": until, "level": level}
         })
+    except ValueError as e:
+        return HTMLResponse(f"Error: {str(e)}", status_code=400)
     except Exception as e:
         logger.error(f"Error en vista de todos los logs: {str(e)}")
         return HTMLResponse(f"Error: {str(e)}", status_code=500)
@@ -121,8 +123,8 @@ async def commits_view(request: Request):
         commits = []
         error = None
 
-        if git_manager.is_git_repo():
-            commits_data = git_manager.get_recent_commits(limit=50)
+        if await run_blocking(git_manager.is_git_repo):
+            commits_data = await run_blocking(git_manager.get_recent_commits, limit=50)
             if commits_data and not commits_data.get('error'):
                 commits = commits_data.get('commits', [])
         else:
@@ -148,12 +150,16 @@ async def commits_view(request: Request):
 async def start_project(nombre: str):
     """Iniciar un proyecto"""
     try:
-        result = project_manager.start_project(nombre)
+        result = await run_blocking(project_manager.start_project, nombre)
 
         if result['success']:
-            db.update_project(nombre, estado='activo', pid=result.get('pid'))
-            db.log_activity(nombre, 'inicio', f"Proyecto iniciado (PID: {result.get('pid')})")
+            await run_blocking(
+                write_queue.record, nombre,
+                event=('inicio', f"Proyecto iniciado (PID: {result.get('pid')})"),
+                estado='activo', pid=result.get('pid')
+            )
             logger.info(f"Proyecto {nombre} iniciado", pid=result.get('pid'))
+            status_registry.invalidate()
 
         return JSONResponse(result)
     except Exception as e:
@@ -165,12 +171,16 @@ async def start_project(nombre: str):
 async def stop_project(nombre: str):
     """Detener un proyecto"""
     try:
-        result = project_manager.stop_project(nombre)
+        result = await run_blocking(project_manager.stop_project, nombre)
 
         if result['success']:
-            db.update_project(nombre, estado='detenido', pid=None)
-            db.log_activity(nombre, 'detencion', "Proyecto detenido")
+            await run_blocking(
+                write_queue.record, nombre,
+                event=('detencion', "Proyecto detenido"),
+                estado='detenido', pid=None
+            )
             logger.info(f"Proyecto {nombre} detenido")
+            status_registry.invalidate()
 
         return JSONResponse(result)
     except Exception as e:
@@ -182,12 +192,16 @@ async def stop_project(nombre: str):
 async def restart_project(nombre: str):
     """Reiniciar un proyecto"""
     try:
-        result = project_manager.restart_project(nombre)
+        result = await run_blocking(project_manager.restart_project, nombre)
 
         if result['success']:
-            db.update_project(nombre, estado='activo', pid=result.get('pid'))
-            db.log_activity(nombre, 'reinicio', f"Proyecto reiniciado (PID: {result.get('pid')})")
+            await run_blocking(
+                write_queue.record, nombre,
+                event=('reinicio', f"Proyecto reiniciado (PID: {result.get('pid')})"),
+                estado='activo', pid=result.get('pid')
+            )
             logger.info(f"Proyecto {nombre} reiniciado")
+            status_registry.invalidate()
 
         return JSONResponse(result)
     except Exception as e:
@@ -199,9 +213,13 @@ async def restart_project(nombre: str):
 async def update_project_state(nombre: str, estado: str = Form(...)):
     """Actualizar estado manual de un proyecto"""
     try:
-        db.update_project(nombre, estado=estado)
-        db.log_activity(nombre, 'cambio_estado', f"Estado cambiado a: {estado}")
+        await run_blocking(
+            write_queue.record, nombre,
+            event=('cambio_estado', f"Estado cambiado a: {estado}"),
+            estado=estado
+        )
         logger.info(f"Estado de {nombre} actualizado a {estado}")
+        status_registry.invalidate()
 
         return JSONResponse({"success": True, "estado": estado})
     except Exception as e:
@@ -216,16 +234,19 @@ async def sync_projects():
     """Sincronizar proyectos del filesystem con la BD"""
     try:
         # Descubrir proyectos
-        discovered = project_manager.discover_projects()
+        discovered = await run_blocking(project_manager.discover_projects)
 
         # Sincronizar con BD
-        db.sync_projects(discovered)
+        counts = await run_blocking(db.sync_projects, discovered, True)
+        await run_blocking(dependency_index.sync, discovered, True)
 
-        logger.info(f"Sincronizados {len(discovered)} proyectos")
+        logger.info(f"Sincronizados {len(discovered)} proyectos", extra=counts)
+        status_registry.invalidate()
 
         return JSONResponse({
             "success": True,
             "projects_synced": len(discovered),
+            **counts,
             "projects": discovered
         })
     except Exception as e:
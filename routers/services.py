@@ -8,9 +8,9 @@ from fastapi.responses import HTMLResponse, JSONResponse
 
 from core.database import db
 from core.logger import logger
-from core.project_manager import project_manager
+from core.executor import run_blocking
+from services.status_registry import status_registry
 from services.system_monitor import (
-    SystemMonitor,
     PortMonitor,
     ProcessMonitor,
     get_system_summary
@@ -23,7 +23,7 @@ router = APIRouter()
 # ==================== VISTAS HTML ====================
 
 @router.get("/servicios", response_class=HTMLResponse)
-async def services_dashboard(request: Request):
+async def services_dashboard(request: Request, fresh: bool = False):
     """
     Dashboard de servicios activos y puertos
 
@@ -33,37 +33,34 @@ async def services_dashboard(request: Request):
     - Información de sistema en tiempo real
     """
     try:
-        # Obtener todos los proyectos
-        proyectos = db.list_projects()
+        # Estado publicado por el colector (?fresh=1 fuerza un refresco)
+        state = await status_registry.get_state(fresh)
+        proyectos = state['proyectos']
 
         # Enriquecer con estado real
         active_services = []
         inactive_services = []
 
         for proyecto in proyectos:
-            status = project_manager.get_project_status(
-                proyecto['nombre'],
-                proyecto.get('puerto')
-            )
-            proyecto.update(status)
+            proyecto.update(state['status'].get(proyecto['nombre'], {}))
 
             if proyecto.get('is_running'):
                 active_services.append(proyecto)
             else:
                 inactive_services.append(proyecto)
 
-        # Obtener puertos en escucha
-        listening_ports = PortMonitor.get_listening_ports()
+        # Puertos en escucha
+        listening_ports = state['ports']
 
         # Información del sistema
         system_info = {
-            'cpu': SystemMonitor.get_cpu_info(),
-            'memory': SystemMonitor.get_memory_info(),
-            'process_count': ProcessMonitor.get_process_count()
+            'cpu': state['system']['cpu'],
+            'memory': state['system']['memory'],
+            'process_count': state['system']['process_count']
         }
 
-        # Cruzar información de puertos con proyectos
-        project_ports = PortMonitor.get_project_ports(proyectos)
+        # Cruce de puertos con proyectos
+        project_ports = state['project_ports']
 
         return templates.TemplateResponse("servicios.html", {
             "request": request,
@@ -74,7 +71,8 @@ async def services_dashboard(request: Request):
             "system_info": system_info,
             "total_services": len(proyectos),
             "active_count": len(active_services),
-            "ports_count": len(listening_ports)
+            "ports_count": len(listening_ports),
+            "freshness": state['freshness']
         })
     except Exception as e:
         logger.error(f"Error en dashboard de servicios: {str(e)}")
@@ -84,27 +82,26 @@ async def services_dashboard(request: Request):
 # ==================== API ENDPOINTS ====================
 
 @router.get("/api/servicios")
-async def get_services_api():
+async def get_services_api(fresh: bool = False):
     """
     API endpoint para obtener información de servicios activos
 
+    Args:
+        fresh: Forzar un refresco síncrono del registro (?fresh=1)
+
     Returns:
         JSON con servicios activos, puertos y estado del sistema
     """
     try:
-        # Obtener todos los proyectos
-        proyectos = db.list_projects()
+        state = await status_registry.get_state(fresh)
+        proyectos = state['proyectos']
 
         # Enriquecer con estado real
         active_services = []
         inactive_services = []
 
         for proyecto in proyectos:
-            status = project_manager.get_project_status(
-                proyecto['nombre'],
-                proyecto.get('puerto')
-            )
-            proyecto.update(status)
+            proyecto.update(state['status'].get(proyecto['nombre'], {}))
 
             if proyecto.get('is_running'):
                 active_services.append(proyecto)
@@ -112,10 +109,10 @@ async def get_services_api():
                 inactive_services.append(proyecto)
 
         # Puertos en escucha
-        listening_ports = PortMonitor.get_listening_ports()
+        listening_ports = state['ports']
 
         # Información del sistema
-        system_summary = get_system_summary()
+        system_summary = state['system']
 
         return {
             "success": True,
@@ -128,9 +125,11 @@ async def get_services_api():
             },
             "ports": {
                 "total": len(listening_ports),
-                "listening": listening_ports
+                "listening": listening_ports,
+                "snapshot_age": PortMonitor.get_snapshot_age()
             },
-            "system": system_summary
+            "system": system_summary,
+            "freshness": state['freshness']
         }
     except Exception as e:
         logger.error(f"Error en API de servicios: {str(e)}")
@@ -146,16 +145,17 @@ async def get_ports_api():
         JSON con todos los puertos en escucha y sus procesos
     """
     try:
-        listening_ports = PortMonitor.get_listening_ports()
-        proyectos = db.list_projects()
-        project_ports = PortMonitor.get_project_ports(proyectos)
+        listening_ports = await run_blocking(PortMonitor.get_listening_ports)
+        proyectos = await run_blocking(db.list_projects)
+        project_ports = await run_blocking(PortMonitor.get_project_ports, proyectos)
 
         return {
             "success": True,
             "ports": {
                 "total": len(listening_ports),
                 "listening": listening_ports,
-                "projects": project_ports
+                "projects": project_ports,
+                "snapshot_age": PortMonitor.get_snapshot_age()
             }
         }
     except Exception as e:
@@ -172,8 +172,8 @@ async def get_system_api():
         JSON con CPU, memoria, disco, red y procesos
     """
     try:
-        system_summary = get_system_summary()
-        top_processes = ProcessMonitor.get_top_processes(limit=10)
+        system_summary = await run_blocking(get_system_summary)
+        top_processes = await run_blocking(ProcessMonitor.get_top_processes, limit=10)
 
         return {
             "success": True,
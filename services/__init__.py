@@ -8,6 +8,7 @@ from .system_monitor import (
     get_system_summary
 )
 from .git_service import GitManager, scan_portfolio_git_repos
+from .status_registry import StatusRegistry, status_registry
 
 __all__ = [
     'SystemMonitor',
@@ -15,5 +16,7 @@ __all__ = [
     'ProcessMonitor',
     'get_system_summary',
     'GitManager',
-    'scan_portfolio_git_repos'
+    'scan_portfolio_git_repos',
+    'StatusRegistry',
+    'status_registry'
 ]
@@ -0,0 +1,252 @@
+"""
+ORION Status Registry
+Registro en memoria del estado de proyectos, puertos y sistema,
+refrescado por un colector en segundo plano
+"""
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import COLLECTOR_INTERVAL, STREAM_QUEUE_SIZE
+from core.database import db
+from core.executor import run_blocking
+from core.logger import logger
+from core.project_manager import project_manager
+from services.system_monitor import PortMonitor, get_system_summary
+
+
+class StatusRegistry:
+    """
+    Estado publicado por el colector
+
+    Los handlers leen la última publicación (copias superficiales) en
+    lugar de recalcular el estado de cada proyecto en cada petición.
+    """
+
+    def __init__(self, interval: float = COLLECTOR_INTERVAL):
+        self.interval = interval
+        self._state: Optional[Dict] = None
+        self._stale = False
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._published: Optional[Dict] = None
+
+    # ==================== RECOLECCIÓN ====================
+
+    def refresh(self) -> Dict:
+        """
+        Recalcular y publicar el estado completo (bloqueante)
+
+        Returns:
+            El estado recién publicado
+        """
+        with self._refresh_lock:
+            self._stale = False
+            proyectos = db.list_projects()
+            status = {
+                proyecto['nombre']: project_manager.get_project_status(
+                    proyecto['nombre'],
+                    proyecto.get('puerto')
+                )
+                for proyecto in proyectos
+            }
+
+            state = {
+                'proyectos': proyectos,
+                'status': status,
+                'ports': PortMonitor.get_listening_ports(),
+                'project_ports': PortMonitor.get_project_ports(proyectos),
+                'system': get_system_summary(cpu_interval=None),
+                'updated_at': datetime.now().isoformat(),
+                'updated_monotonic': time.monotonic()
+            }
+
+            with self._lock:
+                self._state = state
+
+            return state
+
+    async def _run(self):
+        """Bucle del colector"""
+        while True:
+            try:
+                state = await run_blocking(self.refresh)
+                self._publish(state)
+            except Exception as e:
+                logger.error(f"Error en colector de estado: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Arrancar el colector en el event loop actual"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Detener el colector"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def invalidate(self):
+        """Marcar el estado como obsoleto (tras iniciar/detener/sincronizar)"""
+        self._stale = True
+
+    # ==================== CONSULTAS ====================
+
+    async def get_state(self, fresh: bool = False) -> Dict:
+        """
+        Obtener el estado publicado
+
+        Args:
+            fresh: Forzar un refresco síncrono antes de responder
+
+        Returns:
+            Copia del estado: proyectos de la BD, estado real por nombre,
+            puertos, sistema y frescura de la publicación
+        """
+        with self._lock:
+            state = self._state
+
+        if fresh or state is None or self._stale:
+            state = await run_blocking(self.refresh)
+            self._publish(state)
+
+        return {
+            'proyectos': [dict(proyecto) for proyecto in state['proyectos']],
+            'status': {nombre: dict(s) for nombre, s in state['status'].items()},
+            'ports': state['ports'],
+            'project_ports': state['project_ports'],
+            'system': state['system'],
+            'freshness': self._freshness(state)
+        }
+
+    def _freshness(self, state: Dict) -> Dict:
+        """Marca de tiempo y antigüedad de una publicación"""
+        return {
+            'updated_at': state['updated_at'],
+            'age_seconds': round(time.monotonic() - state['updated_monotonic'], 3),
+            'interval': self.interval
+        }
+
+    # ==================== STREAMING ====================
+
+    def subscribe(self) -> asyncio.Queue:
+        """Registrar un cliente de streaming; recibe tuplas (evento, json)"""
+        queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """Dar de baja un cliente de streaming"""
+        self._subscribers.discard(queue)
+
+    async def get_snapshot_event(self) -> Tuple[str, str]:
+        """Evento inicial con el estado compacto completo"""
+        if self._published is None:
+            self._publish(await run_blocking(self.refresh))
+        return 'snapshot', json.dumps(self._published)
+
+    def _publish(self, state: Dict):
+        """
+        Calcular el delta respecto a la última publicación y enviarlo
+
+        El delta se serializa una sola vez por ciclo, sin importar cuántos
+        clientes estén conectados. Un cliente que no consume a tiempo
+        recibe un snapshot completo en lugar de los deltas perdidos.
+        """
+        compact = self._compact(state)
+        previous, self._published = self._published, compact
+
+        if previous is None or not self._subscribers:
+            return
+
+        delta = self._diff(previous, compact)
+        if not delta:
+            return
+
+        payload = ('delta', json.dumps(delta))
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(('snapshot', json.dumps(compact)))
+
+    def _compact(self, state: Dict) -> Dict:
+        """Subconjunto del estado que se envía al navegador"""
+        system = state['system']
+        return {
+            'updated_at': state['updated_at'],
+            'projects': {
+                nombre: {
+                    'is_running': s.get('is_running', False),
+                    'pid': s.get('pid'),
+                    'port_active': s.get('port_active', False),
+                    'cpu_percent': s.get('cpu_percent'),
+                    'memory_mb': s.get('memory_mb')
+                }
+                for nombre, s in state['status'].items()
+            },
+            'ports': [
+                {
+                    'port': p['port'],
+                    'address': p['address'],
+                    'pid': p['pid'],
+                    'process': p['process']
+                }
+                for p in state['ports']
+            ],
+            'system': {
+                'cpu_percent': system['cpu']['percent'],
+                'memory_percent': system['memory']['percent'],
+                'memory_used_gb': system['memory']['used_gb'],
+                'ports_count': len(state['ports'])
+            }
+        }
+
+    def _diff(self, old: Dict, new: Dict) -> Optional[Dict]:
+        """Cambios entre dos estados compactos (None si no hay ninguno)"""
+        delta: Dict = {}
+
+        projects = {}
+        for nombre, fields in new['projects'].items():
+            before = old['projects'].get(nombre, {})
+            changed = {k: v for k, v in fields.items() if before.get(k) != v}
+            if changed:
+                projects[nombre] = changed
+        if projects:
+            delta['projects'] = projects
+
+        removed = [nombre for nombre in old['projects'] if nombre not in new['projects']]
+        if removed:
+            delta['removed_projects'] = removed
+
+        port_key = lambda p: (p['port'], p['address'], p['pid'])
+        old_ports = {port_key(p): p for p in old['ports']}
+        new_ports = {port_key(p): p for p in new['ports']}
+        added_ports: List[Dict] = [p for k, p in new_ports.items() if k not in old_ports]
+        removed_ports: List[Dict] = [p for k, p in old_ports.items() if k not in new_ports]
+        if added_ports or removed_ports:
+            delta['ports'] = {'added': added_ports, 'removed': removed_ports}
+
+        system = {k: v for k, v in new['system'].items() if old['system'].get(k) != v}
+        if system:
+            delta['system'] = system
+
+        if delta:
+            delta['updated_at'] = new['updated_at']
+        return delta or None
+
+
+# Instancia global
+status_registry = StatusRegistry()
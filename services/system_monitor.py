@@ -9,15 +9,17 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import os
 
+from core.snapshots import get_process_snapshot, get_port_snapshot, port_snapshots
+
 
 class SystemMonitor:
     """Monitor de recursos y estado del sistema"""
 
     @staticmethod
-    def get_cpu_info() -> Dict:
-        """Información de CPU"""
+    def get_cpu_info(interval: Optional[float] = 1) -> Dict:
+        """Información de CPU (interval=None no bloquea: usa la última medición)"""
         return {
-            "percent": psutil.cpu_percent(interval=1),
+            "percent": psutil.cpu_percent(interval=interval),
             "count": psutil.cpu_count(),
             "count_physical": psutil.cpu_count(logical=False),
             "freq": psutil.cpu_freq()._asdict() if psutil.cpu_freq() else None,
@@ -96,48 +98,48 @@ class PortMonitor:
     @staticmethod
     def get_listening_ports() -> List[Dict]:
         """Obtener todos los puertos en escucha"""
+        port_snapshot = get_port_snapshot()
+        process_snapshot = get_process_snapshot()
+
         ports = []
-        for conn in psutil.net_connections(kind='inet'):
-            if conn.status == 'LISTEN':
-                try:
-                    process = psutil.Process(conn.pid) if conn.pid else None
-                    ports.append({
-                        "port": conn.laddr.port,
-                        "address": conn.laddr.ip,
-                        "pid": conn.pid,
-                        "process": process.name() if process else "unknown",
-                        "cmdline": " ".join(process.cmdline()) if process else "",
-                    })
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    ports.append({
-                        "port": conn.laddr.port,
-                        "address": conn.laddr.ip,
-                        "pid": conn.pid,
-                        "process": "unknown",
-                        "cmdline": "",
-                    })
+        for listener in port_snapshot.listeners:
+            process = process_snapshot.get_process(listener['pid'])
+            ports.append({
+                "port": listener['port'],
+                "address": listener['address'],
+                "pid": listener['pid'],
+                "process": process['name'] if process else "unknown",
+                "cmdline": " ".join(process['cmdline']) if process else "",
+            })
 
         # Ordenar por puerto
         return sorted(ports, key=lambda x: x['port'])
 
+    @staticmethod
+    def get_snapshot_age() -> Optional[float]:
+        """Antigüedad en segundos de la tabla de puertos compartida"""
+        snapshot = port_snapshots.peek()
+        return round(snapshot.age(), 3) if snapshot else None
+
     @staticmethod
     def get_project_ports(projects_info: List[Dict]) -> List[Dict]:
         """Cruzar puertos de proyectos con puertos en uso"""
-        listening_ports = {p['port']: p for p in PortMonitor.get_listening_ports()}
+        port_snapshot = get_port_snapshot()
+        process_snapshot = get_process_snapshot()
 
         project_ports = []
         for project in projects_info:
             port = project.get('puerto')
             if port:
-                is_active = port in listening_ports
-                port_info = listening_ports.get(port, {})
+                port_info = port_snapshot.get(port)
+                process = process_snapshot.get_process(port_info['pid']) if port_info else None
 
                 project_ports.append({
                     "project": project.get('nombre'),
                     "port": port,
-                    "is_active": is_active,
-                    "process": port_info.get('process'),
-                    "pid": port_info.get('pid'),
+                    "is_active": port_info is not None,
+                    "process": process['name'] if process else None,
+                    "pid": port_info['pid'] if port_info else None,
                 })
 
         return sorted(project_ports, key=lambda x: x['port'])
@@ -145,8 +147,7 @@ class PortMonitor:
     @staticmethod
     def check_port_available(port: int) -> bool:
         """Verificar si un puerto está disponible"""
-        listening_ports = {p['port'] for p in PortMonitor.get_listening_ports()}
-        return port not in listening_ports
+        return not get_port_snapshot().is_listening(port)
 
 
 class ProcessMonitor:
@@ -184,17 +185,18 @@ class ProcessMonitor:
         return len(psutil.pids())
 
 
-def get_system_summary() -> Dict:
+def get_system_summary(cpu_interval: Optional[float] = 1) -> Dict:
     """Obtener resumen completo del sistema"""
     monitor = SystemMonitor()
 
     return {
         "timestamp": datetime.now().isoformat(),
-        "cpu": monitor.get_cpu_info(),
+        "cpu": monitor.get_cpu_info(interval=cpu_interval),
         "memory": monitor.get_memory_info(),
         "disk": monitor.get_disk_info(),
         "network": monitor.get_network_info(),
         "uptime": monitor.get_system_uptime(),
         "process_count": ProcessMonitor.get_process_count(),
-        "listening_ports_count": len(PortMonitor.get_listening_ports()),
+        "listening_ports_count": len(get_port_snapshot().listeners),
+        "ports_snapshot_age": PortMonitor.get_snapshot_age(),
     }
@@ -1,13 +1,208 @@
 // ORION - Sistema de Gestión de Proyectos
 
-// Verificar estado del sistema al cargar
-async function checkSystemStatus() {
-    try {
-        const response = await fetch('/api/status');
-        const status = await response.json();
-        console.log('Sistema ORION:', status);
-    } catch (error) {
-        console.error('Error de conexión:', error);
+// Estado recibido por el stream (snapshot + deltas)
+const liveState = {
+    projects: {},
+    ports: [],
+    system: {}
+};
+
+// Conectar al stream SSE de cambios de estado
+function connectStatusStream() {
+    // Solo las vistas con elementos en vivo abren el stream
+    if (!window.EventSource || !document.querySelector('[data-project], [data-system]')) {
+        return;
+    }
+
+    const source = new EventSource('/api/stream');
+
+    source.addEventListener('snapshot', (event) => {
+        const snapshot = JSON.parse(event.data);
+        liveState.projects = snapshot.projects || {};
+        liveState.ports = snapshot.ports || [];
+        liveState.system = snapshot.system || {};
+
+        Object.entries(liveState.projects).forEach(([nombre, fields]) => {
+            patchProject(nombre, fields);
+        });
+        patchSystem(liveState.system);
+        renderPorts();
+        updateStats();
+    });
+
+    source.addEventListener('delta', (event) => {
+        applyDelta(JSON.parse(event.data));
+    });
+
+    // EventSource reconecta solo; al reconectar llega un snapshot nuevo
+    source.onerror = () => {
+        console.warn('Stream ORION desconectado, reintentando...');
+    };
+}
+
+// Aplicar un delta al estado local y al DOM
+function applyDelta(delta) {
+    Object.entries(delta.projects || {}).forEach(([nombre, fields]) => {
+        const previous = liveState.projects[nombre] || {};
+        liveState.projects[nombre] = Object.assign({}, previous, fields);
+        patchProject(nombre, fields);
+    });
+
+    (delta.removed_projects || []).forEach((nombre) => {
+        delete liveState.projects[nombre];
+    });
+
+    if (delta.ports) {
+        const key = (p) => `${p.port}|${p.address}|${p.pid}`;
+        const removed = new Set(delta.ports.removed.map(key));
+        liveState.ports = liveState.ports
+            .filter((p) => !removed.has(key(p)))
+            .concat(delta.ports.added)
+            .sort((a, b) => a.port - b.port);
+        renderPorts();
+    }
+
+    if (delta.system) {
+        Object.assign(liveState.system, delta.system);
+        patchSystem(delta.system);
+    }
+
+    updateStats();
+}
+
+// Formatear un valor según data-decimals
+function formatValue(element, value) {
+    const decimals = element.dataset.decimals;
+    if (decimals !== undefined && typeof value === 'number') {
+        return value.toFixed(parseInt(decimals, 10));
+    }
+    return value === null || value === undefined ? '' : String(value);
+}
+
+// Actualizar la tarjeta de un proyecto
+function patchProject(nombre, fields) {
+    document.querySelectorAll('[data-project]').forEach((card) => {
+        if (card.dataset.project !== nombre) {
+            return;
+        }
+
+        // En vistas agrupadas por estado (servicios) un cambio de estado reordena la página
+        if ('is_running' in fields && card.dataset.running !== undefined) {
+            if ((card.dataset.running === '1') !== fields.is_running) {
+                location.reload();
+                return;
+            }
+        }
+
+        Object.entries(fields).forEach(([field, value]) => {
+            if (field === 'is_running') {
+                patchRunningState(card, value);
+                return;
+            }
+
+            const target = card.querySelector(`[data-field="${field}"]`);
+            if (target) {
+                target.textContent = formatValue(target, value);
+            }
+
+            const badge = card.querySelector(`[data-badge="${field}"]`);
+            if (badge) {
+                badge.hidden = value === null || value === undefined;
+            }
+        });
+    });
+}
+
+// Cambiar indicador y controles de inicio/parada
+function patchRunningState(card, isRunning) {
+    const status = card.querySelector('[data-field="is_running"]');
+    if (status) {
+        status.textContent = isRunning ? 'Activo' : 'Detenido';
+        status.classList.toggle('status-active', isRunning);
+        status.classList.toggle('status-inactive', !isRunning);
+    }
+
+    card.querySelectorAll('[data-controls]').forEach((controls) => {
+        const visible = (controls.dataset.controls === 'running') === isRunning;
+        controls.style.display = visible ? 'contents' : 'none';
+    });
+}
+
+// Actualizar métricas del sistema
+function patchSystem(system) {
+    Object.entries(system).forEach(([field, value]) => {
+        document.querySelectorAll(`[data-system="${field}"]`).forEach((element) => {
+            element.textContent = formatValue(element, value);
+        });
+    });
+}
+
+// Recalcular contadores de proyectos
+function updateStats() {
+    const states = Object.values(liveState.projects);
+    if (!states.length) {
+        return;
+    }
+
+    const activos = states.filter((p) => p.is_running).length;
+    const counts = { activos: activos, detenidos: states.length - activos };
+
+    Object.entries(counts).forEach(([stat, value]) => {
+        document.querySelectorAll(`[data-stat="${stat}"]`).forEach((element) => {
+            element.textContent = value;
+        });
+    });
+}
+
+// Redibujar la lista de puertos (vista de servicios)
+function renderPorts() {
+    const container = document.querySelector('[data-live-ports]');
+    if (!container) {
+        return;
+    }
+
+    container.replaceChildren();
+    liveState.ports.slice(0, 20).forEach((port) => {
+        const card = document.createElement('div');
+        card.className = 'port-card';
+
+        const header = document.createElement('div');
+        header.className = 'port-header';
+        const number = document.createElement('div');
+        number.className = 'port-number';
+        number.textContent = `:${port.port}`;
+        const address = document.createElement('div');
+        address.className = 'port-address';
+        address.textContent = port.address;
+        header.append(number, address);
+
+        const details = document.createElement('div');
+        details.className = 'port-details';
+        const process = document.createElement('div');
+        process.className = 'port-process';
+        const name = document.createElement('span');
+        name.className = 'process-name';
+        name.textContent = port.process;
+        process.append(name);
+        details.append(process);
+        if (port.pid) {
+            const pid = document.createElement('div');
+            pid.className = 'port-pid';
+            pid.textContent = `PID: ${port.pid}`;
+            details.append(pid);
+        }
+
+        card.append(header, details);
+        container.append(card);
+    });
+
+    if (liveState.ports.length > 20) {
+        const more = document.createElement('div');
+        more.className = 'port-card port-more';
+        const text = document.createElement('p');
+        text.textContent = `Y ${liveState.ports.length - 20} puertos más...`;
+        more.append(text);
+        container.append(more);
     }
 }
 
@@ -47,17 +242,9 @@ function initializeAnimations() {
     });
 }
 
-// Auto-refresh de estadísticas cada 30 segundos
-function startAutoRefresh() {
-    setInterval(() => {
-        checkSystemStatus();
-    }, 30000);
-}
-
 // Inicializar cuando el DOM esté listo
 document.addEventListener('DOMContentLoaded', () => {
     initializeAnimations();
-    checkSystemStatus();
-    startAutoRefresh();
+    connectStatusStream();
     console.log('ORION - Sistema de Gestión de Proyectos iniciado');
 });
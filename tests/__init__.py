@@ -0,0 +1,4 @@
+"""
+ORION Tests
+Pruebas con pytest (ejecutar desde la raíz: python -m pytest)
+"""
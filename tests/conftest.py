@@ -0,0 +1,38 @@
+"""
+Fixtures comunes: base de datos y directorio de logs temporales
+"""
+import json
+from pathlib import Path
+from typing import Iterable
+
+import pytest
+
+from core.database import Database
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Database aislada en un archivo temporal"""
+    database = Database(tmp_path / "orion.db")
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def logs_dir(tmp_path):
+    """Directorio de logs vacío"""
+    path = tmp_path / "logs"
+    path.mkdir()
+    return path
+
+
+def timestamp(second: int) -> str:
+    """Timestamp ISO del formato de los logs de ORION"""
+    return f"2026-01-01T00:{second // 60:02d}:{second % 60:02d}.000000Z"
+
+
+def write_entries(path: Path, entries: Iterable[tuple]):
+    """Escribir entradas JSON (segundo, nivel, mensaje) en un log"""
+    with open(path, 'a', encoding='utf-8') as f:
+        for second, level, message in entries:
+            f.write(json.dumps({"timestamp": timestamp(second), "level": level, "message": message}) + "\n")
@@ -0,0 +1,55 @@
+"""
+Pruebas de Database.get_activity_page: paginación por clave (timestamp, id)
+"""
+import pytest
+
+
+@pytest.fixture
+def activity(database):
+    """Proyecto con 7 eventos: 4 en el mismo segundo y 3 más antiguos"""
+    database.sync_projects([{'nombre': 'a', 'ruta': '/portfolio/a'}, {'nombre': 'b', 'ruta': '/portfolio/b'}])
+    with database.get_connection() as conn:
+        rows = [('2026-01-01 10:00:00', f'viejo {i}') for i in range(3)]
+        rows += [('2026-01-02 10:00:00', f'nuevo {i}') for i in range(4)]
+        conn.executemany("""
+            INSERT INTO actividad (proyecto_id, tipo_evento, descripcion, timestamp)
+            SELECT id, 'evento', ?, ? FROM proyectos WHERE nombre = 'a'
+        """, [(descripcion, ts) for ts, descripcion in rows])
+    database.log_activity('b', 'evento', 'de otro proyecto')
+    return database
+
+
+def all_pages(database, limit):
+    pages, cursor = [], None
+    while True:
+        page = database.get_activity_page('a', limit, cursor)
+        pages.append([item['descripcion'] for item in page['items']])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7, 50])
+def test_pages_cover_every_event_once_newest_first(activity, limit):
+    pages = all_pages(activity, limit)
+    events = [event for page in pages for event in page]
+
+    assert events == ['nuevo 3', 'nuevo 2', 'nuevo 1', 'nuevo 0', 'viejo 2', 'viejo 1', 'viejo 0']
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_last_page_has_no_cursor(activity):
+    page = activity.get_activity_page('a', 7)
+
+    assert len(page['items']) == 7
+    assert page['next_cursor'] is None
+
+
+def test_unknown_project_is_empty(activity):
+    assert activity.get_activity_page('nadie') == {'items': [], 'next_cursor': None}
+
+
+@pytest.mark.parametrize("cursor", ["zzz", "2026-01-01|x", "|3", "2026-01-01|", "2026-01-01|-1"])
+def test_malformed_cursor_is_rejected(activity, cursor):
+    with pytest.raises(ValueError, match="Cursor no válido"):
+        activity.get_activity_page('a', 2, cursor)
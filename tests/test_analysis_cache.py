@@ -0,0 +1,64 @@
+"""
+Pruebas de la caché de análisis de ProjectManager: huellas de los archivos leídos y de los que faltan
+"""
+import pytest
+
+from core.project_manager import ProjectManager
+
+MAIN = """
+from fastapi import FastAPI
+from routers import items
+
+app = FastAPI()
+app.include_router(items.router, prefix="/items")
+"""
+
+ITEMS = """
+from fastapi import APIRouter
+
+router = APIRouter()
+
+@router.get("/")
+def list_items():
+    return []
+"""
+
+
+@pytest.fixture
+def manager(database, tmp_path):
+    manager = ProjectManager(database)
+    manager.portfolio_dir = tmp_path / 'portfolio'
+    project = manager.portfolio_dir / 'shop'
+    (project / 'routers').mkdir(parents=True)
+    (project / 'requirements.txt').write_text('fastapi\n')
+    (project / 'main.py').write_text(MAIN)
+    return manager
+
+
+def paths(analysis):
+    return [endpoint['path'] for endpoint in analysis['endpoints']]
+
+
+def test_missing_router_is_tracked_until_it_appears(manager):
+    project = manager.portfolio_dir / 'shop'
+
+    assert paths(manager.analyze_project('shop')) == []
+    assert str(project / 'routers' / 'items.py') in manager.analysis_sources('shop')
+
+    (project / 'routers' / 'items.py').write_text(ITEMS)
+
+    assert paths(manager.analyze_project('shop')) == ['/items/']
+    assert str(project / 'routers' / 'items.py') in manager.analysis_sources('shop')
+
+
+def test_stored_analysis_is_invalidated_when_missing_router_appears(manager, database):
+    project = manager.portfolio_dir / 'shop'
+    assert paths(manager.analyze_project('shop')) == []
+
+    (project / 'routers' / 'items.py').write_text(ITEMS)
+    # Un proceso nuevo no tiene caché en memoria: solo el hash guardado en orion.db
+    fresh = ProjectManager(database)
+    fresh.portfolio_dir = manager.portfolio_dir
+
+    assert paths(fresh.analyze_project('shop')) == ['/items/']
+
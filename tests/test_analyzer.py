@@ -0,0 +1,147 @@
+"""
+Pruebas de core.analyzer: rutas con prefijos a través de routers importados, puerto y fuentes
+"""
+from pathlib import Path
+
+import pytest
+
+from core.analyzer import SourceAnalyzer
+
+
+def read_file(path: Path):
+    try:
+        return path.read_text()
+    except OSError:
+        return None
+
+
+def write(root: Path, files):
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def endpoints(analysis):
+    return sorted((e['method'], e['path']) for e in analysis['endpoints'])
+
+
+def test_fastapi_follows_included_routers(tmp_path):
+    write(tmp_path, {
+        'main.py': '''"""Tienda de ejemplo"""
+import os
+from fastapi import FastAPI
+from routers import items
+from .routers.users import router as users_router
+
+PORT = int(os.getenv("PORT", 8042))
+
+app = FastAPI()
+app.include_router(items.router, prefix="/api")
+app.include_router(users_router)
+
+@app.get("/")
+def home():
+    return {}
+''',
+        'routers/__init__.py': '',
+        'routers/items.py': '''
+from fastapi import APIRouter
+
+router = APIRouter(prefix="/items")
+
+@router.get("/{item_id}")
+def get_item(item_id: int):
+    return {}
+
+@router.api_route("/", methods=["GET", "POST"])
+def items():
+    return []
+''',
+        'routers/users.py': '''
+from fastapi import APIRouter
+import sqlite3
+
+router = APIRouter(prefix="/users")
+
+if True:
+    @router.delete("/{user_id}")
+    def delete_user(user_id: int):
+        return {}
+''',
+    })
+
+    analysis = SourceAnalyzer(read_file).analyze(tmp_path, 'main.py', 'FastAPI')
+
+    assert endpoints(analysis) == [
+        ('DELETE', '/users/{user_id}'),
+        ('GET', '/'),
+        ('GET', '/api/items/'),
+        ('GET', '/api/items/{item_id}'),
+        ('POST', '/api/items/'),
+    ]
+    assert analysis['port'] == 8042
+    assert analysis['description'] == 'Tienda de ejemplo'
+    assert analysis['has_database'] is True
+    assert analysis['sources'] == sorted(str(tmp_path / name) for name in ('main.py', 'routers/items.py', 'routers/users.py'))
+    assert analysis['missing'] == []
+
+
+def test_flask_blueprint_prefix_is_replaced_on_register(tmp_path):
+    write(tmp_path, {
+        'app.py': '''
+from flask import Flask
+from views import bp
+
+app = Flask(__name__)
+app.register_blueprint(bp, url_prefix="/v2")
+
+if __name__ == "__main__":
+    app.run(port=5050)
+''',
+        'views.py': '''
+from flask import Blueprint
+
+bp = Blueprint("views", __name__, url_prefix="/v1")
+
+@bp.route("/login", methods=["POST"])
+def login():
+    return ""
+''',
+    })
+
+    analysis = SourceAnalyzer(read_file).analyze(tmp_path, 'app.py', 'Flask')
+
+    assert endpoints(analysis) == [('POST', '/v2/login')]
+    assert analysis['endpoints'][0]['type'] == 'Flask Route'
+    assert analysis['port'] == 5050
+    assert analysis['has_auth'] is True
+
+
+def test_unresolved_and_broken_modules_are_reported_as_missing(tmp_path):
+    write(tmp_path, {
+        'main.py': '''
+from fastapi import FastAPI
+from routers import items, broken
+
+app = FastAPI()
+app.include_router(items.router)
+app.include_router(broken.router)
+''',
+        'routers/broken.py': 'router = (\n',
+    })
+
+    analysis = SourceAnalyzer(read_file).analyze(tmp_path, 'main.py', 'FastAPI')
+
+    assert analysis['endpoints'] == []
+    assert analysis['sources'] == [str(tmp_path / 'main.py')]
+    assert analysis['missing'] == sorted(str(tmp_path / name) for name in (
+        'routers/broken.py', 'routers/items.py', 'routers/items/__init__.py'
+    ))
+
+
+def test_main_file_syntax_error_propagates(tmp_path):
+    write(tmp_path, {'main.py': 'def broken(:\n'})
+
+    with pytest.raises(SyntaxError):
+        SourceAnalyzer(read_file).analyze(tmp_path, 'main.py', 'FastAPI')
@@ -0,0 +1,100 @@
+"""
+Pruebas de core.dependencies: parseo PEP 508, solapamiento de rangos e índice inverso
+"""
+import pytest
+from packaging.specifiers import InvalidSpecifier
+from packaging.version import InvalidVersion
+
+from core.dependencies import DependencyIndex, parse_requirements, specifiers_overlap
+
+REQUIREMENTS = """\
+# Web
+FastAPI[all]>=0.100,<1.0  # servidor
+-r base.txt
+--index-url https://pypi.org/simple
+PyYAML==6.0 \\
+    --hash=sha256:abc
+numpy<2; python_version < "3.9"
+numpy>=2; python_version >= "3.9"
+numpy<2; python_version < "3.9"
+git+https://example.com/repo.git
+"""
+
+
+def project(nombre, content):
+    return {'nombre': nombre, 'requirements': parse_requirements(content)}
+
+
+def test_parse_requirements():
+    entries = parse_requirements(REQUIREMENTS)
+
+    assert [(e['paquete'], e['especificador'], e['marcador']) for e in entries] == [
+        ('fastapi', '<1.0,>=0.100', ''),
+        ('pyyaml', '==6.0', ''),
+        ('numpy', '<2', 'python_version < "3.9"'),
+        ('numpy', '>=2', 'python_version >= "3.9"'),
+        ('git', '', ''),
+    ]
+    assert entries[0]['nombre'] == 'FastAPI'
+    assert entries[0]['extras'] == 'all'
+    assert entries[1]['linea'] == 'PyYAML==6.0'
+
+
+@pytest.mark.parametrize('left, right, expected', [
+    ('>=1,<2', '<1.5', True),
+    ('>=2', '<2', False),
+    ('==1.4.*', '>=1.4.2', True),
+    ('==1.4', '!=1.4', False),
+    ('', '<1', True),
+    ('>=1', 'nope', False),
+])
+def test_specifiers_overlap(left, right, expected):
+    assert specifiers_overlap(left, right) is expected
+
+
+def test_find_by_package_specifier_and_version(database):
+    index = DependencyIndex(database)
+    index.sync([
+        project('a', 'psutil>=5,<6\nzope.interface\n'),
+        project('b', 'psutil>=6\n'),
+        project('c', 'psutil==5.9.8\n'),
+    ])
+
+    assert [row['proyecto'] for row in index.find('PSUTIL')] == ['a', 'b', 'c']
+    assert [row['proyecto'] for row in index.find('psutil', specifier='<6')] == ['a', 'c']
+    assert [row['proyecto'] for row in index.find('psutil', version='6.1')] == ['b']
+    assert [row['proyecto'] for row in index.find('Zope_Interface')] == ['a']
+
+    with pytest.raises(InvalidSpecifier):
+        index.find('psutil', specifier='<<6')
+    with pytest.raises(InvalidVersion):
+        index.find('psutil', version='not-a-version')
+
+
+def test_sync_reindexes_only_changed_projects_and_prunes(database):
+    index = DependencyIndex(database)
+    assert index.sync([project('a', 'requests\n'), project('b', 'flask\n')]) == {'reindexed': 2, 'removed': 0}
+
+    counts = index.sync([project('a', 'requests\n'), project('b', 'flask>=3\n')])
+    assert counts == {'reindexed': 1, 'removed': 0}
+    assert index.find('flask')[0]['especificador'] == '>=3'
+
+    assert index.sync([project('a', 'requests\n')], prune=True) == {'reindexed': 0, 'removed': 1}
+    assert index.find('flask') == []
+
+
+def test_skew_reports_packages_with_several_specifiers(database):
+    index = DependencyIndex(database)
+    index.sync([
+        project('a', 'fastapi==0.104.1\nrequests\n'),
+        project('b', 'fastapi>=0.110\nrequests\n'),
+        project('c', 'fastapi==0.104.1\n'),
+    ])
+
+    assert index.skew() == [{
+        'paquete': 'fastapi',
+        'proyectos': 3,
+        'especificadores': {'==0.104.1': ['a', 'c'], '>=0.110': ['b']},
+        'versiones_fijadas': ['0.104.1'],
+        'variantes': 2,
+    }]
@@ -0,0 +1,108 @@
+"""
+Pruebas de core.log_index: indexación incremental, offsets por stride e índice lateral
+"""
+import pytest
+
+from core.log_index import INDEX_SUFFIX, LogIndex
+from tests.conftest import write_entries
+
+
+@pytest.fixture
+def log_file(logs_dir):
+    path = logs_dir / "app.log"
+    write_entries(path, [(second, 'INFO' if second % 3 else 'ERROR', f"m{second}") for second in range(10)])
+    return path
+
+
+def indexed_from(index, monkeypatch):
+    """Registrar el offset desde el que se indexa cada bloque"""
+    bases = []
+    original = index._index_lines
+
+    def spy(data, state):
+        bases.append(state['offset'])
+        return original(data, state)
+
+    monkeypatch.setattr(index, '_index_lines', spy)
+    return bases
+
+
+def test_appended_lines_are_indexed_from_last_offset(log_file, monkeypatch):
+    index = LogIndex(log_file.parent, stride=4)
+    first = index.get(log_file)
+    assert (first['lines'], first['levels']) == (10, {'ERROR': 4, 'INFO': 6})
+    assert first['offset'] == log_file.stat().st_size
+
+    bases = indexed_from(index, monkeypatch)
+    write_entries(log_file, [(10, 'WARNING', 'm10'), (11, 'INFO', 'm11')])
+    second = index.get(log_file)
+
+    assert bases == [first['offset']]
+    assert (second['lines'], second['levels']['WARNING']) == (12, 1)
+
+    # Sin bytes nuevos no se vuelve a leer nada
+    assert index.get(log_file)['offset'] == second['offset']
+    assert bases == [first['offset']]
+
+
+def test_offsets_every_stride_lines(log_file):
+    index = LogIndex(log_file.parent, stride=4)
+    lines = log_file.read_bytes().splitlines(keepends=True)
+
+    offsets = index.get(log_file)['offsets']
+
+    assert offsets == [sum(len(line) for line in lines[:n]) for n in (0, 4, 8)]
+    with open(log_file, 'rb') as f:
+        f.seek(index.line_offset(log_file, 9))
+        assert b'"m8"' in f.readline()
+
+
+def test_partial_line_waits_until_complete(log_file):
+    index = LogIndex(log_file.parent, stride=4)
+    size = log_file.stat().st_size
+    with open(log_file, 'a') as f:
+        f.write('{"timestamp": "x", "level": "INFO", "mess')
+
+    assert (index.get(log_file)['lines'], index.get(log_file)['offset']) == (10, size)
+
+    with open(log_file, 'a') as f:
+        f.write('age": "fin"}\n')
+    assert index.get(log_file)['lines'] == 11
+
+
+def test_sidecar_is_reused_by_a_new_index(log_file, monkeypatch):
+    LogIndex(log_file.parent, stride=4, save_bytes=0).get(log_file)
+    assert log_file.with_name(log_file.name + INDEX_SUFFIX).exists()
+    write_entries(log_file, [(10, 'INFO', 'm10')])
+
+    index = LogIndex(log_file.parent, stride=4)
+    bases = indexed_from(index, monkeypatch)
+    state = index.get(log_file)
+
+    assert state['lines'] == 11
+    assert bases and bases[0] > 0
+
+
+def test_truncated_or_replaced_log_is_rebuilt(log_file):
+    index = LogIndex(log_file.parent, stride=4)
+    index.get(log_file)
+
+    log_file.write_text('')
+    write_entries(log_file, [(30, 'ERROR', 'nuevo')])
+
+    state = index.get(log_file)
+    assert (state['lines'], state['levels']) == (1, {'ERROR': 1})
+
+
+def test_summary_prunes_sidecars_of_deleted_logs(log_file):
+    index = LogIndex(log_file.parent, stride=4, save_bytes=0)
+    other = log_file.with_name("old.log")
+    write_entries(other, [(0, 'INFO', 'x')])
+    assert set(index.summary()) == {'app', 'old'}
+
+    other.unlink()
+    summary = index.summary()
+
+    assert summary['app']['total_entries'] == 10
+    assert summary['app']['last_entry']['message'] == 'm9'
+    assert not other.with_name("old.log" + INDEX_SUFFIX).exists()
@@ -0,0 +1,145 @@
+"""
+Pruebas de core.log_queue: escritura por lotes, descartes, esperas y parada
+"""
+import io
+import logging
+import threading
+import time
+
+import pytest
+
+from core.log_queue import BLOCKING_ATTR, LogPipeline
+
+
+class Collect(logging.Handler):
+    """Handler que guarda los mensajes; opcionalmente se queda esperando en el primero"""
+
+    def __init__(self, gate: threading.Event = None):
+        super().__init__()
+        self.gate = gate
+        self.entered = threading.Event()
+        self.messages = []
+
+    def emit(self, record):
+        self.entered.set()
+        if self.gate:
+            self.gate.wait(5)
+        self.messages.append(record.getMessage())
+
+
+class CountingStream(io.StringIO):
+    flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+
+
+def make_logger(pipeline, *handlers, name='orion.test.queue'):
+    logger = logging.getLogger(name)
+    logger.handlers = [pipeline.handler_for(list(handlers))]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condición no cumplida a tiempo"
+        time.sleep(0.01)
+
+
+def test_records_are_resolved_on_enqueue_and_written_by_handler_level():
+    pipeline = LogPipeline(maxsize=100, mode='drop', batch=50)
+    collect = Collect()
+    warnings = Collect()
+    warnings.setLevel(logging.WARNING)
+    logger = make_logger(pipeline, collect, warnings)
+
+    values = ['antes']
+    logger.info("valor %s", values)
+    values[0] = 'después'
+    logger.warning("aviso")
+    pipeline.stop()
+
+    assert collect.messages == ["valor ['antes']", "aviso"]
+    assert warnings.messages == ["aviso"]
+    assert pipeline.get_stats()['written'] == 2
+
+
+def test_stream_handler_is_flushed_once_per_batch():
+    pipeline = LogPipeline(maxsize=100, mode='drop', batch=50)
+    stream = CountingStream()
+    handler = logging.StreamHandler(stream)
+
+    # Sin arrancar el hilo: stop() escribe lo encolado en un único lote
+    for index in range(3):
+        pipeline.queue.put_nowait(((handler,), logging.makeLogRecord({'msg': f'linea {index}', 'levelno': logging.INFO})))
+    pipeline.stop()
+
+    assert stream.getvalue().splitlines() == ['linea 0', 'linea 1', 'linea 2']
+    assert stream.flushes == 1
+
+
+def test_full_queue_drops_in_drop_mode_but_blocking_records_wait():
+    gate = threading.Event()
+    collect = Collect(gate)
+    pipeline = LogPipeline(maxsize=1, mode='drop', batch=1)
+    logger = make_logger(pipeline, collect)
+
+    logger.info("primero")          # el hilo lo saca y se queda esperando en el handler
+    collect.entered.wait(5)
+    logger.info("segundo")          # ocupa la única plaza de la cola
+    logger.warning("descartado")    # cola llena: se descarta
+
+    blocked = threading.Thread(target=lambda: logger.info("salida", extra={BLOCKING_ATTR: True}))
+    blocked.start()
+    wait_until(lambda: pipeline.get_stats()['waits'] == 1)
+    assert blocked.is_alive()
+
+    gate.set()
+    blocked.join(5)
+    pipeline.stop()
+
+    stats = pipeline.get_stats()
+    assert collect.messages == ["primero", "segundo", "salida"]
+    assert (stats['dropped'], stats['dropped_warnings'], stats['waits']) == (1, 1, 1)
+    assert stats['running'] is False
+
+
+def test_block_mode_waits_instead_of_dropping():
+    gate = threading.Event()
+    collect = Collect(gate)
+    pipeline = LogPipeline(maxsize=1, mode='block', batch=1)
+    logger = make_logger(pipeline, collect)
+
+    logger.info("primero")
+    collect.entered.wait(5)
+    logger.info("segundo")
+    waiting = threading.Thread(target=lambda: logger.info("tercero"))
+    waiting.start()
+    wait_until(lambda: pipeline.get_stats()['waits'] == 1)
+
+    gate.set()
+    waiting.join(5)
+    pipeline.stop()
+
+    assert collect.messages == ["primero", "segundo", "tercero"]
+    assert pipeline.get_stats()['dropped'] == 0
+
+
+def test_records_after_stop_are_written_directly():
+    pipeline = LogPipeline(maxsize=10, mode='drop', batch=10)
+    collect = Collect()
+    logger = make_logger(pipeline, collect)
+    pipeline.stop()
+
+    logger.info("tarde")
+
+    assert collect.messages == ["tarde"]
+    assert pipeline.get_stats()['running'] is False
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        LogPipeline(mode='spill')
@@ -0,0 +1,125 @@
+"""
+Pruebas de core.log_rotation: rotación, segmentos gzip por miembros y retención
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+
+import pytest
+
+from core.log_reader import (
+    iter_lines_forward, iter_lines_reverse, list_segments, load_segment_index, log_chain,
+    segment_stats, tail_log
+)
+from core.log_rotation import RotatingLogHandler, apply_retention, compress_segment
+from tests.conftest import write_entries
+
+
+def lines_of(count, start=0):
+    return [json.dumps({"level": "ERROR" if i % 5 == 0 else "INFO", "message": f"linea {i:05d}"})
+            for i in range(start, start + count)]
+
+
+def wait_rotation():
+    """Esperar a los hilos que comprimen segmentos y aplican la retención"""
+    for thread in threading.enumerate():
+        if thread.name.startswith("orion-log-rotation-"):
+            thread.join(timeout=10)
+
+
+# ==================== SEGMENTOS GZIP ====================
+
+@pytest.fixture
+def segment(logs_dir):
+    path = logs_dir / "p.log.20260101T000000"
+    path.write_text('\n'.join(lines_of(500)) + '\n', encoding='utf-8')
+    return path
+
+
+def test_compress_segment_writes_members_and_index(segment):
+    original = segment.read_bytes()
+
+    target = compress_segment(segment, member_bytes=2048)
+
+    assert not segment.exists()
+    assert target.name == "p.log.20260101T000000.gz"
+    # Varios miembros, pero sigue siendo un gzip normal
+    assert gzip.decompress(target.read_bytes()) == original
+    index = load_segment_index(target)
+    assert len(index['members']) > 5
+    assert index['lines'] == 500 and index['size'] == len(original)
+    assert index['levels'] == {'ERROR': 100, 'INFO': 400}
+    assert segment_stats(target)['lines'] == 500
+
+
+def test_gzip_members_end_on_line_boundaries(segment):
+    original = segment.read_bytes()
+    target = compress_segment(segment, member_bytes=1000)
+
+    for _, raw_offset in load_segment_index(target)['members'][1:]:
+        assert original[raw_offset - 1:raw_offset] == b'\n'
+
+
+def test_reverse_reading_of_compressed_segment(segment):
+    expected = lines_of(500)
+    target = compress_segment(segment, member_bytes=1500)
+
+    assert list(iter_lines_reverse(target)) == expected[::-1]
+
+
+def test_forward_reading_resumes_inside_a_member(segment):
+    target = compress_segment(segment, member_bytes=1500)
+    lines = list(iter_lines_forward(target))
+    offset = lines[299][0]
+
+    resumed = [line for _, line in iter_lines_forward(target, offset)]
+
+    assert resumed == lines_of(200, start=300)
+
+
+def test_compressed_segment_without_index_is_read_whole(segment):
+    target = compress_segment(segment, member_bytes=1500)
+    os.unlink(str(target) + '.idx')
+
+    assert list(iter_lines_reverse(target))[:2] == lines_of(500)[:-3:-1]
+
+
+# ==================== HANDLER ====================
+
+def emit(handler, messages):
+    handler.emit_batch([logging.makeLogRecord({'msg': message, 'levelno': logging.INFO}) for message in messages])
+
+
+def test_handler_rotates_by_size_and_reads_as_one_log(logs_dir):
+    log_file = logs_dir / "p.log"
+    handler = RotatingLogHandler(log_file, max_bytes=4096, interval=0, keep=100, max_age_days=0)
+    messages = lines_of(600)
+    try:
+        for start in range(0, 600, 50):
+            emit(handler, messages[start:start + 50])
+    finally:
+        handler.close()
+    wait_rotation()
+
+    segments = list_segments(log_file)
+    assert len(segments) > 3
+    assert all(segment.name.endswith('.gz') for segment in segments)
+    # Los sufijos del mismo segundo se ordenan como números (-10 después de -9)
+    assert log_chain(log_file)[1:] == segments
+    assert tail_log(log_file, 600) == messages
+    assert tail_log(log_file, 30) == messages[-30:]
+
+
+def test_retention_keeps_newest_segments(logs_dir):
+    log_file = logs_dir / "p.log"
+    for stamp in ("20260101T000000", "20260101T000001", "20260101T000001-2", "20260101T000001-10"):
+        write_entries(logs_dir / f"p.log.{stamp}", [(0, "INFO", stamp)])
+
+    removed = apply_retention(log_file, keep=2, max_age_days=0)
+
+    assert sorted(path.name for path in removed) == ["p.log.20260101T000000", "p.log.20260101T000001"]
+    assert [path.name for path in list_segments(log_file)] == [
+        "p.log.20260101T000001-10", "p.log.20260101T000001-2"
+    ]
@@ -0,0 +1,113 @@
+"""
+Pruebas de core.log_search: indexación incremental y búsqueda paginada
+"""
+import os
+import threading
+
+import pytest
+
+from core.log_rotation import compress_segment
+from core.log_search import LogSearch
+from tests.conftest import timestamp, write_entries
+
+
+@pytest.fixture
+def search(database, logs_dir):
+    write_entries(logs_dir / "api.log", [
+        (
+            second,
+            "ERROR" if second % 3 == 0 else "INFO",
+            f"fallo de conexion {second}" if second % 2 else f"peticion {second}"
+        )
+        for second in range(30)
+    ])
+    write_entries(logs_dir / "web.log", [(second, "WARNING", f"fallo de plantilla {second}") for second in range(5)])
+    search = LogSearch(database, logs_dir)
+    search.ingest()
+    return search
+
+
+def collect(search, limit, **filters):
+    results, cursor = [], None
+    while True:
+        page = search.search(limit=limit, cursor=cursor, **filters)
+        assert len(page['items']) <= limit
+        results += page['items']
+        cursor = page['next_cursor']
+        if cursor is None:
+            return results
+
+
+def messages(results):
+    return [result['entrada']['message'] for result in results]
+
+
+@pytest.mark.parametrize("limit", [1, 4, 100])
+def test_text_search_pages_by_rank_without_repeats(search, limit):
+    results = collect(search, limit, query="fallo")
+
+    assert len(results) == 20 == len(set(messages(results)))
+    assert [result['rank'] for result in results] == sorted(result['rank'] for result in results)
+    assert all('[fallo]' in result['fragmento'] for result in results)
+
+
+@pytest.mark.parametrize("limit", [1, 7, 100])
+def test_listing_pages_newest_first(search, limit):
+    results = collect(search, limit, project="api")
+
+    assert messages(results) == messages(search.search(project="api", limit=100)['items'])
+    assert [result['timestamp'] for result in results] == [timestamp(second) for second in range(29, -1, -1)]
+
+
+def test_filters(search):
+    assert len(search.search("fallo", project="web", limit=100)['items']) == 5
+    assert {r['nivel'] for r in search.search(levels=['error'], limit=100)['items']} == {'ERROR'}
+    window = search.search(project="api", since=timestamp(10), until=timestamp(12), limit=100)['items']
+    assert messages(window) == ['peticion 12', 'fallo de conexion 11', 'peticion 10']
+    assert messages(search.search("conex*", project="api", limit=1)['items'])[0].startswith('fallo de conexion')
+
+
+def test_ingest_is_incremental(search, logs_dir):
+    assert search.ingest() == 0
+
+    write_entries(logs_dir / "api.log", [(40, "INFO", "reintento tras fallo")])
+
+    assert search.ingest() == 1
+    assert messages(search.search("reintento")['items']) == ['reintento tras fallo']
+
+
+def test_rotated_segment_keeps_its_entries_and_retention_purges_them(search, logs_dir):
+    segment = logs_dir / "web.log.20260101T000000"
+    os.rename(logs_dir / "web.log", segment)
+    write_entries(logs_dir / "web.log", [(50, "INFO", "tras rotar")])
+    compressed = compress_segment(segment)
+
+    search.ingest()
+    assert len(search.search(project="web", limit=100)['items']) == 6
+
+    os.unlink(compressed)
+    os.unlink(str(compressed) + '.idx')
+    search.ingest()
+    assert messages(search.search(project="web", limit=100)['items']) == ['tras rotar']
+    assert search.get_stats()['purged'] == 5
+
+
+def test_concurrent_ingest_counts_every_cycle(search, logs_dir):
+    write_entries(logs_dir / "api.log", [(60 + i, "INFO", f"nuevo {i}") for i in range(20)])
+    threads = [threading.Thread(target=search.ingest) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = search.get_stats()
+    assert stats['cycles'] == 5
+    assert stats['indexed'] == stats['entradas'] == 55
+
+
+@pytest.mark.parametrize("query, cursor", [
+    ("fallo", "zzz"), ("fallo", "abc|3"), ("fallo", "|1"), (None, "zzz"), (None, "2026-01-01|x")
+])
+def test_malformed_cursor_is_rejected(search, query, cursor):
+    with pytest.raises(ValueError, match="Cursor no válido"):
+        search.search(query, cursor=cursor)
@@ -0,0 +1,106 @@
+"""
+Pruebas de core.log_reader: lectura inversa con offsets y mezcla paginada de logs
+"""
+import pytest
+
+from core.log_reader import iter_lines_reverse_at, merge_logs
+from tests.conftest import timestamp, write_entries
+
+
+# ==================== LECTURA INVERSA ====================
+
+@pytest.fixture
+def long_lines(tmp_path):
+    """Archivo con líneas más largas que el bloque de lectura y que max_line"""
+    path = tmp_path / "largo.log"
+    lines = [b"a" * 10, b"b" * 300, b"c" * 5, b"d" * 1000, b"e" * 7]
+    path.write_bytes(b"\n".join(lines) + b"\n")
+    return path, lines
+
+
+@pytest.mark.parametrize("block_size", [16, 64, 4096])
+def test_offsets_survive_truncated_lines(long_lines, block_size):
+    path, lines = long_lines
+    data = path.read_bytes()
+
+    result = list(iter_lines_reverse_at(path, None, block_size, max_line=50))
+
+    assert [offset for offset, _ in result] == [data.index(line) for line in reversed(lines)]
+    assert [line for _, line in result] == [line[:50].decode() for line in reversed(lines)]
+
+
+def test_resume_from_offset(long_lines):
+    path, _ = long_lines
+    offsets = [offset for offset, _ in iter_lines_reverse_at(path, None, 16, 50)]
+
+    resumed = [line[0] for _, line in iter_lines_reverse_at(path, offsets[2], 16, 50)]
+
+    assert resumed == ['b', 'a']
+
+
+# ==================== MEZCLA ====================
+
+@pytest.fixture
+def logs(logs_dir):
+    """Tres logs con timestamps repetidos dentro de cada uno y entre ellos"""
+    for name, seconds in (("a", [1, 2, 2, 3, 5]), ("b", [2, 2, 4, 5]), ("c", [2, 5, 5])):
+        write_entries(logs_dir / f"{name}.log", [
+            (second, "ERROR" if index % 2 else "INFO", f"{name}{index}")
+            for index, second in enumerate(seconds)
+        ])
+    return sorted(logs_dir.glob("*.log"))
+
+
+def collect(paths, limit, **filters):
+    messages, cursor = [], None
+    while True:
+        page = merge_logs(paths, limit, cursor=cursor, **filters)
+        assert len(page['items']) <= limit
+        messages += [entry['message'] for entry in page['items']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            return messages
+
+
+def test_merge_is_newest_first(logs):
+    entries = merge_logs(logs, 100)['items']
+
+    assert len(entries) == 12
+    assert [entry['timestamp'] for entry in entries] == sorted((e['timestamp'] for e in entries), reverse=True)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 11])
+def test_pages_cover_every_entry_once(logs, limit):
+    assert collect(logs, limit) == [entry['message'] for entry in merge_logs(logs, 100)['items']]
+
+
+def test_until_is_inclusive_and_pages_do_not_overlap(logs):
+    until = timestamp(2)
+    expected = [entry['message'] for entry in merge_logs(logs, 100, until=until)['items']]
+
+    assert sorted(expected) == ['a0', 'a1', 'a2', 'b0', 'b1', 'c0']
+    assert collect(logs, 2, until=until) == expected
+
+
+def test_since_and_levels(logs):
+    entries = merge_logs(logs, 100, since=timestamp(4), levels=['error'])['items']
+
+    assert sorted(entry['message'] for entry in entries) == ['b3', 'c1']
+
+
+def test_file_added_between_pages_is_not_repeated(logs, logs_dir):
+    first = merge_logs(logs, 4)
+    write_entries(logs_dir / "d.log", [(9, "INFO", "d-nuevo"), (2, "INFO", "d-viejo")])
+
+    rest = merge_logs(sorted(logs_dir.glob("*.log")), 100, cursor=first['next_cursor'])['items']
+
+    # Lo posterior al cursor no sale; lo anterior sí, una sola vez
+    messages = [entry['message'] for entry in rest]
+    assert 'd-nuevo' not in messages
+    assert messages.count('d-viejo') == 1
+
+
+@pytest.mark.parametrize("cursor", ["zzz", "abc", "e30=", "bm90IGpzb24=", "ñ"])
+def test_malformed_cursor_is_rejected(logs, cursor):
+    with pytest.raises(ValueError, match="Cursor no válido"):
+        merge_logs(logs, 2, cursor=cursor)
@@ -0,0 +1,33 @@
+"""
+Pruebas de core.metrics: escritura por lotes y reintento tras un fallo
+"""
+import sqlite3
+import time
+
+import pytest
+
+from core.metrics import MetricsStore
+
+
+def sample(cpu, age):
+    return {'sampled_at': time.time() - age, 'cpu_percent': cpu, 'memory_mb': 10.0, 'num_threads': 2}
+
+
+def test_failed_flush_keeps_samples_for_next_try(database, monkeypatch):
+    store = MetricsStore(database)
+    store.record_samples([('a', sample(1.0, age=2))])
+
+    def broken(rows):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(store, '_write', broken)
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush()
+
+    # Lo que llega mientras tanto se escribe detrás de lo que falló
+    store.record_samples([('a', sample(2.0, age=1))])
+    monkeypatch.undo()
+
+    assert store.flush() == 2
+    assert store.flush() == 0
+    assert [point['cpu_avg'] for point in store.query('a', '1s')['points']] == [1.0, 2.0]
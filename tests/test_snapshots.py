@@ -0,0 +1,132 @@
+"""
+Pruebas de core.snapshots: qué procesos cuentan como un proyecto en ejecución
+"""
+import subprocess
+import sys
+import time
+
+import psutil
+import pytest
+
+from core.project_manager import ProjectManager
+from core.snapshots import ProcessSnapshot, path_tokens, process_snapshots, python_script
+
+
+@pytest.mark.parametrize("cmdline, cwd, expected", [
+    (["python3", "app.py"], "/srv/alpha", "/srv/alpha/app.py"),
+    (["/usr/bin/python3.11", "-u", "/srv/alpha/main.py"], "/tmp", "/srv/alpha/main.py"),
+    (["python", "-m", "http.server"], "/srv/alpha", None),
+    (["python3", "-c", "print(1)"], "/srv/alpha", None),
+    (["bash", "-c", "python3 /srv/alpha/app.py"], "/srv/alpha", None),
+    (["python3-config", "app.py"], "/srv/alpha", None),
+    (["python3", "app.py"], None, None),
+    ([], "/srv/alpha", None),
+])
+def test_python_script(cmdline, cwd, expected):
+    assert python_script(cmdline, cwd) == expected
+
+
+def test_path_tokens():
+    cmdline = ["gunicorn", "--chdir=/srv/alpha", "-b", "0:80", "app:app", "src/main.py", "run.py", "/etc/conf"]
+
+    assert list(path_tokens(cmdline, "/srv/beta")) == [
+        "/srv/alpha", "/srv/beta/src/main.py", "/srv/beta/run.py", "/etc/conf"
+    ]
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Proyecto con un app.py que se queda esperando"""
+    path = tmp_path / "alpha"
+    path.mkdir()
+    (path / "app.py").write_text("import time\ntime.sleep(30)\n")
+    return path
+
+
+def spawn(args, cwd, timeout=10.0):
+    """Lanzar un proceso y esperar a que psutil lo vea ya con su cmdline (tras el exec)"""
+    process = subprocess.Popen(args, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if psutil.Process(process.pid).cmdline() == [str(arg) for arg in args]:
+                return process
+        except psutil.Error:
+            pass
+        if time.monotonic() > deadline:
+            process.kill()
+            process.wait()
+            pytest.fail(f"El proceso {args} no apareció en {timeout} s")
+        time.sleep(0.01)
+
+
+def test_find_project_matches_interpreter_running_main_file(project):
+    process = spawn([sys.executable, "app.py"], project)
+    try:
+        snapshot = ProcessSnapshot()
+        assert snapshot.find_project(str(project), ["main.py", "app.py"]) == process.pid
+        assert snapshot.has_pid(process.pid, snapshot.get_process(process.pid)['create_time'])
+        assert not snapshot.has_pid(process.pid, 0.0)
+    finally:
+        process.kill()
+        process.wait()
+
+
+@pytest.mark.parametrize("how", ["script_from_elsewhere", "module_in_cwd", "path_in_cmdline"])
+def test_find_project_matches_processes_using_the_project(project, tmp_path, how):
+    args, cwd = {
+        # python3 /ruta/proyecto/app.py lanzado desde otro directorio
+        "script_from_elsewhere": ([sys.executable, str(project / "app.py")], tmp_path),
+        # Como `python -m uvicorn app:app` con el cwd en el proyecto
+        "module_in_cwd": ([sys.executable, "-m", "http.server", "0"], project),
+        # Como `gunicorn --chdir /ruta/proyecto`: la ruta solo aparece en el cmdline
+        "path_in_cmdline": ([sys.executable, "-c", "import time; time.sleep(30)", f"--chdir={project}"], tmp_path),
+    }[how]
+    process = spawn(args, cwd)
+    try:
+        assert ProcessSnapshot().find_project(str(project), ["app.py"]) == process.pid
+    finally:
+        process.kill()
+        process.wait()
+
+
+def test_find_project_ignores_unrelated_processes(project, tmp_path):
+    sibling = tmp_path / "alpha2"
+    sibling.mkdir()
+    others = [
+        spawn(["sleep", "30"], tmp_path),
+        # Un proyecto cuyo nombre empieza igual no es este
+        spawn([sys.executable, "-c", "import time; time.sleep(30)", str(sibling / "app.py")], sibling),
+    ]
+    try:
+        assert ProcessSnapshot().find_project(str(project), ["app.py"]) is None
+    finally:
+        for process in others:
+            process.kill()
+            process.wait()
+
+
+def test_stop_only_signals_processes_that_run_the_main_file(project, database):
+    manager = ProjectManager(database)
+    manager.portfolio_dir = project.parent
+    server = spawn([sys.executable, "-m", "http.server", "0"], project)
+    try:
+        process_snapshots.invalidate()
+        assert manager.is_project_running("alpha")
+
+        result = manager.stop_project("alpha")
+
+        assert not result['success'] and str(server.pid) in result['error']
+        assert server.poll() is None
+    finally:
+        server.kill()
+        server.wait()
+
+    app = spawn([sys.executable, "app.py"], project)
+    try:
+        process_snapshots.invalidate()
+        assert manager.stop_project("alpha")['success']
+        assert app.wait(timeout=10) is not None
+    finally:
+        app.kill()
+        app.wait()
@@ -0,0 +1,80 @@
+"""
+Pruebas de Database.sync_projects: altas, cambios y poda de proyectos
+"""
+
+
+def project(nombre, **fields):
+    return {'nombre': nombre, 'ruta': f'/portfolio/{nombre}', 'puerto': None, **fields}
+
+
+def count(database, table):
+    with database.get_connection(readonly=True) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_sync_inserts_updates_and_skips_unchanged(database):
+    assert database.sync_projects([project('a'), project('b')]) == {
+        'inserted': 2, 'updated': 0, 'unchanged': 0, 'removed': 0, 'removed_activity': 0
+    }
+
+    counts = database.sync_projects([project('a'), project('b', puerto=8001, tipo='Flask')])
+    assert (counts['inserted'], counts['updated'], counts['unchanged']) == (0, 1, 1)
+    assert database.get_project('b')['puerto'] == 8001
+    assert database.get_project('b')['tipo'] == 'Flask'
+
+
+def test_update_keeps_runtime_state(database):
+    database.sync_projects([project('a')])
+    database.update_project('a', estado='activo')
+
+    database.sync_projects([project('a', puerto=9000)])
+
+    assert database.get_project('a')['estado'] == 'activo'
+
+
+def test_prune_removes_project_analysis_and_activity(database):
+    database.sync_projects([project('a'), project('b')])
+    database.log_activity('a', 'inicio', 'arrancado')
+    database.log_activity('a', 'parada', 'detenido')
+    database.log_activity('b', 'inicio', 'arrancado')
+    database.save_analyses([{
+        'nombre': 'a', 'ruta': '/portfolio/a', 'hash': 'h', 'main_file': 'app.py', 'fuentes': [], 'resultado': {}
+    }])
+    with database.get_connection() as conn:
+        conn.execute("""
+            INSERT INTO actividad_diaria (proyecto_id, dia, tipo_evento, eventos, primero, ultimo)
+            SELECT id, '2026-01-01', 'inicio', 3, '', '' FROM proyectos WHERE nombre = 'a'
+        """)
+
+    counts = database.sync_projects([project('b')], prune=True)
+
+    assert (counts['removed'], counts['removed_activity']) == (1, 2)
+    assert database.get_project('a') is None
+    assert count(database, 'actividad') == 1
+    assert count(database, 'actividad_diaria') == 0
+    assert count(database, 'analisis') == 0
+    assert database.get_stats()['total'] == 1
+
+
+def test_new_project_does_not_inherit_pruned_activity(database):
+    database.sync_projects([project('a')])
+    database.log_activity('a', 'inicio', 'arrancado')
+    database.sync_projects([project('b')], prune=True)
+
+    database.sync_projects([project('c')])
+
+    assert database.get_activity_page('c')['items'] == []
+
+
+def test_prune_ignores_empty_discovery(database):
+    database.sync_projects([project('a')])
+
+    assert database.sync_projects([], prune=True)['removed'] == 0
+    assert database.get_project('a') is not None
+
+
+def test_without_prune_missing_projects_stay(database):
+    database.sync_projects([project('a'), project('b')])
+
+    assert database.sync_projects([project('a')])['removed'] == 0
+    assert database.get_project('b') is not None
@@ -0,0 +1,45 @@
+"""
+Pruebas del vacuum incremental de orion.db
+"""
+import sqlite3
+
+from core.database import Database
+
+
+def auto_vacuum(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_legacy_database_is_converted_once(tmp_path):
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA auto_vacuum = NONE")
+    conn.execute("CREATE TABLE relleno (x)")
+    conn.commit()
+    conn.close()
+    database = Database(path)
+
+    # Sin convertir, incremental_vacuum no hace un VACUUM completo por su cuenta
+    assert database.incremental_vacuum() == 0
+    assert auto_vacuum(path) == 0
+
+    assert database.enable_incremental_vacuum() is True
+    assert database.enable_incremental_vacuum() is False
+    assert auto_vacuum(path) == 2
+    database.close()
+
+
+def test_incremental_vacuum_frees_deleted_pages(database):
+    with database.get_connection() as conn:
+        conn.execute("CREATE TABLE relleno (x)")
+        conn.executemany("INSERT INTO relleno VALUES (?)", [('x' * 1000,) for _ in range(2000)])
+    with database.get_connection() as conn:
+        conn.execute("DELETE FROM relleno")
+
+    assert database.incremental_vacuum() > 100
+    with database.get_connection(readonly=True) as conn:
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
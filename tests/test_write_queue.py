@@ -0,0 +1,105 @@
+"""
+Pruebas de core.write_queue: fusión de cambios, reintentos y modos de durabilidad
+"""
+import sqlite3
+
+import pytest
+
+from core.write_queue import WriteQueue
+
+
+@pytest.fixture
+def project(database):
+    database.sync_projects([{'nombre': 'a', 'ruta': '/portfolio/a', 'puerto': None}])
+    return 'a'
+
+
+def fail_once(database, monkeypatch):
+    """Hacer que la siguiente apply_writes falle con la BD bloqueada"""
+    original = database.apply_writes
+    calls = []
+
+    def apply_writes(updates, events):
+        calls.append((dict(updates), list(events)))
+        if len(calls) == 1:
+            raise sqlite3.OperationalError('database is locked')
+        return original(updates, events)
+
+    monkeypatch.setattr(database, 'apply_writes', apply_writes)
+    return calls
+
+
+def test_async_merges_updates_and_keeps_event_order(database, project):
+    queue = WriteQueue(database, durability='async')
+
+    queue.record(project, event=('inicio', 'arrancado'), estado='activo', pid=10)
+    queue.update_project(project, pid=11)
+    queue.log_activity(project, 'parada', 'detenido')
+    assert database.get_project(project)['estado'] != 'activo'
+
+    assert queue.flush() == 3
+    assert (database.get_project(project)['estado'], database.get_project(project)['pid']) == ('activo', 11)
+    assert [event['tipo_evento'] for event in database.get_activity(project)] == ['parada', 'inicio']
+    assert queue.get_stats()['batches'] == 1
+
+
+def test_failed_batch_is_merged_with_newer_writes(database, project, monkeypatch):
+    calls = fail_once(database, monkeypatch)
+    queue = WriteQueue(database, durability='async', max_retries=2)
+
+    queue.record(project, event=('inicio', 'arrancado'), estado='activo', pid=10)
+    assert queue.flush() == 0
+    assert queue.pending() == 2
+
+    # Los campos del mismo proyecto se fusionan: una actualización y un evento
+    queue.update_project(project, pid=None, estado='detenido')
+    assert queue.flush() == 2
+
+    updates, events = calls[1]
+    assert updates[project][0] == {'estado': 'detenido', 'pid': None}
+    assert [event[1] for event in events] == ['inicio']
+    assert database.get_project(project)['estado'] == 'detenido'
+    assert queue.get_stats()['failures'] == 1
+
+
+def test_batch_is_dropped_after_max_retries(database, project, monkeypatch):
+    def locked(updates, events):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(database, 'apply_writes', locked)
+    queue = WriteQueue(database, durability='async', max_retries=1)
+    queue.update_project(project, estado='activo')
+
+    queue.flush()
+    queue.flush()
+
+    assert queue.pending() == 0
+    assert queue.get_stats()['dropped'] == 1
+
+
+def test_batch_mode_waits_for_commit_and_raises_on_drop(database, project, monkeypatch):
+    queue = WriteQueue(database, durability='batch', max_retries=0)
+
+    # Sin hilo de fondo, quien espera escribe el lote él mismo
+    queue.update_project(project, estado='activo')
+    assert database.get_project(project)['estado'] == 'activo'
+
+    fail_once(database, monkeypatch)
+    with pytest.raises(sqlite3.OperationalError):
+        queue.update_project(project, estado='detenido')
+    assert database.get_project(project)['estado'] == 'activo'
+
+
+def test_sync_mode_writes_directly(database, project):
+    queue = WriteQueue(database, durability='sync')
+
+    queue.record(project, event=('inicio', 'arrancado'), estado='activo')
+
+    assert database.get_project(project)['estado'] == 'activo'
+    assert queue.pending() == 0
+    assert queue.get_stats()['enqueued'] == 0
+
+
+def test_unknown_durability_is_rejected(database):
+    with pytest.raises(ValueError):
+        WriteQueue(database, durability='fsync')